@@ -0,0 +1,188 @@
+# ============================================================
+# 실제 예측 정확도 추적 (실행 기록 vs 새로 들어온 실제값)
+# ============================================================
+#
+# 시트에서 읽은 실제값을 실행 기록 DB(archive.py)에 함께 저장해 두고, 새로 들어왔거나
+# 값이 바뀐 (채널, 날짜)만 기록된 예측과 비교합니다. 결과는 (엔진, 채널, 리드 타임)별
+# 누적 합계(건수, 오차 합, 구간 적중 수 등)로만 보관하므로, 화면에서는 전체 이력을
+# 다시 계산하지 않고 작은 요약 표에서 MAE / MAPE / 구간 적중률을 바로 구합니다.
+#
+# 실제값이 수정되면 이전 값의 기여분을 빼고 새 값으로 다시 더하고, 시트에서 지워지거나 빈칸이 된
+# 실제값은 기여분을 빼고 저장된 실제값에서도 지웁니다. 마지막으로 반영한
+# 실행(run_id) 이후에 기록된 예측은 이미 알고 있는 실제값과 바로 비교합니다.
+#
+# 기록 DB는 레플리카가 함께 쓰므로, 갱신은 DB 옆의 잠금 파일(shared_cache.FileLock)을 잡은
+# 한 곳씩 차례로 합니다 (반영 기준 run_id와 실제값을 읽고 쓰는 사이에 다른 갱신이 끼지 않도록).
+
+import pandas as pd
+
+from archive import ARCHIVE_PATH, connect
+from shared_cache import FileLock
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS actuals (
+    channel TEXT NOT NULL,
+    target_date TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (channel, target_date)
+);
+CREATE TABLE IF NOT EXISTS accuracy (
+    engine TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    lead INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    sum_error REAL NOT NULL,
+    sum_abs_error REAL NOT NULL,
+    sum_sq_error REAL NOT NULL,
+    sum_ape REAL NOT NULL,
+    n_ape INTEGER NOT NULL,
+    hits_95 INTEGER NOT NULL,
+    hits_90 INTEGER NOT NULL,
+    PRIMARY KEY (engine, channel, lead)
+);
+CREATE TABLE IF NOT EXISTS accuracy_state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# 누적 합계 컬럼 (빼고 더할 수 있는 값만 보관)
+SUM_COLUMNS = ["n", "sum_error", "sum_abs_error", "sum_sq_error", "sum_ape", "n_ape", "hits_95", "hits_90"]
+
+# 예측 행 + 실제값 조회 (run_id 조건과 실제값 출처는 호출하는 쪽에서 지정)
+_SCORED_ROWS = """
+SELECT r.engine, f.channel, f.lead, f.forecast, f.lower_95, f.upper_95, f.lower_90, f.upper_90, a.y
+FROM forecasts f
+JOIN runs r ON r.run_id = f.run_id
+JOIN ({actual}) a ON a.channel = f.channel AND a.target_date = f.target_date
+WHERE {where}
+"""
+
+
+def _create_tables(conn):
+    """요약 표 생성 (executescript는 진행 중인 트랜잭션을 커밋하므로 문장별로 실행)"""
+    for statement in SCHEMA.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+
+
+def _contributions(rows):
+    """예측 행 + 실제값 → (엔진, 채널, 리드 타임) 인덱스의 합계 기여분 (행이 없으면 None)"""
+    if rows.empty:
+        return None
+    error = rows["forecast"] - rows["y"]
+    positive = rows["y"] > 0
+    frame = pd.DataFrame({
+        "engine": rows["engine"],
+        "channel": rows["channel"],
+        "lead": rows["lead"],
+        "n": 1,
+        "sum_error": error,
+        "sum_abs_error": error.abs(),
+        "sum_sq_error": error ** 2,
+        "sum_ape": (error.abs() / rows["y"].where(positive) * 100).fillna(0.0),
+        "n_ape": positive.astype(int),
+        "hits_95": rows["y"].between(rows["lower_95"], rows["upper_95"]).astype(int),
+        "hits_90": rows["y"].between(rows["lower_90"], rows["upper_90"]).astype(int),
+    })
+    return frame.groupby(["engine", "channel", "lead"])[SUM_COLUMNS].sum()
+
+
+def update_accuracy(df, channels, path=ARCHIVE_PATH):
+    """새로 들어왔거나 바뀌었거나 지워진 실제값 + 새로 기록된 실행만 반영 → 반영한 (채널, 날짜) 수
+
+    df: load_data 결과, channels: {시트 컬럼명: 채널명} - 지워진 실제값은 이 채널들에서만 찾음
+    """
+    actual = df.melt(id_vars="날짜", value_vars=list(channels), var_name="column", value_name="y")
+    actual = actual.dropna(subset=["날짜", "y"])
+    actual = pd.DataFrame({
+        "channel": actual["column"].map(channels),
+        "target_date": pd.to_datetime(actual["날짜"]).dt.strftime("%Y-%m-%d"),
+        "y": actual["y"].astype(float),
+    }).drop_duplicates(["channel", "target_date"], keep="last")
+
+    # 다른 레플리카의 갱신과 겹치지 않도록 잠금 (커밋이 끝난 뒤에 풀림)
+    with FileLock(f"{path}.lock"), connect(path) as conn:
+        _create_tables(conn)
+        known = pd.read_sql_query("SELECT channel, target_date, value AS old FROM actuals", conn)
+        known = known[known["channel"].isin(set(channels.values()))]
+        # 시트에 없거나 빈칸이 된 실제값은 y가 NaN (지워진 값)
+        merged = actual.merge(known, on=["channel", "target_date"], how="outer")
+        changed = merged[merged["old"].isna() | (merged["old"] != merged["y"])]
+
+        row = conn.execute("SELECT value FROM accuracy_state WHERE key = 'run_id'").fetchone()
+        watermark = row[0] if row else 0
+        latest = conn.execute("SELECT COALESCE(MAX(run_id), 0) FROM runs").fetchone()[0]
+
+        parts = []
+        if not changed.empty:
+            conn.execute("CREATE TEMP TABLE changed (channel TEXT, target_date TEXT, old REAL, y REAL, "
+                         "PRIMARY KEY (channel, target_date))")
+            conn.executemany("INSERT INTO changed VALUES (?, ?, ?, ?)",
+                             changed[["channel", "target_date", "old", "y"]].itertuples(index=False))
+            # 이미 반영한 실행: 이전 실제값 기여분을 빼고 새 값으로 다시 더함
+            old = pd.read_sql_query(_SCORED_ROWS.format(
+                actual="SELECT channel, target_date, old AS y FROM changed WHERE old IS NOT NULL",
+                where="f.run_id <= ?"), conn, params=[watermark])
+            new = pd.read_sql_query(_SCORED_ROWS.format(
+                actual="SELECT channel, target_date, y FROM changed WHERE y IS NOT NULL", where="f.run_id <= ?"
+            ), conn, params=[watermark])
+            removed = _contributions(old)
+            parts += [_contributions(new), None if removed is None else -removed]
+            conn.execute("DELETE FROM actuals WHERE (channel, target_date) IN "
+                         "(SELECT channel, target_date FROM changed WHERE y IS NULL)")
+            conn.execute(
+                "INSERT INTO actuals (channel, target_date, value) "
+                "SELECT channel, target_date, y FROM changed WHERE y IS NOT NULL "
+                "ON CONFLICT (channel, target_date) DO UPDATE SET value = excluded.value"
+            )
+            conn.execute("DROP TABLE changed")
+
+        # 지난번 이후 새로 기록된 실행: 알고 있는 실제값과 비교
+        if latest > watermark:
+            fresh = pd.read_sql_query(_SCORED_ROWS.format(
+                actual="SELECT channel, target_date, value AS y FROM actuals",
+                where="f.run_id > ? AND f.run_id <= ?"), conn, params=[watermark, latest])
+            parts.append(_contributions(fresh))
+
+        parts = [p for p in parts if p is not None]
+        if parts:
+            delta = pd.concat(parts).groupby(level=[0, 1, 2]).sum().reset_index()
+            columns = ", ".join(SUM_COLUMNS)
+            updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in SUM_COLUMNS)
+            conn.executemany(
+                f"INSERT INTO accuracy (engine, channel, lead, {columns}) "
+                f"VALUES ({', '.join('?' * (3 + len(SUM_COLUMNS)))}) "
+                f"ON CONFLICT (engine, channel, lead) DO UPDATE SET {updates}",
+                [(e, ch, int(lead), *(float(v) for v in vals))
+                 for e, ch, lead, *vals in delta[["engine", "channel", "lead", *SUM_COLUMNS]].itertuples(index=False)]
+            )
+
+        conn.execute(
+            "INSERT INTO accuracy_state (key, value) VALUES ('run_id', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value", (latest,)
+        )
+    return len(changed)
+
+
+def accuracy_summary(engine, path=ARCHIVE_PATH):
+    """요약 표 → (리드 타임별 표, 채널 요약 표) - backtest_metrics와 같은 컬럼"""
+    with connect(path) as conn:
+        _create_tables(conn)
+        sums = pd.read_sql_query("SELECT * FROM accuracy WHERE engine = ? AND n > 0", conn, params=[engine])
+
+    def metrics(frame):
+        return pd.DataFrame({
+            "n": frame["n"].astype(int),
+            "mae": frame["sum_abs_error"] / frame["n"],
+            "mape": frame["sum_ape"] / frame["n_ape"].where(frame["n_ape"] > 0),
+            "coverage_95": frame["hits_95"] / frame["n"],
+            "coverage_90": frame["hits_90"] / frame["n"],
+            "bias": frame["sum_error"] / frame["n"],
+            "rmse": (frame["sum_sq_error"] / frame["n"]) ** 0.5,
+        })
+
+    by_lead = pd.concat([sums[["channel", "lead"]], metrics(sums)], axis=1)
+    totals = sums.groupby("channel", as_index=False)[SUM_COLUMNS].sum()
+    summary = pd.concat([totals[["channel"]], metrics(totals)], axis=1)
+    return by_lead.sort_values(["channel", "lead"]).reset_index(drop=True), summary
@@ -5,15 +5,27 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime, timedelta
 import os
-import pickle
-from forecaster import NewsViewershipForecaster
+import time
+import uuid
+import sqlite3
+import threading
+from accuracy import accuracy_summary
+from exports import build_export_artifacts, result_fingerprint
+from jobs import (AdmissionError, ForecastJobQueue, STAGES, load_backtest_result, load_job_result, load_result,
+                  result_mtime, tuned_stamp)
+from shared_cache import CACHE_DIR
+from channel_registry import load_channel_config, normalize_channels
+# Prophet/cmdstanpy는 forecaster 안에서 학습할 때만 import되므로 상수는 바로 가져옴
+from forecaster import MAX_PREDICT_DAYS
+
+# 앱 제목 (예측 채널은 channels.json / 시트에 따라 달라지므로 채널 수 · 종류를 넣지 않음)
+APP_TITLE = "📺 메인뉴스 시청률 Forecasting (전국)"
 
 # 페이지 설정
 st.set_page_config(
-    page_title="📺 종편 4사 메인뉴스 시청률 Forecasting (전국)",
+    page_title=APP_TITLE,
     page_icon="📊",
     layout="wide",
     initial_sidebar_state="expanded"
@@ -183,34 +195,180 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# 캐시 디렉토리 설정
-CACHE_DIR = "cache"
+# 캐시 디렉토리 설정 (shared_cache.CACHE_DIR - NEWS_FORECAST_CACHE_DIR로 지정하면 여러 레플리카가 공유)
 os.makedirs(CACHE_DIR, exist_ok=True)
 
-@st.cache_data(ttl=3600)
-def load_and_forecast(sheets_id, gid, predict_days=180):
-    """데이터 로드 및 예측 (1시간 캐싱)"""
-    forecaster = NewsViewershipForecaster(sheets_id, gid)
-    forecaster.load_data()
-    forecaster.setup_holidays()
-    forecasts, target_dt = forecaster.run_forecast(predict_days)
-    predictions = forecaster.get_today_predictions(target_dt)
-    forecast_df = forecaster.get_forecast_dataframe(target_dt)
-
-    # Prophet 모델 객체는 캐싱하지 않음 (pickle 문제)
-    return {
-        "colors": forecaster.colors,
-        "order": forecaster.order,
-        "forecasts": forecasts,
-        "target_dt": target_dt,
-        "predictions": predictions,
-        "forecast_df": forecast_df,
-        "data": forecaster.df,
-        "holidays": forecaster.holidays
-    }
+# 예측 결과 캐시 유효 시간 (1시간) - 지나면 이전 결과를 보여주면서 백그라운드에서 갱신
+RESULT_TTL = 3600
+
+# 예측 작업 / 백그라운드 갱신 상태 확인 주기 (초)
+REFRESH_POLL_SECONDS = 2
+JOB_POLL_SECONDS = 1
+
+# 채널 카드 배치 (한 줄 4개, 한 페이지 3줄)
+CARDS_PER_ROW = 4
+CARDS_PER_PAGE = 12
+
+# 추세 차트에 기본으로 표시할 최대 채널 수
+MAX_TREND_CHANNELS = 8
+
+# 예측 엔진 (forecaster.ENGINES)
+ENGINE_LABELS = {
+    "prophet": "Prophet (Stan, 고정밀)",
+    "numpy": "NumPy 릿지 (고속)"
+}
+
+# 신뢰구간 계산 방식 (forecaster.UNCERTAINTY_MODES)
+UNCERTAINTY_LABELS = {
+    "full": "정밀 (1000회 샘플링)",
+    "reduced": "빠름 (200회 샘플링)",
+    "analytic": "즉시 (해석적 근사)"
+}
+
+@st.cache_resource
+def _result_store():
+    """세션 간 공유되는 예측 결과 저장소 {(sheets_id, gid, uncertainty_mode, engine, 튜닝 파일 시각): (생성 시각, 결과)}"""
+    return {}
+
+@st.cache_resource
+def _scenario_store():
+    """세션 간 공유되는 시나리오 엔진 {(sheets_id, gid, uncertainty_mode, engine): (결과 지문, ScenarioEngine)}
+
+    학습된 모델은 결과(디스크 저장 대상)와 따로 설정별 최신 것만 메모리에 보관합니다.
+    """
+    return {}
+
+@st.cache_resource
+def _shared_result_mtimes():
+    """설정별로 마지막으로 읽은 공유 결과 파일의 수정 시각 {settings: mtime}"""
+    return {}
+
+def store_result(settings, result, scenario_engine):
+    """결과를 메모리 저장소에 반영 (결과 파일은 작업 프로세스가 공유 캐시에 저장) - 학습 모델은 시나리오 저장소에만 보관"""
+    _result_store()[(*settings, result["tuned_stamp"])] = (result["computed_at"], result)
+    _scenario_store()[settings] = (result["fingerprint"], scenario_engine)
+
+@st.cache_resource
+def _job_queue():
+    """세션 간 공유되는 예측 작업 큐 (작업 파일은 캐시 디렉토리 아래, 끝나면 결과를 바로 저장소에 반영)"""
+    return ForecastJobQueue(os.path.join(CACHE_DIR, "jobs"), on_done=lambda job_id, _: adopt_job(job_id))
+
+@st.cache_resource
+def _adopted_jobs():
+    """결과를 저장소에 반영한 작업 {"lock": Lock, "jobs": {job_id: 결과}}"""
+    return {"lock": threading.Lock(), "jobs": {}}
+
+def adopt_job(job_id):
+    """끝난 작업의 결과를 저장소에 반영 → 결과 (여러 번 호출해도 한 번만 반영, 결과 파일이 없으면 None)"""
+    adopted = _adopted_jobs()
+    with adopted["lock"]:
+        if job_id in adopted["jobs"]:
+            return adopted["jobs"][job_id]
+        status = _job_queue().status(job_id)
+        if status is None or status["state"] != "done":
+            return None
+        settings = tuple(status["settings"])
+        mtime = result_mtime(settings)
+        try:
+            result, scenario_engine = load_job_result(job_id, _job_queue().jobs_dir)
+        except OSError:
+            return None
+        store_result(settings, result, scenario_engine)
+        _shared_result_mtimes()[settings] = mtime
+        adopted["jobs"][job_id] = result
+        return result
+
+def submit_forecast(settings):
+    """예측 작업 추가 → job_id (같은 설정의 작업이 진행 중이면 그 작업, 세션별 상한 초과 시 AdmissionError)"""
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return _job_queue().submit(settings, owner=st.session_state.session_id)
+
+def submit_backtest(key, request, n_cutoffs):
+    """백테스트 작업 추가 → job_id (예측 작업과 같은 학습 슬롯 · 세션별 상한, 초과 시 AdmissionError)"""
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return _job_queue().submit_backtest(key, request, n_cutoffs, owner=st.session_state.session_id)
+
+def _job_label(status):
+    """작업 단계 표시 (대기 순번 / 채널 진행 수 포함)"""
+    if status["state"] == "queued":
+        if status["position"] is None:
+            return "작업 프로세스 시작 중"
+        return (f"{STAGES['queued']} - {status['position']}번째 "
+                f"(학습 슬롯 {status['slots_used']}/{status['fit_slots']} 사용 중)")
+    label = STAGES[status["stage"]]
+    if status["stage"] == "fitting":
+        reused = f", {status['reused']}개 재사용" if status.get("reused") else ""
+        label += f" ({status['done']}/{status['total']} 채널{reused})"
+    elif status["stage"] == "backtesting" and "total" in status:
+        label += f" ({status['done']}/{status['total']} 기준일)"
+    return label
+
+def load_last_result(sheets_id, gid, uncertainty_mode="full", engine="prophet"):
+    """마지막으로 계산된 결과 (메모리, 공유 캐시의 결과 파일 중 최신, 없으면 None) - 네트워크를 쓰지 않음
+
+    결과 파일이 마지막으로 읽은 뒤 바뀌었으면 (다른 레플리카가 계산) 학습 모델과 함께 읽어 메모리에 반영합니다.
+    """
+    settings = (sheets_id, gid, uncertainty_mode, engine)
+    latest = None
+    for (sid, g, mode, eng, _), (_, result) in _result_store().items():
+        if (sid, g, mode, eng) == settings:
+            if latest is None or result["computed_at"] > latest["computed_at"]:
+                latest = result
+
+    mtime = result_mtime(settings)
+    if mtime is not None and mtime != _shared_result_mtimes().get(settings):
+        shared, scenario_engine = load_result(settings)
+        if shared is not None and (latest is None or shared["computed_at"] > latest["computed_at"]):
+            store_result(settings, shared, scenario_engine)
+            latest = shared
+        _shared_result_mtimes()[settings] = mtime
+    return latest
+
+def is_stale(result):
+    """유효 시간이 지났거나 튜닝 결과가 바뀐 결과인지"""
+    return (time.time() - result["computed_at"] >= RESULT_TTL
+            or result.get("tuned_stamp") != tuned_stamp())
+
+def slice_result(result, predict_days):
+    """최대 기간 결과에서 예측 기간만큼 잘라낸 결과 (기간별로 한 번만 계산)"""
+    horizons = result.setdefault("horizons", {})
+    if predict_days in horizons:
+        return horizons[predict_days]
+
+    from forecaster import summarize_components
+
+    end_dt = result["target_dt"] + pd.Timedelta(days=predict_days)
+    forecast_df = result["forecast_df"]
+    forecast_df = forecast_df[forecast_df["Date"] < end_dt.strftime("%Y-%m-%d")].reset_index(drop=True)
+    components = {ch: comp[comp["ds"] < end_dt] for ch, comp in result["components"].items()}
 
-def create_dashboard_chart(predictions, colors):
-    """대시보드 차트 생성 (Plotly)"""
+    sliced = {k: v for k, v in result.items() if k != "horizons"}
+    sliced.update({
+        "forecasts": {ch: fc[fc["ds"] < end_dt] for ch, fc in result["forecasts"].items()},
+        "forecast_df": forecast_df,
+        "fingerprint": result_fingerprint(forecast_df),
+        "components": components,
+        "component_stats": {ch: summarize_components(comp) for ch, comp in components.items()},
+    })
+    horizons[predict_days] = sliced
+    return sliced
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def get_joint_probabilities(fingerprint, threshold, start, _joint):
+    """결과 지문 · 기준 시청률별로 결합 확률 집계를 한 번만 계산해 캐싱"""
+    from probabilities import joint_probabilities
+
+    return joint_probabilities(_joint, threshold, start)
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def get_export_artifacts(fingerprint, _forecast_df, _target_dt, _order):
+    """결과 지문별로 다운로드 파일을 한 번만 생성해 bytes로 캐싱"""
+    return build_export_artifacts(_forecast_df, _target_dt, _order)
+
+def create_dashboard_chart(predictions, colors, groups=None):
+    """대시보드 차트 생성 (Plotly) - 그룹이 여러 개면 x축을 그룹별로 묶음"""
     channels = list(predictions.keys())
     values = [predictions[ch]["forecast"] for ch in channels]
     lower_95 = [predictions[ch]["lower_95"] for ch in channels]
@@ -218,25 +376,33 @@ def create_dashboard_chart(predictions, colors):
 
     color_list = [colors[ch] for ch in channels]
 
+    x = channels
+    if groups and len({groups[ch] for ch in channels}) > 1:
+        x = [[groups[ch] for ch in channels], channels]
+
+    # 채널이 많으면 막대 위 값 표시 생략 (마우스 오버로 확인)
+    show_text = len(channels) <= 20
+
     fig = go.Figure()
 
     # 예측값 바
     fig.add_trace(go.Bar(
-        x=channels,
+        x=x,
         y=values,
         name="예측값",
         marker=dict(
             color=color_list,
             line=dict(color='rgba(0, 212, 255, 0.8)', width=2)
         ),
-        text=[f"{v:.3f}%" for v in values],
+        text=[f"{v:.3f}%" for v in values] if show_text else None,
         textposition='outside',
-        textfont=dict(size=14, color='white', family='Arial Black')
+        textfont=dict(size=14 if len(channels) <= 8 else 10, color='white', family='Arial Black'),
+        hovertemplate='%{x}<br>%{y:.3f}%<extra></extra>'
     ))
 
     # 신뢰구간 에러바
     fig.add_trace(go.Scatter(
-        x=channels,
+        x=x,
         y=values,
         error_y=dict(
             type='data',
@@ -401,9 +567,504 @@ def create_trend_chart(forecasts, colors, order, target_dt, days=30, day_filter=
 
     return fig
 
+def render_metric_card(slot, ch, pred=None):
+    """채널 메트릭 카드 렌더링 (pred가 없으면 계산 중 표시)"""
+    if pred is None:
+        slot.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-title">{ch}</div>
+            <div class="metric-value">⏳</div>
+            <div class="metric-range">모델 학습 중...</div>
+        </div>
+        """, unsafe_allow_html=True)
+        return
+    slot.markdown(f"""
+    <div class="metric-card">
+        <div class="metric-title">{ch}</div>
+        <div class="metric-value">{pred['forecast']:.3f}%</div>
+        <div class="metric-range">
+            95% 신뢰구간: {pred['lower_95']:.3f} ~ {pred['upper_95']:.3f}<br>
+            90% 신뢰구간: {pred['lower_90']:.3f} ~ {pred['upper_90']:.3f}
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+class TodayDashboard:
+    """오늘의 예측 섹션 - 채널 결과가 도착하는 대로 카드와 차트를 채움"""
+
+    def __init__(self, container):
+        self.container = container
+        self.card_slots = None
+        self.chart_slot = None
+        self.order = []
+        self.predictions = {}
+
+    def _layout(self, order, target_dt):
+        self.order = list(order)
+        with self.container:
+            st.markdown("## 🎯 오늘의 예측")
+            st.markdown(f"**예측 날짜:** {target_dt.strftime('%Y-%m-%d')}")
+
+            # 채널이 많으면 카드를 페이지로 나눔 (차트에는 전체 채널 표시)
+            n_pages = -(-len(self.order) // CARDS_PER_PAGE)
+            page = 0
+            if n_pages > 1:
+                page = st.selectbox(
+                    "채널 페이지",
+                    options=list(range(n_pages)),
+                    format_func=lambda p: f"{p + 1} / {n_pages} 페이지",
+                    key="card_page"
+                )
+            page_channels = self.order[page * CARDS_PER_PAGE:(page + 1) * CARDS_PER_PAGE]
+
+            self.card_slots = {}
+            for start in range(0, len(page_channels), CARDS_PER_ROW):
+                row = page_channels[start:start + CARDS_PER_ROW]
+                cols = st.columns(min(len(self.order), CARDS_PER_ROW))
+                self.card_slots.update({ch: cols[i].empty() for i, ch in enumerate(row)})
+            self.chart_slot = st.empty()
+        for ch in self.card_slots:
+            render_metric_card(self.card_slots[ch], ch)
+
+    def update(self, ch, pred, order, colors, target_dt, groups=None):
+        """채널 하나의 결과 반영"""
+        if self.card_slots is None:
+            self._layout(order, target_dt)
+        self.predictions[ch] = pred
+        if ch in self.card_slots:
+            render_metric_card(self.card_slots[ch], ch, pred)
+        done = {c: self.predictions[c] for c in self.order if c in self.predictions}
+        self.chart_slot.plotly_chart(create_dashboard_chart(done, colors, groups), use_container_width=True)
+
+    def render(self, predictions, order, colors, target_dt, groups=None):
+        """아직 표시되지 않은 채널만 채움 (스트리밍 후에는 변경 없음)"""
+        for ch in order:
+            if ch not in self.predictions:
+                self.update(ch, predictions[ch], order, colors, target_dt, groups)
+
+def render_channel_legend(order, colors, groups):
+    """사이드바 채널 색상 범례 (그룹별, 채널이 많으면 접어서 표시)"""
+    by_group = {}
+    for ch in order:
+        by_group.setdefault(groups.get(ch, ""), []).append(ch)
+
+    def swatches(channels):
+        return "<br>".join(
+            f"<span style='color:{colors[ch]}; font-size:1.2rem;'>●</span> <b>{ch}</b>" for ch in channels
+        )
+
+    target = st.expander(f"채널 {len(order)}개", expanded=False) if len(order) > CARDS_PER_ROW * 2 else st.container()
+    with target:
+        for group, channels in by_group.items():
+            if len(by_group) > 1:
+                st.markdown(f"**{group}**")
+            st.markdown(swatches(channels), unsafe_allow_html=True)
+
+def render_probability_tab(result):
+    """확률 탭 - 예측 샘플로 구한 기준 시청률 초과 확률 · 순위 확률 · 맞대결 확률 (예측일 + 7일)"""
+    st.markdown("### 🎲 예측 확률")
+    joint = result.get("samples")
+    if joint is None:
+        st.caption("이 결과에는 예측 샘플이 없습니다. '분석 실행'으로 다시 계산하세요.")
+        return
+
+    order, colors = result["order"], result["colors"]
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        threshold = st.number_input("기준 시청률 (%)", min_value=0.0, max_value=20.0, value=3.0, step=0.1,
+                                    format="%.1f", key="prob_threshold")
+    probs = get_joint_probabilities(result["fingerprint"], round(threshold, 3), result["target_dt"], joint)
+    dates, channels = probs["dates"], probs["channels"]
+    day_labels = [f"{d:%m/%d} ({'월화수목금토일'[d.dayofweek]})" for d in dates]
+    with col2:
+        mode = "시뮬레이션" if result["uncertainty_mode"] != "analytic" else "해석적 근사 정규분포"
+        st.caption(f"채널별 샘플 {probs['n_samples']:,}개 ({mode}) · 같은 샘플 번호끼리 묶어 채널 간 확률을 계산합니다")
+
+    # 기준 시청률 초과 확률 (채널 × 날짜)
+    st.markdown(f"#### 📈 시청률 {threshold:.1f}% 초과 확률")
+    exceed = probs["exceedance"] * 100
+    fig = go.Figure(go.Heatmap(
+        z=exceed.to_numpy(),
+        x=day_labels,
+        y=channels,
+        zmin=0,
+        zmax=100,
+        colorscale=[[0, 'rgba(26, 26, 46, 1)'], [0.5, '#7B2FF7'], [1, '#00D4FF']],
+        text=[[f"{v:.0f}%" for v in row] for row in exceed.to_numpy()],
+        texttemplate="%{text}",
+        hovertemplate=f'%{{y}}<br>%{{x}}<br>P(> {threshold:.1f}%): %{{z:.1f}}%<extra></extra>',
+        colorbar=dict(title="확률 (%)")
+    ))
+    fig.update_layout(
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        paper_bgcolor='rgba(0, 0, 0, 0)',
+        font=dict(color='white'),
+        height=max(250, 40 * len(channels) + 100),
+        yaxis=dict(autorange="reversed")
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # 순위 확률 (선택한 날짜)
+    st.markdown("#### 🏆 순위 확률")
+    day = st.selectbox("날짜", options=list(range(len(dates))), format_func=lambda i: day_labels[i],
+                       key="prob_rank_day")
+    n_ranks = min(len(channels), 5)
+    ranks = probs["ranks"][:, :n_ranks, day] * 100
+    table = pd.DataFrame(ranks, index=channels, columns=[f"{r + 1}위" for r in range(n_ranks)])
+    table = table.reindex([ch for ch in order if ch in table.index])
+    st.dataframe(table.style.format("{:.1f}%").background_gradient(cmap="Purples", vmin=0, vmax=100),
+                 use_container_width=True)
+
+    # 맞대결 확률
+    st.markdown("#### ⚔️ 맞대결 확률")
+    col1, col2 = st.columns(2)
+    with col1:
+        a = st.selectbox("채널 A", options=channels, index=0, key="prob_beat_a")
+    with col2:
+        b = st.selectbox("채널 B", options=channels, index=min(1, len(channels) - 1), key="prob_beat_b")
+    beat = probs["beats"][channels.index(a), channels.index(b)] * 100
+    fig = go.Figure(go.Bar(
+        x=day_labels,
+        y=beat,
+        marker_color=colors[a],
+        text=[f"{v:.0f}%" for v in beat],
+        textposition='outside',
+        hovertemplate=f'P({a} > {b})<br>%{{x}}: %{{y:.1f}}%<extra></extra>'
+    ))
+    fig.add_hline(y=50, line_dash="dash", line_color="rgba(255, 255, 255, 0.5)")
+    fig.update_layout(
+        yaxis_title=f"P({a} > {b}) (%)",
+        yaxis=dict(range=[0, 110], gridcolor='rgba(123, 47, 247, 0.2)'),
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        paper_bgcolor='rgba(0, 0, 0, 0)',
+        font=dict(color='white'),
+        height=350
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+BACKTEST_METRICS = {
+    "mae": "MAE (%p)",
+    "mape": "MAPE (%)",
+    "coverage_95": "95% 구간 적중률 (%)",
+    "coverage_90": "90% 구간 적중률 (%)"
+}
+
+# 실제 정확도 표에만 있는 지표
+ACCURACY_EXTRA_METRICS = {
+    "bias": "편향 (%p)",
+    "rmse": "RMSE (%p)",
+}
+
+def render_backtest_progress(key, job_id, data, channels):
+    """진행 중인 백테스트 작업 - 기준일 진행률, 끝나면 지표를 계산해 화면 전체를 다시 그림"""
+    from backtest import backtest_metrics
+
+    status = _job_queue().status(job_id)
+    if status is None or status["state"] in ("done", "failed"):
+        del st.session_state.backtest_job
+        if status is None:
+            st.session_state.backtest_notice = "❌ 백테스트 작업을 찾을 수 없습니다 (만료되었거나 삭제됨)"
+        elif status["state"] == "failed":
+            st.session_state.backtest_notice = f"❌ 백테스트 오류: {status['error']}"
+        else:
+            try:
+                predictions = load_backtest_result(job_id, _job_queue().jobs_dir)
+            except OSError:
+                st.session_state.backtest_notice = "❌ 백테스트 결과 파일을 읽을 수 없습니다"
+            else:
+                st.session_state.backtest = (key, backtest_metrics(predictions, data, channels))
+        st.rerun()
+
+    st.progress(status["progress"], text=f"🎯 {_job_label(status)}...")
+
+def render_backtest_tab(result):
+    """백테스트 탭 - 과거 기준일들에서 같은 설정으로 예측했을 때의 리드 타임별 정확도"""
+    from backtest import cutoff_dates, DEFAULT_INITIAL_DAYS, DEFAULT_PERIOD_DAYS, DEFAULT_HORIZON_DAYS
+
+    st.markdown("### 🎯 백테스트 (롤링 원점 교차검증)")
+    st.info("과거 기준일마다 그날까지의 데이터로 현재와 같은 설정의 모델을 학습하고, "
+            "이후 실제값과 비교해 리드 타임(예측 시점부터 며칠 뒤)별 정확도를 측정합니다. "
+            "기준일별 결과는 디스크에 캐싱되어 새 데이터가 추가되면 새 기준일만 계산합니다. "
+            "백테스트는 예측 작업과 같은 작업 큐에서 백그라운드로 실행됩니다.")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        initial = st.number_input("초기 학습 기간 (일)", min_value=60, max_value=1460,
+                                  value=DEFAULT_INITIAL_DAYS, step=30)
+    with col2:
+        period = st.number_input("기준일 간격 (일)", min_value=1, max_value=90,
+                                 value=DEFAULT_PERIOD_DAYS, step=1)
+    with col3:
+        horizon = st.number_input("예측 기간 (일)", min_value=1, max_value=180,
+                                  value=DEFAULT_HORIZON_DAYS, step=1)
+
+    data = result["data"]
+    n_cutoffs = len(cutoff_dates(data["날짜"], initial, period, horizon))
+    st.caption(f"기준일 {n_cutoffs}개 · 엔진: {ENGINE_LABELS[result['engine']]} · "
+               f"신뢰구간: {UNCERTAINTY_LABELS[result['uncertainty_mode']]}")
+
+    key = (result["data_fingerprint"], result["engine"], result["uncertainty_mode"], initial, period, horizon)
+    running = st.session_state.get("backtest_job")
+    if st.button("🎯 백테스트 실행", disabled=n_cutoffs == 0 or (running is not None and running[0] == key)):
+        request = {
+            "data": data, "holidays": result["holidays"], "channels": result["channels"],
+            "initial": initial, "period": period, "horizon": horizon,
+            "engine": result["engine"], "uncertainty_mode": result["uncertainty_mode"],
+            "training_policy": result.get("training_policy"), "training_days": result.get("training_days"),
+        }
+        job_key = (*key, result.get("training_policy"), result.get("training_days"))
+        try:
+            st.session_state.backtest_job = (key, submit_backtest(job_key, request, n_cutoffs))
+        except AdmissionError as e:
+            st.warning(f"⚠️ {e}")
+
+    notice = st.session_state.pop("backtest_notice", None)
+    if notice is not None:
+        st.error(notice)
+    running = st.session_state.get("backtest_job")
+    if running is not None and running[0] == key:
+        st.fragment(render_backtest_progress, run_every=JOB_POLL_SECONDS)(*running, data, result["channels"])
+        return
+
+    if n_cutoffs == 0:
+        st.warning("데이터가 초기 학습 기간 + 예측 기간보다 짧아 기준일이 없습니다.")
+        return
+    if "backtest" not in st.session_state or st.session_state.backtest[0] != key:
+        st.caption("👆 버튼을 눌러 백테스트를 실행하세요")
+        return
+
+    by_lead, summary = st.session_state.backtest[1]
+    render_accuracy_charts(by_lead, summary, result["colors"], result["order"], "backtest_metric")
+
+def render_accuracy_charts(by_lead, summary, colors, order, key):
+    """리드 타임별 정확도 차트 + 채널별 요약 표 (백테스트 / 실제 정확도 공용)"""
+    metric = st.radio("지표", options=list(BACKTEST_METRICS.keys()), horizontal=True,
+                      format_func=lambda x: BACKTEST_METRICS[x], key=key)
+    scale = 100 if metric.startswith("coverage") else 1
+
+    fig = go.Figure()
+    for ch in order:
+        ch_data = by_lead[by_lead["channel"] == ch]
+        fig.add_trace(go.Scatter(
+            x=ch_data["lead"],
+            y=ch_data[metric] * scale,
+            mode='lines+markers',
+            name=ch,
+            line=dict(color=colors[ch], width=2),
+            marker=dict(size=4),
+            hovertemplate=f'{ch}<br>%{{x}}일 후: %{{y:.3f}}<extra></extra>'
+        ))
+    if metric.startswith("coverage"):
+        nominal = 95 if metric == "coverage_95" else 90
+        fig.add_hline(y=nominal, line_dash="dash", line_color="rgba(255, 255, 255, 0.5)",
+                      annotation_text=f"목표 {nominal}%")
+
+    fig.update_layout(
+        xaxis_title="리드 타임 (일)",
+        yaxis_title=BACKTEST_METRICS[metric],
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        paper_bgcolor='rgba(0, 0, 0, 0)',
+        font=dict(color='white'),
+        height=400,
+        xaxis=dict(gridcolor='rgba(123, 47, 247, 0.2)'),
+        yaxis=dict(gridcolor='rgba(123, 47, 247, 0.2)')
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("### 📋 채널별 요약")
+    table = summary.set_index("channel").reindex([ch for ch in order if ch in set(summary["channel"])])
+    table["coverage_95"] *= 100
+    table["coverage_90"] *= 100
+    table = table.rename(columns={"n": "평가 건수", **BACKTEST_METRICS, **ACCURACY_EXTRA_METRICS}).round(3)
+    st.dataframe(table, use_container_width=True)
+
+def render_accuracy_tab(result):
+    """예측 정확도 탭 - 지난 실행들의 예측을 이후 들어온 실제값과 비교한 누적 정확도 (요약 표만 읽음)"""
+    st.markdown("### 📏 실제 예측 정확도")
+    st.info("예측을 실행할 때마다 결과가 기록되고, 시트에 새 실제값이 들어오면 그 날짜만 "
+            "과거 예측과 비교해 채널 · 리드 타임별 누적 정확도를 갱신합니다.")
+
+    try:
+        by_lead, summary = accuracy_summary(result["engine"])
+    except sqlite3.Error as e:
+        st.warning(f"정확도 기록을 읽을 수 없습니다: {e}")
+        return
+    if by_lead.empty:
+        st.caption("아직 실제값과 비교할 수 있는 과거 예측이 없습니다. 예측 이후 실제값이 들어오면 표시됩니다.")
+        return
+
+    st.caption(f"엔진: {ENGINE_LABELS[result['engine']]} · 평가 건수 {int(summary['n'].sum()):,}건")
+    render_accuracy_charts(by_lead, summary, result["colors"], result["order"], "accuracy_metric")
+
+
+def scenario_engine_for(settings, result):
+    """결과를 만든 학습 모델의 시나리오 엔진 (디스크에서 불러온 결과면 None)"""
+    entry = _scenario_store().get(settings)
+    if entry is None or entry[0] != result["fingerprint"]:
+        return None
+    return entry[1]
+
+def render_scenario_editor(scenario_engine):
+    """사이드바 시나리오 편집기 → ScenarioEngine.run 인자 dict (변경이 없으면 None)"""
+    with st.expander("🧪 What-if 시나리오", expanded=False):
+        if scenario_engine is None:
+            st.caption("학습된 모델이 메모리에 없습니다. '분석 실행'으로 다시 계산하면 사용할 수 있습니다.")
+            return None
+
+        fmt = lambda d: f"{d:%Y-%m-%d} ({'월화수목금토일'[d.dayofweek]})"
+        current = scenario_engine.holiday_dates()
+        horizon = [d for d in scenario_engine.sunset.index if d not in current]
+
+        add_dates = st.multiselect("공휴일로 지정할 날짜", options=horizon, format_func=fmt,
+                                   key="scenario_add_dates")
+        names = scenario_engine.holiday_names()
+        add_name = st.selectbox("적용할 공휴일 효과", options=names,
+                                index=names.index("new_year") if "new_year" in names else 0,
+                                disabled=not add_dates, key="scenario_add_name",
+                                help="학습된 공휴일 중 어떤 효과를 적용할지 선택합니다 (전후 기간 설정 포함)")
+        remove_dates = st.multiselect("공휴일에서 제외할 날짜", options=list(current),
+                                      format_func=lambda d: f"{fmt(d)} {current[d]}",
+                                      key="scenario_remove_dates")
+        if scenario_engine.supports_sunset:
+            sunset_shift = st.slider("일몰 시각 조정 (시간)", min_value=-1.0, max_value=1.0, value=0.0, step=0.25,
+                                     key="scenario_sunset_shift", help="예측 기간 전체의 일몰 시각을 앞당기거나 늦춥니다")
+        else:
+            sunset_shift = 0.0
+            st.caption("일몰 시각 조정은 Prophet 엔진 결과에서만 사용할 수 있습니다 "
+                       "(NumPy 엔진은 일몰 효과와 연간 계절성을 구분하지 못함)")
+
+        if not add_dates and not remove_dates and sunset_shift == 0:
+            return None
+        return {
+            "add_holidays": {d: add_name for d in add_dates},
+            "remove_holidays": remove_dates,
+            "sunset_shift": sunset_shift,
+        }
+
+def render_scenario_results(outputs, elapsed, colors, order, end_dt):
+    """시나리오 재예측 결과 - 기준 대비 변화 차트와 채널별 요약"""
+    st.markdown("### 🧪 What-if 시나리오 결과")
+    st.caption(f"학습된 모델로 재예측 ({elapsed * 1000:.0f}ms, 재학습 없음) · 점선: 기준 예측, 실선: 시나리오")
+
+    fig = go.Figure()
+    rows = []
+    for ch in order:
+        fc = outputs[ch][outputs[ch]["ds"] < end_dt]
+        fig.add_trace(go.Scatter(
+            x=fc["ds"], y=fc["baseline"], mode='lines', name=f"{ch} (기준)",
+            line=dict(color=colors[ch], width=1, dash='dot'), showlegend=False, hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=fc["ds"], y=fc["yhat"], mode='lines', name=ch,
+            line=dict(color=colors[ch], width=3),
+            customdata=fc["delta"],
+            hovertemplate='<b>%{fullData.name}</b><br>%{x|%Y-%m-%d}<br>시나리오: %{y:.3f}%'
+                          '<br>변화: %{customdata:+.3f}%p<extra></extra>'
+        ))
+
+        changed = fc[fc["delta"].abs() > 1e-9]
+        peak = changed.loc[changed["delta"].abs().idxmax()] if len(changed) else None
+        rows.append({
+            "채널": ch,
+            "변경된 날짜 수": len(changed),
+            "평균 변화 (%p)": round(float(changed["delta"].mean()), 3) if len(changed) else 0.0,
+            "최대 변화 날짜": peak["ds"].strftime("%Y-%m-%d") if peak is not None else "-",
+            "최대 변화 (%p)": round(float(peak["delta"]), 3) if peak is not None else 0.0,
+        })
+
+    fig.update_layout(
+        xaxis_title="날짜",
+        yaxis_title="시청률 (%)",
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        paper_bgcolor='rgba(0, 0, 0, 0)',
+        font=dict(color='white'),
+        height=400,
+        hovermode='x unified',
+        xaxis=dict(gridcolor='rgba(123, 47, 247, 0.2)'),
+        yaxis=dict(gridcolor='rgba(123, 47, 247, 0.2)')
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(pd.DataFrame(rows).set_index("채널"), use_container_width=True)
+
+def _format_age(seconds):
+    """경과 시간 표시 (방금 전 / N분 전 / N시간 전 / N일 전)"""
+    if seconds < 60:
+        return "방금 전"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}분 전"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)}시간 전"
+    return f"{int(seconds // 86400)}일 전"
+
+def latest_job_status(settings):
+    """설정의 마지막 예측 작업 상태 (없으면 None)"""
+    job_id = _job_queue().latest_job(settings)
+    return None if job_id is None else _job_queue().status(job_id)
+
+def render_freshness(settings, polling):
+    """결과 신선도 배지 - 갱신 중이면 주기적으로 다시 그리고, 새 결과가 준비되면 화면 전체를 교체"""
+    job = latest_job_status(settings)
+    if job is not None and job["state"] == "done":
+        adopt_job(job["job_id"])
+
+    shown = st.session_state.result
+    latest = load_last_result(*settings)
+    if latest is not None and latest["computed_at"] > shown["computed_at"]:
+        st.session_state.result = latest
+        st.rerun()
+
+    if polling and job is not None and job["state"] in ("done", "failed"):
+        # 갱신이 실패로 끝난 경우 - 폴링을 멈추도록 한 번 다시 실행
+        st.rerun()
+
+    age = time.time() - shown["computed_at"]
+    computed = datetime.fromtimestamp(shown["computed_at"]).strftime('%Y-%m-%d %H:%M')
+    badge = "🟢 최신 결과" if age < RESULT_TTL else "🟡 이전 결과"
+    status = ""
+    if job is not None and job["state"] in ("queued", "running"):
+        status = f" · 🔄 백그라운드에서 갱신 중 ({_job_label(job)} · {job['progress']:.0%})"
+    elif job is not None and job["state"] == "failed":
+        status = f" · ⚠️ 갱신 실패 ({job['error']}) - 이전 결과를 표시합니다"
+    st.caption(f"{badge} · {computed} 계산 ({_format_age(age)}){status}")
+
+def render_job_progress(job_id):
+    """진행 중인 예측 작업 - 단계별 진행률 + 먼저 끝난 채널 카드, 끝나면 결과로 화면 전체를 교체"""
+    status = _job_queue().status(job_id)
+    if status is None or status["state"] in ("done", "failed"):
+        if status is None:
+            st.session_state.job_notice = ("error", "❌ 작업을 찾을 수 없습니다 (만료되었거나 삭제됨)")
+        elif status["state"] == "failed":
+            st.session_state.job_notice = ("error", f"❌ 오류: {status['error']}")
+        else:
+            result = adopt_job(job_id)
+            if result is None:
+                st.session_state.job_notice = ("error", "❌ 작업 결과 파일을 읽을 수 없습니다")
+            else:
+                st.session_state.result = result
+                st.session_state.result_settings = tuple(status["settings"])
+                st.session_state.job_notice = ("success", "✅ 분석이 성공적으로 완료되었습니다!")
+        del st.query_params["job"]
+        st.rerun()
+
+    st.progress(status["progress"], text=f"🔮 {_job_label(status)}...")
+
+    # 자동 감지에서 건너뛴 채널 컬럼 등 채널 설정 경고 (결과가 나오면 결과 화면에서 다시 표시)
+    for note in status.get("channel_notes") or []:
+        st.warning(f"⚠️ {note}")
+
+    # 처음 실행이면 먼저 끝난 채널부터 카드 표시 (이전 결과가 있으면 결과 교체 전까지 그대로 둠)
+    predictions = status.get("predictions") or {}
+    if 'result' not in st.session_state and predictions:
+        dashboard = TodayDashboard(st.container())
+        target_dt = pd.Timestamp(status["target_dt"])
+        for ch in status["order"]:
+            if ch in predictions:
+                dashboard.update(ch, predictions[ch], status["order"], status["colors"], target_dt,
+                                 status["groups"])
+
 def main():
     # 헤더
-    st.markdown('<h1 class="main-title">📺 종편 4사 메인뉴스 시청률 Forecasting (전국)</h1>', unsafe_allow_html=True)
+    st.markdown(f'<h1 class="main-title">{APP_TITLE}</h1>', unsafe_allow_html=True)
     st.markdown('<p class="subtitle">Powered by Prophet - Meta\'s Time Series Forecasting</p>', unsafe_allow_html=True)
 
     # 사이드바 설정
@@ -425,22 +1086,47 @@ def main():
         predict_days = st.slider(
             "예측 기간 (일)",
             min_value=30,
-            max_value=180,
-            value=180,
-            step=30
+            max_value=MAX_PREDICT_DAYS,
+            value=MAX_PREDICT_DAYS,
+            step=30,
+            help="예측은 항상 최대 기간으로 계산되며, 기간을 바꾸면 재학습 없이 바로 반영됩니다"
+        )
+
+        engine = st.selectbox(
+            "예측 엔진",
+            options=list(ENGINE_LABELS.keys()),
+            format_func=lambda x: ENGINE_LABELS[x],
+            help="NumPy 릿지 엔진은 같은 모델 구조를 Stan 없이 수 밀리초 안에 풉니다 (신뢰구간은 해석적 근사)"
+        )
+
+        uncertainty_mode = st.selectbox(
+            "신뢰구간 계산",
+            options=list(UNCERTAINTY_LABELS.keys()),
+            format_func=lambda x: UNCERTAINTY_LABELS[x],
+            disabled=engine == "numpy",
+            help="샘플링 횟수를 줄이거나 해석적 근사를 쓰면 예측이 빨라집니다"
         )
+        if engine == "numpy":
+            uncertainty_mode = "analytic"
 
         st.markdown("---")
 
         if st.button("🚀 분석 실행", use_container_width=True):
             st.session_state.run_analysis = True
 
+        # 시나리오 편집기 자리 (결과가 정해진 뒤 채움)
+        scenario_slot = st.container()
+
         st.markdown("---")
         st.markdown("### 📊 채널 색상")
-        st.markdown("🔵 **News_A** - 파란색")
-        st.markdown("🟣 **JTBC** - 보라색")
-        st.markdown("🟠 **MBN** - 주황색")
-        st.markdown("🔴 **TVCHOSUN** - 빨간색")
+        if 'result' in st.session_state:
+            last = st.session_state.result
+            render_channel_legend(last["order"], last["colors"], last["groups"])
+        else:
+            registry = normalize_channels(load_channel_config()["channels"])
+            render_channel_legend([e["name"] for e in registry],
+                                  {e["name"]: e["color"] for e in registry},
+                                  {e["name"]: e["group"] for e in registry})
 
         st.markdown("---")
         st.markdown(f"**마지막 업데이트:** {datetime.now().strftime('%Y-%m-%d %H:%M')}")
@@ -508,22 +1194,53 @@ def main():
     if 'run_analysis' not in st.session_state:
         st.session_state.run_analysis = False
 
+    settings = (sheets_id, gid, uncertainty_mode, engine)
+    job_id = st.query_params.get("job")
+    if st.session_state.run_analysis or ('result' not in st.session_state and job_id is None):
+        # 마지막으로 계산된 결과가 있으면 네트워크를 기다리지 않고 바로 표시 (오래됐으면 백그라운드 갱신)
+        last = load_last_result(*settings)
+        if last is not None:
+            st.session_state.result = last
+            st.session_state.result_settings = settings
+            st.session_state.run_analysis = False
+            if is_stale(last):
+                try:
+                    submit_forecast(settings)
+                except AdmissionError:
+                    pass  # 진행 중인 작업이 끝난 뒤 다음 접속 때 갱신
+
     if st.session_state.run_analysis:
-        with st.spinner("🔮 데이터 로드 및 Prophet 모델 실행 중..."):
-            try:
-                result = load_and_forecast(sheets_id, gid, predict_days)
-                st.session_state.result = result
-                st.session_state.run_analysis = False
-                st.success("✅ 분석이 성공적으로 완료되었습니다!")
-            except Exception as e:
-                st.error(f"❌ 오류: {str(e)}")
-                return
+        # 작업 큐에 넣고 바로 반환 - 작업 ID를 주소에 남겨 새로고침해도 진행 상황을 이어서 표시
+        st.session_state.run_analysis = False
+        try:
+            job_id = submit_forecast(settings)
+            st.query_params["job"] = job_id
+        except AdmissionError as e:
+            st.warning(f"⚠️ {e}")
+
+    notice = st.session_state.pop("job_notice", None)
+    if notice is not None:
+        kind, message = notice
+        if kind == "error" and 'result' in st.session_state:
+            st.warning(f"{message} - 이전 결과를 표시합니다")
+        else:
+            getattr(st, kind)(message)
+
+    if job_id is not None:
+        st.fragment(render_job_progress, run_every=JOB_POLL_SECONDS)(job_id)
 
     if 'result' not in st.session_state:
-        st.info("👈 '분석 실행' 버튼을 클릭하여 예측을 시작하세요")
+        if job_id is None:
+            st.info("👈 '분석 실행' 버튼을 클릭하여 예측을 시작하세요")
         return
 
-    result = st.session_state.result
+    # 결과 신선도 표시 + 백그라운드 갱신이 끝나면 새 결과로 교체
+    shown_settings = st.session_state.result_settings
+    job = latest_job_status(shown_settings)
+    polling = job is not None and job["state"] in ("queued", "running")
+    st.fragment(render_freshness, run_every=REFRESH_POLL_SECONDS if polling else None)(shown_settings, polling)
+
+    result = slice_result(st.session_state.result, predict_days)
     predictions = result["predictions"]
     forecasts = result["forecasts"]
     target_dt = result["target_dt"]
@@ -531,33 +1248,27 @@ def main():
     data = result["data"]
     colors = result["colors"]
     order = result["order"]
-    holidays_df = result["holidays"]
+    components = result["components"]
+    component_stats = result["component_stats"]
+
+    # 자동 감지에서 건너뛴 채널 컬럼 등 채널 설정 경고
+    for note in result.get("channel_notes", []):
+        st.warning(f"⚠️ {note}")
 
     # 메인 대시보드
-    st.markdown("## 🎯 오늘의 예측")
-    st.markdown(f"**예측 날짜:** {target_dt.strftime('%Y-%m-%d')}")
-
-    # 메트릭 카드
-    cols = st.columns(4)
-    for i, ch in enumerate(order):
-        pred = predictions[ch]
-        with cols[i]:
-            st.markdown(f"""
-            <div class="metric-card">
-                <div class="metric-title">{ch}</div>
-                <div class="metric-value">{pred['forecast']:.3f}%</div>
-                <div class="metric-range">
-                    95% 신뢰구간: {pred['lower_95']:.3f} ~ {pred['upper_95']:.3f}<br>
-                    90% 신뢰구간: {pred['lower_90']:.3f} ~ {pred['upper_90']:.3f}
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-    # 대시보드 차트
-    st.plotly_chart(create_dashboard_chart(predictions, colors), use_container_width=True)
+    dashboard = TodayDashboard(st.container())
+    dashboard.render(predictions, order, colors, target_dt, result["groups"])
+
+    # What-if 시나리오 (학습된 모델 재사용)
+    scenario_engine = scenario_engine_for(shown_settings, st.session_state.result)
+    with scenario_slot:
+        scenario = render_scenario_editor(scenario_engine)
+    if scenario is not None:
+        outputs, elapsed = scenario_engine.run(**scenario)
+        render_scenario_results(outputs, elapsed, colors, order, target_dt + pd.Timedelta(days=predict_days))
 
     # 탭 구성
-    tabs = st.tabs(["📈 추세 분석", "🔍 구성요소", "📊 데이터 테이블", "📥 다운로드"])
+    tabs = st.tabs(["📈 추세 분석", "🔍 구성요소", "🎲 확률", "🎯 백테스트", "📏 정확도", "📊 데이터 테이블", "📥 다운로드"])
 
     # Tab 1: 추세 분석
     with tabs[0]:
@@ -583,8 +1294,18 @@ def main():
         # 영어 필터 이름을 한국어로 매핑
         day_filter_en = {"전체": "All", "주중": "Weekday", "주말": "Weekend"}[day_filter]
 
+        # 채널이 많으면 표시할 채널 선택
+        trend_order = order
+        if len(order) > MAX_TREND_CHANNELS:
+            trend_order = st.multiselect(
+                "표시 채널",
+                options=order,
+                default=order[:MAX_TREND_CHANNELS],
+                key="trend_channels"
+            )
+
         st.plotly_chart(
-            create_trend_chart(forecasts, colors, order, target_dt, days=trend_days, day_filter=day_filter_en),
+            create_trend_chart(forecasts, colors, trend_order, target_dt, days=trend_days, day_filter=day_filter_en),
             use_container_width=True
         )
 
@@ -706,26 +1427,23 @@ def main():
 
         component_channel = st.selectbox("구성요소 분석 채널 선택", order, key="component_channel")
 
-        fc = forecasts[component_channel]
+        # 구성요소는 forecaster에서 미리 계산된 테이블만 읽음
+        comp = components[component_channel]
+        comp_stats = component_stats[component_channel]
+        day_idx_to_kr = {0: "월", 1: "화", 2: "수", 3: "목", 4: "금", 5: "토", 6: "일"}
+        day_kr = comp["dayofweek"].map(day_idx_to_kr)
 
         # 1. Trend (추세)
         st.markdown("#### 📈 추세 - 장기 방향성")
 
-        # 요일 정보 추가
-        fc_with_day = fc.copy()
-        fc_with_day["dayofweek"] = pd.to_datetime(fc_with_day["ds"]).dt.day_name()
-        day_map = {"Monday": "월", "Tuesday": "화", "Wednesday": "수", "Thursday": "목",
-                   "Friday": "금", "Saturday": "토", "Sunday": "일"}
-        fc_with_day["day_kr"] = fc_with_day["dayofweek"].map(day_map)
-
         fig_trend = go.Figure()
         fig_trend.add_trace(go.Scatter(
-            x=fc_with_day["ds"],
-            y=fc_with_day["trend"],
+            x=comp["ds"],
+            y=comp["trend"],
             mode='lines',
             line=dict(color='#00d4ff', width=2),
             name='추세',
-            customdata=fc_with_day["day_kr"],
+            customdata=day_kr,
             hovertemplate='%{x|%Y-%m-%d} (%{customdata})<br>추세: %{y:.3f}%<extra></extra>'
         ))
         fig_trend.update_layout(
@@ -740,76 +1458,110 @@ def main():
         st.plotly_chart(fig_trend, use_container_width=True)
 
         # 2. Weekly Seasonality (주간 패턴)
-        if 'weekly' in fc.columns:
-            st.markdown("#### 📅 주간 계절성 - 요일별 패턴")
-
-            # 요일별로 그룹핑하여 평균 계산
-            fc_weekly = fc[["ds", "weekly"]].copy()
-            fc_weekly["dayofweek"] = pd.to_datetime(fc_weekly["ds"]).dt.dayofweek
-            fc_weekly["dayname"] = pd.to_datetime(fc_weekly["ds"]).dt.day_name()
-
-            # 요일별 평균 (월=0, 일=6)
-            weekly_avg = fc_weekly.groupby(["dayofweek", "dayname"])["weekly"].mean().reset_index()
-            weekly_avg = weekly_avg.sort_values("dayofweek")
-
-            # 한글 요일명
-            day_names_kr = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-            day_names_display = ["월", "화", "수", "목", "금", "토", "일"]
-
-            fig_weekly = go.Figure()
-            fig_weekly.add_trace(go.Bar(
-                x=day_names_display,
-                y=weekly_avg["weekly"],
-                marker=dict(
-                    color=weekly_avg["weekly"],
-                    colorscale='Purples',
-                    line=dict(color='#7b2ff7', width=2)
-                ),
-                text=[f"{v:+.3f}%p" for v in weekly_avg["weekly"]],
-                textposition='outside',
-                name='주간 효과'
-            ))
-
-            fig_weekly.update_layout(
-                plot_bgcolor='rgba(0, 0, 0, 0)',
-                paper_bgcolor='rgba(0, 0, 0, 0)',
-                font=dict(color='white'),
-                height=350,
-                margin=dict(l=20, r=20, t=20, b=20),
-                xaxis=dict(
-                    title="요일",
-                    gridcolor='rgba(123, 47, 247, 0.2)',
-                    tickfont=dict(size=12)
-                ),
-                yaxis=dict(
-                    title="시청률 영향 (%p)",
-                    gridcolor='rgba(123, 47, 247, 0.2)'
-                ),
-                showlegend=False
-            )
-            st.plotly_chart(fig_weekly, use_container_width=True)
+        st.markdown("#### 📅 주간 계절성 - 요일별 패턴")
+
+        # 요일별 평균 (월=0, 일=6)
+        weekly_by_dow = comp_stats["weekly_by_dow"]
+        day_names_display = ["월", "화", "수", "목", "금", "토", "일"]
+
+        fig_weekly = go.Figure()
+        fig_weekly.add_trace(go.Bar(
+            x=day_names_display,
+            y=weekly_by_dow,
+            marker=dict(
+                color=weekly_by_dow,
+                colorscale='Purples',
+                line=dict(color='#7b2ff7', width=2)
+            ),
+            text=[f"{v:+.3f}%p" for v in weekly_by_dow],
+            textposition='outside',
+            name='주간 효과'
+        ))
 
-            # 인사이트 표시
-            max_day = weekly_avg.loc[weekly_avg["weekly"].idxmax()]
-            min_day = weekly_avg.loc[weekly_avg["weekly"].idxmin()]
-            day_idx_to_kr = {0: "월", 1: "화", 2: "수", 3: "목", 4: "금", 5: "토", 6: "일"}
+        fig_weekly.update_layout(
+            plot_bgcolor='rgba(0, 0, 0, 0)',
+            paper_bgcolor='rgba(0, 0, 0, 0)',
+            font=dict(color='white'),
+            height=350,
+            margin=dict(l=20, r=20, t=20, b=20),
+            xaxis=dict(
+                title="요일",
+                gridcolor='rgba(123, 47, 247, 0.2)',
+                tickfont=dict(size=12)
+            ),
+            yaxis=dict(
+                title="시청률 영향 (%p)",
+                gridcolor='rgba(123, 47, 247, 0.2)'
+            ),
+            showlegend=False
+        )
+        st.plotly_chart(fig_weekly, use_container_width=True)
 
-            st.info(f"📌 **최고**: {day_idx_to_kr[max_day['dayofweek']]}요일 (+{max_day['weekly']:.3f}%) | **최저**: {day_idx_to_kr[min_day['dayofweek']]}요일 ({min_day['weekly']:+.3f}%)")
+        # 인사이트 표시
+        max_dow = comp_stats["weekly_max_dow"]
+        min_dow = comp_stats["weekly_min_dow"]
+        st.info(f"📌 **최고**: {day_idx_to_kr[max_dow]}요일 (+{weekly_by_dow[max_dow]:.3f}%) | **최저**: {day_idx_to_kr[min_dow]}요일 ({weekly_by_dow[min_dow]:+.3f}%)")
 
         # 3. Yearly Seasonality (연간 패턴)
-        if 'yearly' in fc.columns:
-            st.markdown("#### 🌍 연간 계절성 - 연중 패턴")
-            fig_yearly = go.Figure()
-            fig_yearly.add_trace(go.Scatter(
-                x=fc_with_day["ds"],
-                y=fc_with_day["yearly"],
-                mode='lines',
-                line=dict(color='#f107a3', width=2),
-                name='연간',
-                customdata=fc_with_day["day_kr"],
-                hovertemplate='%{x|%Y-%m-%d} (%{customdata})<br>효과: %{y:.3f}%<extra></extra>'
+        st.markdown("#### 🌍 연간 계절성 - 연중 패턴")
+        fig_yearly = go.Figure()
+        fig_yearly.add_trace(go.Scatter(
+            x=comp["ds"],
+            y=comp["yearly"],
+            mode='lines',
+            line=dict(color='#f107a3', width=2),
+            name='연간',
+            customdata=day_kr,
+            hovertemplate='%{x|%Y-%m-%d} (%{customdata})<br>효과: %{y:.3f}%<extra></extra>'
+        ))
+        fig_yearly.update_layout(
+            plot_bgcolor='rgba(0, 0, 0, 0)',
+            paper_bgcolor='rgba(0, 0, 0, 0)',
+            font=dict(color='white'),
+            height=300,
+            margin=dict(l=20, r=20, t=20, b=20),
+            xaxis=dict(gridcolor='rgba(123, 47, 247, 0.2)'),
+            yaxis=dict(gridcolor='rgba(123, 47, 247, 0.2)', title="효과")
+        )
+        st.plotly_chart(fig_yearly, use_container_width=True)
+
+        # 4. Holidays Effect (공휴일 효과)
+        st.markdown("#### 🎉 공휴일 효과")
+        # 공휴일 효과가 있는 날만 필터링
+        holidays_effect = comp[comp["holidays"].abs() > 0.001]
+        if len(holidays_effect) > 0:
+            # 한글 공휴일 이름 매핑
+            holiday_kr_names = {
+                "new_year": "신정",
+                "lunar_new_year": "설날",
+                "childrens_day": "어린이날",
+                "buddha_birthday": "부처님오신날",
+                "memorial_day": "현충일",
+                "liberation_day": "광복절",
+                "chuseok": "추석",
+                "national_day": "개천절",
+                "hangeul_day": "한글날",
+                "christmas": "크리스마스"
+            }
+
+            holiday_kr = holidays_effect["holiday_name"].apply(
+                lambda x: ", ".join([holiday_kr_names.get(h.strip(), h.strip()) for h in x.split(",")]) if x else "Unknown"
+            )
+            date_with_day = (holidays_effect["ds"].dt.strftime('%Y-%m-%d')
+                             + " (" + holidays_effect["dayofweek"].map(day_idx_to_kr) + ")")
+
+            fig_holidays = go.Figure()
+            fig_holidays.add_trace(go.Scatter(
+                x=holidays_effect["ds"],
+                y=holidays_effect["holidays"],
+                mode='markers',
+                marker=dict(color='#EDB120', size=10),
+                name='공휴일 효과',
+                text=holiday_kr,
+                customdata=date_with_day,
+                hovertemplate='<b>%{text}</b><br>%{customdata}<br>효과: %{y:+.3f}%<extra></extra>'
             ))
-            fig_yearly.update_layout(
+            fig_holidays.update_layout(
                 plot_bgcolor='rgba(0, 0, 0, 0)',
                 paper_bgcolor='rgba(0, 0, 0, 0)',
                 font=dict(color='white'),
@@ -818,115 +1570,24 @@ def main():
                 xaxis=dict(gridcolor='rgba(123, 47, 247, 0.2)'),
                 yaxis=dict(gridcolor='rgba(123, 47, 247, 0.2)', title="효과")
             )
-            st.plotly_chart(fig_yearly, use_container_width=True)
-
-        # 4. Holidays Effect (공휴일 효과)
-        if 'holidays' in fc.columns:
-            st.markdown("#### 🎉 공휴일 효과")
-            # 공휴일 효과가 있는 날만 필터링
-            holidays_effect = fc[fc['holidays'].abs() > 0.001].copy()
-            if len(holidays_effect) > 0:
-                # 공휴일 이름 매핑
-                holidays_effect["date_str"] = pd.to_datetime(holidays_effect["ds"]).dt.strftime('%Y-%m-%d')
-                holidays_lookup = holidays_df.copy()
-                holidays_lookup["ds_str"] = pd.to_datetime(holidays_lookup["ds"]).dt.strftime('%Y-%m-%d')
-
-                # 날짜별로 공휴일 이름 매핑 (window 고려)
-                holiday_names = []
-                for date_str in holidays_effect["date_str"]:
-                    date_obj = pd.to_datetime(date_str)
-                    # 해당 날짜와 전후 날짜 확인 (lower_window, upper_window 고려)
-                    matched_holidays = []
-                    for _, h in holidays_lookup.iterrows():
-                        h_date = pd.to_datetime(h["ds"])
-                        lower = h.get("lower_window", 0)
-                        upper = h.get("upper_window", 0)
-                        if h_date + pd.Timedelta(days=lower) <= date_obj <= h_date + pd.Timedelta(days=upper):
-                            matched_holidays.append(h["holiday"])
-
-                    if matched_holidays:
-                        holiday_names.append(", ".join(matched_holidays))
-                    else:
-                        holiday_names.append("Unknown")
-
-                holidays_effect["holiday_name"] = holiday_names
-
-                # 한글 공휴일 이름 매핑
-                holiday_kr_names = {
-                    "new_year": "신정",
-                    "lunar_new_year": "설날",
-                    "childrens_day": "어린이날",
-                    "buddha_birthday": "부처님오신날",
-                    "memorial_day": "현충일",
-                    "liberation_day": "광복절",
-                    "chuseok": "추석",
-                    "national_day": "개천절",
-                    "hangeul_day": "한글날",
-                    "christmas": "크리스마스"
-                }
-
-                holidays_effect["holiday_kr"] = holidays_effect["holiday_name"].apply(
-                    lambda x: ", ".join([holiday_kr_names.get(h.strip(), h.strip()) for h in x.split(",")])
-                )
-
-                # 요일 추가
-                holidays_effect["dayofweek"] = pd.to_datetime(holidays_effect["ds"]).dt.day_name()
-                day_names_kr_map = {
-                    "Monday": "월", "Tuesday": "화", "Wednesday": "수", "Thursday": "목",
-                    "Friday": "금", "Saturday": "토", "Sunday": "일"
-                }
-                holidays_effect["dayofweek_kr"] = holidays_effect["dayofweek"].map(day_names_kr_map)
-                holidays_effect["date_with_day"] = pd.to_datetime(holidays_effect["ds"]).dt.strftime('%Y-%m-%d') + " (" + holidays_effect["dayofweek_kr"] + ")"
-
-                fig_holidays = go.Figure()
-                fig_holidays.add_trace(go.Scatter(
-                    x=holidays_effect["ds"],
-                    y=holidays_effect["holidays"],
-                    mode='markers',
-                    marker=dict(color='#EDB120', size=10),
-                    name='공휴일 효과',
-                    text=holidays_effect["holiday_kr"],
-                    customdata=holidays_effect["date_with_day"],
-                    hovertemplate='<b>%{text}</b><br>%{customdata}<br>효과: %{y:+.3f}%<extra></extra>'
-                ))
-                fig_holidays.update_layout(
-                    plot_bgcolor='rgba(0, 0, 0, 0)',
-                    paper_bgcolor='rgba(0, 0, 0, 0)',
-                    font=dict(color='white'),
-                    height=300,
-                    margin=dict(l=20, r=20, t=20, b=20),
-                    xaxis=dict(gridcolor='rgba(123, 47, 247, 0.2)'),
-                    yaxis=dict(gridcolor='rgba(123, 47, 247, 0.2)', title="효과")
-                )
-                st.plotly_chart(fig_holidays, use_container_width=True)
-            else:
-                st.info("예측 기간에 유의미한 공휴일 효과가 없습니다.")
+            st.plotly_chart(fig_holidays, use_container_width=True)
+        else:
+            st.info("예측 기간에 유의미한 공휴일 효과가 없습니다.")
 
         # 5. Sunset Time Effect (일몰 시각 효과)
         st.markdown("#### 🌅 일몰 시각 - 일몰 타이밍의 영향")
 
-        # 일몰 효과 계산
-        sunset_effect = fc["yhat"].copy()
-        if 'trend' in fc.columns:
-            sunset_effect = sunset_effect - fc["trend"]
-        if 'weekly' in fc.columns:
-            sunset_effect = sunset_effect - fc["weekly"]
-        if 'yearly' in fc.columns:
-            sunset_effect = sunset_effect - fc["yearly"]
-        if 'holidays' in fc.columns:
-            sunset_effect = sunset_effect - fc["holidays"]
-
-        # 일몰 효과 시계열 차트
+        # 일몰 효과 시계열 차트 (sunset_time 회귀변수 기여분)
         fig_sunset_effect = go.Figure()
         fig_sunset_effect.add_trace(go.Scatter(
-            x=fc_with_day["ds"],
-            y=sunset_effect,
+            x=comp["ds"],
+            y=comp["sunset_effect"],
             mode='lines',
             line=dict(color='#FFA500', width=2),
             fill='tonexty',
             fillcolor='rgba(255, 165, 0, 0.2)',
             name='일몰 효과',
-            customdata=fc_with_day[["day_kr", "sunset_time"]],
+            customdata=list(zip(day_kr, comp["sunset_hour"])),
             hovertemplate='%{x|%Y-%m-%d} (%{customdata[0]})<br>일몰 시각: %{customdata[1]:.1f}시<br>시청률 효과: %{y:+.3f}%p<extra></extra>'
         ))
 
@@ -965,8 +1626,8 @@ def main():
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            trend_start = fc["trend"].iloc[0]
-            trend_end = fc["trend"].iloc[-1]
+            trend_start = comp_stats["trend_start"]
+            trend_end = comp_stats["trend_end"]
             trend_change = trend_end - trend_start
             st.metric(
                 "추세 변화",
@@ -976,42 +1637,32 @@ def main():
             )
 
         with col2:
-            if 'weekly' in fc.columns:
-                weekly_range = fc["weekly"].max() - fc["weekly"].min()
-                st.metric(
-                    "주간 변동폭",
-                    f"±{weekly_range/2:.3f}%"
-                )
+            st.metric(
+                "주간 변동폭",
+                f"±{comp_stats['weekly_range']/2:.3f}%"
+            )
 
         with col3:
-            # 일몰 효과 계산 (이미 위에서 계산됨)
-            if 'sunset_time' in fc.columns:
-                # 실제 일몰 시각 범위
-                actual_sunset_min = fc["sunset_time"].min()
-                actual_sunset_max = fc["sunset_time"].max()
-
-                # 일몰 효과 (시청률에 미치는 영향)
-                sunset_effect_calc = fc["yhat"].copy()
-                if 'trend' in fc.columns:
-                    sunset_effect_calc = sunset_effect_calc - fc["trend"]
-                if 'weekly' in fc.columns:
-                    sunset_effect_calc = sunset_effect_calc - fc["weekly"]
-                if 'yearly' in fc.columns:
-                    sunset_effect_calc = sunset_effect_calc - fc["yearly"]
-                if 'holidays' in fc.columns:
-                    sunset_effect_calc = sunset_effect_calc - fc["holidays"]
-
-                effect_range = sunset_effect_calc.max() - sunset_effect_calc.min()
-                st.metric(
-                    "일몰 효과 범위",
-                    f"±{effect_range/2:.3f}%",
-                    help=f"일몰 시각: {actual_sunset_min:.1f}시~{actual_sunset_max:.1f}시 (시청률 영향)"
-                )
-            else:
-                st.metric("일몰 효과", f"±{sunset_effect.std():.3f}%")
+            st.metric(
+                "일몰 효과 범위",
+                f"±{comp_stats['sunset_effect_range']/2:.3f}%",
+                help=f"일몰 시각: {comp_stats['sunset_hour_min']:.1f}시~{comp_stats['sunset_hour_max']:.1f}시 (시청률 영향)"
+            )
 
-    # Tab 3: 데이터 테이블
+    # Tab 3: 확률
     with tabs[2]:
+        render_probability_tab(result)
+
+    # Tab 4: 백테스트
+    with tabs[3]:
+        render_backtest_tab(result)
+
+    # Tab 5: 정확도
+    with tabs[4]:
+        render_accuracy_tab(result)
+
+    # Tab 6: 데이터 테이블
+    with tabs[5]:
         st.markdown("### 📊 예측 데이터 테이블")
 
         col1, col2 = st.columns(2)
@@ -1059,48 +1710,96 @@ def main():
 
         # 통계 요약
         st.markdown("### 📈 통계 요약")
-        summary_cols = st.columns(4)
-
         for i, ch in enumerate(filter_channel):
+            if i % CARDS_PER_ROW == 0:
+                summary_cols = st.columns(CARDS_PER_ROW)
             ch_data = filtered_df[filtered_df["Channel"] == ch]
-            with summary_cols[i % 4]:
+            with summary_cols[i % CARDS_PER_ROW]:
                 st.metric(
                     label=ch,
                     value=f"{ch_data['Forecast'].mean():.3f}%",
                     delta=f"±{ch_data['Forecast'].std():.3f}"
                 )
 
-    # Tab 4: 다운로드
-    with tabs[3]:
+    # Tab 7: 다운로드
+    with tabs[6]:
         st.markdown("### 📥 결과 다운로드")
 
         col1, col2 = st.columns(2)
 
+        artifacts = get_export_artifacts(result["fingerprint"], forecast_df, target_dt, order)
+        date_tag = target_dt.strftime('%Y%m%d')
+
         with col1:
             st.markdown("#### CSV 파일")
 
             # 오늘 예측
-            today_csv = forecast_df[forecast_df["Date"] == target_dt.strftime("%Y-%m-%d")].to_csv(index=False)
             st.download_button(
                 label="📄 오늘 예측 다운로드",
-                data=today_csv,
-                file_name=f"forecast_today_{target_dt.strftime('%Y%m%d')}.csv",
+                data=artifacts["today_csv"],
+                file_name=f"forecast_today_{date_tag}.csv",
                 mime="text/csv",
                 use_container_width=True
             )
 
             # 전체 예측
-            full_csv = forecast_df.to_csv(index=False)
             st.download_button(
                 label=f"📄 전체 예측 다운로드 ({predict_days}일)",
-                data=full_csv,
-                file_name=f"forecast_{predict_days}days_{target_dt.strftime('%Y%m%d')}.csv",
+                data=artifacts["full_csv"],
+                file_name=f"forecast_{predict_days}days_{date_tag}.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+
+            st.markdown("#### 압축 / 기타 형식")
+
+            st.download_button(
+                label="🗜️ 전체 예측 (CSV.gz)",
+                data=artifacts["full_csv_gz"],
+                file_name=f"forecast_{predict_days}days_{date_tag}.csv.gz",
+                mime="application/gzip",
+                use_container_width=True
+            )
+
+            if "parquet" in artifacts:
+                st.download_button(
+                    label="📦 전체 예측 (Parquet)",
+                    data=artifacts["parquet"],
+                    file_name=f"forecast_{predict_days}days_{date_tag}.parquet",
+                    mime="application/octet-stream",
+                    use_container_width=True
+                )
+
+            st.download_button(
+                label="🧮 채널 × 날짜 표 (CSV)",
+                data=artifacts["wide_csv"],
+                file_name=f"forecast_wide_{predict_days}days_{date_tag}.csv",
                 mime="text/csv",
                 use_container_width=True
             )
 
         with col2:
             st.markdown("#### 데이터 정보")
+            mc_errors = [e for e in result["interval_mc_error"].values() if e is not None]
+            mc_error_text = f" (몬테카를로 오차 ±{max(mc_errors):.3f}%p)" if mc_errors else ""
+            tuned = result["tuned_channels"]
+            tuned_text = f"채널별 튜닝 적용 ({', '.join(tuned)})" if tuned else "기본값"
+            reused = result.get("reused_channels", [])
+            refit = [ch for ch in order if ch not in reused]
+            refit_text = (f"{len(refit)}개 채널 ({', '.join(refit)}) - 나머지는 바뀌지 않아 이전 학습 결과 재사용"
+                          if reused else "전체 채널")
+            from forecaster import THIN_STEP_DAYS
+
+            policy, window = result.get("training_policy", "full"), result.get("training_days")
+            training_text = {
+                "window": f"최근 {window}일",
+                "thin": f"최근 {window}일 + 이전 기간은 {THIN_STEP_DAYS}일 간격",
+                "full": "전체 기간",
+            }[policy]
+            sizes = result.get("model_bytes", {})
+            memory_text = (f"{sum(s['slim'] for s in sizes.values()) / 1024:,.0f}KB "
+                           f"(학습 직후 {sum(s['full'] for s in sizes.values()) / 1024:,.0f}KB)"
+                           if sizes else "-")
             st.info(f"""
             **데이터 기간:** {data['날짜'].min().strftime('%Y-%m-%d')} ~ {data['날짜'].max().strftime('%Y-%m-%d')}
 
@@ -1111,6 +1810,18 @@ def main():
             **예측 일수:** {predict_days}
 
             **채널 수:** {len(order)}
+
+            **예측 엔진:** {ENGINE_LABELS[result["engine"]]}
+
+            **신뢰구간 계산:** {UNCERTAINTY_LABELS[result["uncertainty_mode"]]}{mc_error_text}
+
+            **모델 설정:** {tuned_text}
+
+            **학습 구간:** {training_text}
+
+            **새로 학습:** {refit_text}
+
+            **모델 보관 크기:** {memory_text}
             """)
 
     # Footer
@@ -0,0 +1,134 @@
+# ============================================================
+# 예측 실행 기록 (SQLite)
+# ============================================================
+#
+# 실행할 때마다 get_forecast_dataframe 결과를 실행 시각, 데이터 지문, 모델 설정과 함께
+# 공유 캐시 디렉토리(shared_cache.CACHE_DIR)의 SQLite 파일에 쌓아 둡니다 (레플리카가 함께 씀). (채널, 예측 대상일, 실행일) 인덱스로
+# "X일에 대해 리드 타임별로 무엇을 예측했었나"를 과거 모델을 다시 돌리지 않고 조회합니다.
+#
+# run_date는 실행 기준일(target_dt), target_date는 예측 대상일, lead는 둘의 차이(일)입니다.
+
+import os
+import json
+import sqlite3
+import hashlib
+from datetime import datetime
+from contextlib import contextmanager
+
+import pandas as pd
+
+from shared_cache import CACHE_DIR
+
+ARCHIVE_PATH = os.path.join(CACHE_DIR, "forecast_archive.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    run_at TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    data_fingerprint TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    uncertainty_mode TEXT NOT NULL,
+    model_config TEXT NOT NULL,
+    UNIQUE (run_date, fingerprint, config_hash)
+);
+CREATE TABLE IF NOT EXISTS forecasts (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    channel TEXT NOT NULL,
+    target_date TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    lead INTEGER NOT NULL,
+    forecast REAL,
+    lower_95 REAL,
+    upper_95 REAL,
+    lower_90 REAL,
+    upper_90 REAL,
+    PRIMARY KEY (run_id, channel, target_date)
+);
+CREATE INDEX IF NOT EXISTS idx_forecasts_lookup ON forecasts (channel, target_date, run_date);
+CREATE INDEX IF NOT EXISTS idx_forecasts_target ON forecasts (target_date, run_date);
+"""
+
+# get_forecast_dataframe 컬럼 → 기록 컬럼
+VALUE_COLUMNS = {
+    "Forecast": "forecast",
+    "Lower_95": "lower_95",
+    "Upper_95": "upper_95",
+    "Lower_90": "lower_90",
+    "Upper_90": "upper_90",
+}
+
+
+@contextmanager
+def connect(path=ARCHIVE_PATH):
+    """기록 DB 연결 - 블록 하나가 트랜잭션 하나 (테이블/인덱스가 없으면 생성)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")  # 기록 중에도 조회 가능
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def archive_run(forecast_df, run_date, fingerprint, data_fingerprint, model_config, path=ARCHIVE_PATH):
+    """실행 하나를 한 트랜잭션으로 기록 → run_id (같은 기준일·결과·설정이 이미 있으면 None)
+
+    model_config: {"engine", "uncertainty_mode", ...} 형태의 JSON 직렬화 가능한 dict
+    """
+    config = json.dumps(model_config, sort_keys=True, ensure_ascii=False, default=str)
+    run_date = pd.Timestamp(run_date).strftime("%Y-%m-%d")
+
+    frame = forecast_df.rename(columns={"Channel": "channel", "Date": "target_date", **VALUE_COLUMNS})
+    lead = (pd.to_datetime(frame["target_date"]) - pd.Timestamp(run_date)).dt.days
+
+    with connect(path) as conn:
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO runs (run_at, run_date, fingerprint, data_fingerprint, config_hash, "
+            "engine, uncertainty_mode, model_config) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (datetime.now().isoformat(timespec="seconds"), run_date, fingerprint, data_fingerprint,
+             hashlib.sha1(config.encode("utf-8")).hexdigest()[:16], model_config.get("engine", ""),
+             model_config.get("uncertainty_mode", ""), config)
+        )
+        if cur.rowcount == 0:
+            return None
+        run_id = cur.lastrowid
+
+        # 행 단위 INSERT 대신 executemany 한 번으로 일괄 기록
+        rows = zip(
+            [run_id] * len(frame), frame["channel"], frame["target_date"], [run_date] * len(frame),
+            lead.astype(int).tolist(), *(frame[col].astype(float).tolist() for col in VALUE_COLUMNS.values())
+        )
+        conn.executemany(
+            "INSERT INTO forecasts (run_id, channel, target_date, run_date, lead, forecast, "
+            "lower_95, upper_95, lower_90, upper_90) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+    return run_id
+
+
+def forecasts_for(target_date, channel=None, path=ARCHIVE_PATH):
+    """예측 대상일 하나에 대해 실행일(리드 타임)별로 기록된 예측 → DataFrame"""
+    where, params = "target_date = ?", [pd.Timestamp(target_date).strftime("%Y-%m-%d")]
+    if channel is not None:
+        where, params = "channel = ? AND " + where, [channel, *params]
+    query = (
+        "SELECT channel, run_date, lead, forecast, lower_95, upper_95, lower_90, upper_90, run_id "
+        f"FROM forecasts WHERE {where} ORDER BY channel, run_date, run_id"
+    )
+    with connect(path) as conn:
+        return pd.read_sql_query(query, conn, params=params)
+
+
+def list_runs(path=ARCHIVE_PATH):
+    """기록된 실행 목록 (최근 순)"""
+    with connect(path) as conn:
+        return pd.read_sql_query(
+            "SELECT run_id, run_at, run_date, engine, uncertainty_mode, fingerprint, data_fingerprint "
+            "FROM runs ORDER BY run_id DESC", conn
+        )
@@ -0,0 +1,189 @@
+# ============================================================
+# 롤링 원점 백테스트 (과거 예측 정확도 측정)
+# ============================================================
+#
+# 데이터 시작일 + initial일부터 period일 간격으로 기준일(cutoff)을 잡고,
+# 기준일까지의 데이터로 run_forecast와 같은 설정의 모델을 학습해 이후 horizon일을
+# 예측한 뒤 실제값과 비교합니다. 기준일은 데이터 시작일에 고정되어 있어 데이터가
+# 하루 늘면 새 기준일만 추가되고, 기준일별 예측은 학습 데이터 지문으로 디스크에 캐싱됩니다.
+
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from shared_cache import CACHE_DIR, write_atomic
+
+BACKTEST_CACHE_DIR = os.path.join(CACHE_DIR, "backtest")
+
+# 캐시 형식이 바뀌면 올려서 이전 결과 무효화
+BACKTEST_CACHE_VERSION = 2
+
+DEFAULT_INITIAL_DAYS = 365
+DEFAULT_PERIOD_DAYS = 7
+DEFAULT_HORIZON_DAYS = 30
+
+PREDICTION_COLUMNS = ["yhat", "yhat_lower", "yhat_upper", "yhat_lower_90", "yhat_upper_90"]
+
+
+def cutoff_dates(dates, initial=DEFAULT_INITIAL_DAYS, period=DEFAULT_PERIOD_DAYS,
+                 horizon=DEFAULT_HORIZON_DAYS):
+    """데이터 시작일에 고정된 기준일 목록 (이후 horizon일의 실제값이 모두 있는 기준일만)"""
+    dates = pd.to_datetime(pd.Series(dates)).dropna()
+    if dates.empty:
+        return []
+    first = dates.min().normalize() + pd.Timedelta(days=initial - 1)
+    last = dates.max().normalize() - pd.Timedelta(days=horizon)
+    if last < first:
+        return []
+    return list(pd.date_range(first, last, freq=f"{period}D"))
+
+
+def _cutoff_key(train, holidays, cutoff, horizon, settings):
+    """기준일 예측 캐시 키 (학습 데이터 + 공휴일 + 모델 설정 지문)"""
+    h = hashlib.sha1()
+    h.update(pd.util.hash_pandas_object(train, index=False).to_numpy().tobytes())
+    if holidays is not None:
+        h.update(pd.util.hash_pandas_object(holidays, index=False).to_numpy().tobytes())
+    meta = {"cutoff": cutoff, "horizon": horizon, "version": BACKTEST_CACHE_VERSION, **settings}
+    h.update(json.dumps(meta, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()[:20]
+
+
+def forecast_cutoff(train, holidays, channels, cutoff, horizon, settings):
+    """기준일 하나: 학습 후 horizon일 예측 → 채널별 예측 행 (프로세스 풀 작업 단위)"""
+    from forecaster import NewsViewershipForecaster, DEFAULT_TRAINING_POLICY, TRAINING_WINDOW_DAYS
+
+    forecaster = NewsViewershipForecaster(
+        "", uncertainty_mode=settings["uncertainty_mode"],
+        uncertainty_samples=settings["uncertainty_samples"], engine=settings["engine"],
+        model_params=settings["model_params"], max_workers=1,  # 기준일 단위로 이미 프로세스 병렬
+        training_policy=settings.get("training_policy", DEFAULT_TRAINING_POLICY),
+        training_days=settings.get("training_days", TRAINING_WINDOW_DAYS)
+    )
+    forecaster.channels = dict(channels)
+    forecaster.df = train
+    forecaster.holidays = holidays
+
+    # 기준일 전후 결측이 있어도 기준일 + horizon까지 예측되도록 기간 계산
+    end_dt = cutoff + pd.Timedelta(days=horizon)
+    forecaster.run_forecast((end_dt - train["날짜"].max()).days, history_context=0)
+
+    frames = []
+    for en, fc in forecaster.forecasts.items():
+        part = fc[(fc["ds"] > cutoff) & (fc["ds"] <= end_dt)]
+        frame = pd.DataFrame({
+            "channel": en,
+            "cutoff": cutoff,
+            "ds": part["ds"].to_numpy(),
+            "lead": (part["ds"] - cutoff).dt.days.to_numpy(),
+        })
+        for col in PREDICTION_COLUMNS:
+            frame[col] = part[col].to_numpy()
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _write_cache(path, frame):
+    """임시 파일에 쓴 뒤 교체 (동시 실행 중 반쯤 쓰인 파일을 읽지 않도록)"""
+    write_atomic(path, frame.to_pickle)
+
+
+def run_backtest(df, holidays, channels, initial=DEFAULT_INITIAL_DAYS, period=DEFAULT_PERIOD_DAYS,
+                 horizon=DEFAULT_HORIZON_DAYS, engine="prophet", uncertainty_mode="full",
+                 uncertainty_samples=None, model_params=None, max_workers=None,
+                 cache_dir=BACKTEST_CACHE_DIR, on_progress=None, training_policy=None, training_days=None):
+    """롤링 원점 백테스트 → 기준일별 예측 DataFrame
+
+    channels: {시트 컬럼명: 채널명}, model_params: {채널명: 파라미터} (None이면 튜닝 결과 파일).
+    training_policy / training_days: 기준일마다 적용할 학습 구간 정책 (None이면 forecaster 기본값).
+    캐시에 없는 기준일만 프로세스 풀에서 학습하며, on_progress(완료 수, 전체 수)가
+    주어지면 기준일 하나가 끝날 때마다 호출됩니다.
+    """
+    from forecaster import (DEFAULT_UNCERTAINTY_SAMPLES, DEFAULT_TRAINING_POLICY, MODEL_PARAMS, TRAINING_WINDOW_DAYS,
+                            load_tuned_params)
+
+    if uncertainty_samples is None:
+        uncertainty_samples = DEFAULT_UNCERTAINTY_SAMPLES[uncertainty_mode]
+    if model_params is None:
+        model_params = load_tuned_params()
+    settings = {
+        "engine": engine,
+        "uncertainty_mode": uncertainty_mode,
+        "uncertainty_samples": uncertainty_samples,
+        # 캐시 키와 실제 학습이 같은 설정을 쓰도록 채널별로 확정해서 전달
+        "model_params": {en: {**MODEL_PARAMS, **model_params.get(en, {})} for en in channels.values()},
+        "channels": channels,
+        "training_policy": training_policy or DEFAULT_TRAINING_POLICY,
+        "training_days": training_days or TRAINING_WINDOW_DAYS,
+    }
+
+    data = df[["날짜", *channels.keys(), "sunset_time"]].dropna(subset=["날짜"])
+    cutoffs = cutoff_dates(data["날짜"], initial, period, horizon)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    results, pending = {}, {}
+    for cutoff in cutoffs:
+        train = data[data["날짜"] <= cutoff].reset_index(drop=True)
+        path = os.path.join(cache_dir, f"{_cutoff_key(train, holidays, cutoff, horizon, settings)}.pkl")
+        if os.path.exists(path):
+            results[cutoff] = pd.read_pickle(path)
+        else:
+            pending[cutoff] = (train, path)
+
+    total, done = len(cutoffs), len(results)
+    if on_progress is not None:
+        on_progress(done, total)
+
+    def finish(cutoff, frame):
+        nonlocal done
+        _write_cache(pending[cutoff][1], frame)
+        results[cutoff] = frame
+        done += 1
+        if on_progress is not None:
+            on_progress(done, total)
+
+    # 새 기준일이 하나뿐이면 (매일 갱신) 프로세스를 띄우지 않고 바로 계산
+    if len(pending) == 1:
+        cutoff, (train, _) = next(iter(pending.items()))
+        finish(cutoff, forecast_cutoff(train, holidays, channels, cutoff, horizon, settings))
+    elif pending:
+        workers = min(len(pending), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = {
+                pool.submit(forecast_cutoff, train, holidays, channels, cutoff, horizon, settings): cutoff
+                for cutoff, (train, _) in pending.items()
+            }
+            for job in as_completed(jobs):
+                finish(jobs[job], job.result())
+
+    if not results:
+        return pd.DataFrame(columns=["channel", "cutoff", "ds", "lead", *PREDICTION_COLUMNS])
+    return pd.concat([results[c] for c in cutoffs], ignore_index=True)
+
+
+def backtest_metrics(predictions, df, channels):
+    """리드 타임별 / 채널별 MAE · MAPE(%) · 90%/95% 구간 적중률 → (리드 타임별 표, 채널 요약 표)"""
+    actual = df.melt(id_vars="날짜", value_vars=list(channels), var_name="column", value_name="y")
+    actual["channel"] = actual["column"].map(channels)
+    actual = actual.rename(columns={"날짜": "ds"}).dropna(subset=["ds", "y"])
+    actual["ds"] = pd.to_datetime(actual["ds"]).dt.normalize()
+
+    merged = predictions.merge(actual[["channel", "ds", "y"]], on=["channel", "ds"])
+    merged["abs_error"] = (merged["yhat"] - merged["y"]).abs()
+    merged["ape"] = merged["abs_error"] / merged["y"].where(merged["y"] > 0) * 100
+    merged["in_95"] = (merged["y"] >= merged["yhat_lower"]) & (merged["y"] <= merged["yhat_upper"])
+    merged["in_90"] = (merged["y"] >= merged["yhat_lower_90"]) & (merged["y"] <= merged["yhat_upper_90"])
+
+    agg = {
+        "n": ("y", "size"),
+        "mae": ("abs_error", "mean"),
+        "mape": ("ape", "mean"),
+        "coverage_95": ("in_95", "mean"),
+        "coverage_90": ("in_90", "mean"),
+    }
+    by_lead = merged.groupby(["channel", "lead"]).agg(**agg).reset_index()
+    summary = merged.groupby("channel").agg(**agg).reset_index()
+    return by_lead, summary
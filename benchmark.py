@@ -0,0 +1,404 @@
+"""성능 벤치마크 스크립트
+
+사용법:
+    python benchmark.py uncertainty [--sheets-id ID] [--gid 0] [--days 180]
+    python benchmark.py engine [--days 180]
+    python benchmark.py features [--days 180] [--synthetic]
+    python benchmark.py backtest [--initial 365] [--period 7] [--horizon 30] [--workers N]
+    python benchmark.py fetch --gids 0,123,456
+    python benchmark.py archive [--runs 365] [--db bench_archive.db]
+    python benchmark.py models [--days 180] [--uncertainty reduced]
+    python benchmark.py window [--windows 365,730,1095] [--thin-days 365] [--initial 730] [--period 30]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from fast_engine import RidgeForecastEngine
+from channel_registry import DEFAULT_CHANNELS
+from forecaster import (NewsViewershipForecaster, UNCERTAINTY_MODES, DEFAULT_UNCERTAINTY_SAMPLES, MODEL_PARAMS,
+                        ENGINES, DEFAULT_TRAINING_POLICY, TRAINING_WINDOW_DAYS, training_rows)
+
+DEFAULT_SHEETS_ID = "1uv9gNT9TDEu2qtPPOnQlhiznnb4lxmogwQFWmQbclIc"
+
+
+def load_forecaster(args, **kwargs):
+    """시트 로드 + 공휴일 준비가 끝난 forecaster 반환"""
+    forecaster = NewsViewershipForecaster(args.sheets_id, args.gid, **kwargs)
+    forecaster.prepare()
+    return forecaster
+
+
+def synthetic_forecaster(n_days=900, seed=0, end="2025-10-01", **kwargs):
+    """네트워크 없이 쓰는 forecaster - 기본 채널의 합성 시청률(주간 · 연간 패턴 + 잡음)과 공휴일을 직접 채움"""
+    config = {"auto_detect": False, "channels": [dict(c) for c in DEFAULT_CHANNELS]}
+    forecaster = NewsViewershipForecaster("", channel_config=config, **kwargs)
+
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=end, periods=n_days)
+    df = pd.DataFrame({"날짜": dates})
+    for i, column in enumerate(forecaster.channels):
+        df[column] = (2 + 0.5 * i + 0.3 * np.sin(2 * np.pi * dates.dayofweek / 7)
+                      + 0.2 * np.sin(2 * np.pi * dates.dayofyear / 365.25) + rng.normal(0, 0.15, n_days))
+    df["sunset_time"] = forecaster.sunset_for(dates)
+    forecaster.df = df
+    forecaster.setup_holidays()
+    return forecaster
+
+
+def bench_uncertainty(args):
+    """신뢰구간 계산 방식별 속도 vs 정확도 (대량 샘플 기준 대비)"""
+    forecaster = load_forecaster(args)
+
+    print("=" * 78)
+    print(f"신뢰구간 벤치마크 (기준: {args.reference_samples}회 샘플링, 예측 {args.days}일)")
+    print("=" * 78)
+    print(f"{'채널':<10}{'방식':<10}{'샘플':>6}{'시간(초)':>10}{'경계 오차(%p)':>15}{'폭 비율':>9}{'MC 오차':>10}")
+
+    for kr, en in forecaster.channels.items():
+        m = forecaster._fit_channel(kr)
+        fut = m.make_future_dataframe(periods=args.days)
+        fut["sunset_time"] = forecaster.sunset_for(fut["ds"])
+        future = (fut["ds"] > m.history_dates.max()).to_numpy()
+
+        # 기존 방식: 95% / 90% 각각 predict (시뮬레이션 2회)
+        m.uncertainty_samples = DEFAULT_UNCERTAINTY_SAMPLES["full"]
+        t0 = time.perf_counter()
+        for width in (0.95, 0.90):
+            m.interval_width = width
+            m.predict(fut)
+        legacy_time = time.perf_counter() - t0
+        m.interval_width = 0.95
+
+        m.uncertainty_samples = 0
+        yhat = m.predict(fut)["yhat"].to_numpy()
+
+        forecaster.uncertainty_mode = "full"
+        forecaster.uncertainty_samples = args.reference_samples
+        ref, _, _ = forecaster._interval_bounds(m, fut, yhat)
+
+        print(f"{en:<10}{'기존':<10}{2 * DEFAULT_UNCERTAINTY_SAMPLES['full']:>6}{legacy_time:>10.3f}{'-':>15}{'-':>9}{'-':>10}")
+        for mode in UNCERTAINTY_MODES:
+            forecaster.uncertainty_mode = mode
+            forecaster.uncertainty_samples = DEFAULT_UNCERTAINTY_SAMPLES[mode]
+
+            t0 = time.perf_counter()
+            bounds, mc_error, _ = forecaster._interval_bounds(m, fut, yhat)
+            elapsed = time.perf_counter() - t0
+
+            # 예측 구간(미래) 행에서 4개 경계의 평균 절대 오차
+            err = np.mean([
+                np.mean(np.abs(bounds[level][i][future] - ref[level][i][future]))
+                for level in (95, 90) for i in (0, 1)
+            ])
+            width = bounds[95][1] - bounds[95][0]
+            ref_width = ref[95][1] - ref[95][0]
+            ratio = np.mean(width[future] / ref_width[future])
+            mc = f"{mc_error:.4f}" if mc_error is not None else "-"
+            print(f"{'':<10}{mode:<10}{forecaster.uncertainty_samples:>6}{elapsed:>10.3f}{err:>15.4f}{ratio:>9.3f}{mc:>10}")
+
+    print("=" * 78)
+
+
+def bench_engine(args):
+    """Prophet(Stan) vs NumPy 릿지 엔진: 학습/예측 시간과 예측값 차이"""
+    forecaster = load_forecaster(args, uncertainty_mode="analytic")
+    df = forecaster.df
+
+    print("=" * 78)
+    print(f"엔진 벤치마크 (학습 {len(df)}일, 예측 {args.days}일)")
+    print("=" * 78)
+
+    # NumPy: 공유 설계 행렬로 전체 채널 한 번에
+    hist = df.dropna(subset=["날짜", "sunset_time"])
+    future_ds = pd.date_range(hist["날짜"].max() + pd.Timedelta(days=1), periods=args.days)
+    ds = pd.DatetimeIndex(hist["날짜"]).append(future_ds)
+    sunset = forecaster.sunset_for(ds)
+
+    t0 = time.perf_counter()
+    engine = RidgeForecastEngine(holidays=forecaster.holidays, **MODEL_PARAMS)
+    engine.fit(hist["날짜"], hist[list(forecaster.channels.keys())].to_numpy(),
+               hist["sunset_time"], channels=list(forecaster.channels.values()))
+    fit_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ridge = engine.predict(ds, sunset)
+    predict_time = time.perf_counter() - t0
+    print(f"NumPy 릿지 - 학습 {fit_time * 1000:.1f}ms, 예측 {predict_time * 1000:.1f}ms (전체 {len(ridge)}개 채널)")
+    print()
+    print(f"{'채널':<10}{'Prophet(초)':>12}{'학습 RMSE(P)':>14}{'학습 RMSE(N)':>14}{'예측 MAE(P-N)':>15}")
+
+    for kr, en in forecaster.channels.items():
+        t0 = time.perf_counter()
+        m = forecaster._fit_channel(kr)
+        fut = pd.DataFrame({"ds": ds, "sunset_time": sunset})
+        m.uncertainty_samples = 0
+        prophet_fc = m.predict(fut)
+        prophet_time = time.perf_counter() - t0
+
+        y = hist[kr].to_numpy()
+        observed = ~np.isnan(y)
+        n_hist = len(hist)
+        rmse_p = np.sqrt(np.mean((prophet_fc["yhat"].to_numpy()[:n_hist][observed] - y[observed]) ** 2))
+        rmse_n = np.sqrt(np.mean((ridge[en]["yhat"].to_numpy()[:n_hist][observed] - y[observed]) ** 2))
+        mae = np.mean(np.abs(prophet_fc["yhat"].to_numpy()[n_hist:] - ridge[en]["yhat"].to_numpy()[n_hist:]))
+        print(f"{en:<10}{prophet_time:>12.3f}{rmse_p:>14.4f}{rmse_n:>14.4f}{mae:>15.4f}")
+
+    print("=" * 78)
+
+
+def bench_features(args):
+    """채널 간 특징 행렬 공유 on/off 시간 비교 (결과 동일성은 tests/test_shared_features.py)
+
+    --synthetic이면 시트 대신 합성 데이터를 써서 네트워크 없이 측정합니다.
+    """
+    # 채널 병렬 학습은 신뢰구간 샘플링 난수 순서를 바꾸므로 순차 실행으로 비교
+    if args.synthetic:
+        forecaster = synthetic_forecaster(seed=args.seed, max_workers=1)
+    else:
+        forecaster = load_forecaster(args, max_workers=1)
+
+    print("=" * 78)
+    print(f"특징 행렬 공유 벤치마크 ({'합성 데이터' if args.synthetic else '시트'}, 예측 {args.days}일)")
+    print("=" * 78)
+
+    for share in (False, True):
+        forecaster.share_features = share
+        forecaster.forecasts = {}
+        np.random.seed(args.seed)  # 신뢰구간 샘플링 난수 고정
+        t0 = time.perf_counter()
+        forecaster.run_forecast(args.days)
+        elapsed = time.perf_counter() - t0
+        stats = forecaster.feature_cache_stats if share else None
+        extra = f" (캐시 적중 {stats['hits']}회 / 생성 {stats['misses']}회)" if stats else ""
+        print(f"{'공유' if share else '개별':<6}{elapsed:>8.3f}초{extra}")
+    print("=" * 78)
+
+
+def bench_backtest(args):
+    """롤링 원점 백테스트 실행 시간 + 채널별 정확도 요약"""
+    from backtest import run_backtest, backtest_metrics
+
+    forecaster = load_forecaster(args, uncertainty_mode=args.uncertainty, engine=args.engine)
+
+    print("=" * 78)
+    print(f"백테스트 (초기 {args.initial}일, 간격 {args.period}일, 예측 {args.horizon}일, "
+          f"{args.engine}/{args.uncertainty})")
+    print("=" * 78)
+
+    t0 = time.perf_counter()
+    predictions = run_backtest(
+        forecaster.df, forecaster.holidays, forecaster.channels,
+        initial=args.initial, period=args.period, horizon=args.horizon,
+        engine=args.engine, uncertainty_mode=args.uncertainty, max_workers=args.workers
+    )
+    elapsed = time.perf_counter() - t0
+    print(f"기준일 {predictions['cutoff'].nunique()}개, {elapsed:.2f}초 (캐시된 기준일은 재계산하지 않음)")
+    print()
+
+    _, summary = backtest_metrics(predictions, forecaster.df, forecaster.channels)
+    print(f"{'채널':<10}{'건수':>6}{'MAE':>10}{'MAPE(%)':>10}{'95% 적중':>10}{'90% 적중':>10}")
+    for _, r in summary.iterrows():
+        print(f"{r['channel']:<10}{r['n']:>6}{r['mae']:>10.4f}{r['mape']:>10.2f}"
+              f"{r['coverage_95'] * 100:>10.1f}{r['coverage_90'] * 100:>10.1f}")
+    print("=" * 78)
+
+
+def bench_fetch(args):
+    """여러 시트(gid) 순차 다운로드 vs 동시 다운로드"""
+    from sheets_client import fetch_csv, sheet_csv_url
+
+    gids = [g.strip() for g in args.gids.split(",") if g.strip()]
+    forecaster = NewsViewershipForecaster(args.sheets_id, args.gid)
+
+    print("=" * 78)
+    print(f"시트 다운로드 ({len(gids)}개 gid)")
+    print("=" * 78)
+
+    t0 = time.perf_counter()
+    for gid in gids:
+        forecaster.parse_sheet(fetch_csv(sheet_csv_url(args.sheets_id, gid)))
+    print(f"{'순차':<6}{time.perf_counter() - t0:>8.3f}초")
+
+    t0 = time.perf_counter()
+    for gid, frame in forecaster.load_sheets(gids, return_exceptions=True):
+        status = f"{len(frame)}행" if isinstance(frame, pd.DataFrame) else f"실패: {frame}"
+        print(f"  gid {gid:<10} {time.perf_counter() - t0:>7.3f}초  {status}")
+    print(f"{'동시':<6}{time.perf_counter() - t0:>8.3f}초")
+    print("=" * 78)
+
+
+def bench_archive(args):
+    """실행 기록 일괄 저장 + 예측 대상일 조회 속도 (매일 실행을 runs일 흉내)"""
+    from archive import archive_run, forecasts_for
+    from exports import result_fingerprint
+
+    forecaster = load_forecaster(args, engine="numpy")
+    _, target_dt = forecaster.run_forecast()
+    forecast_df = forecaster.get_forecast_dataframe(target_dt)
+    if os.path.exists(args.db):
+        os.remove(args.db)
+
+    print("=" * 78)
+    print(f"실행 기록 벤치마크 (실행 {args.runs}회 × {len(forecast_df)}행)")
+    print("=" * 78)
+    dates = pd.to_datetime(forecast_df["Date"])
+    t0 = time.perf_counter()
+    for i in range(args.runs):
+        # 기준일을 하루씩 앞당긴 실행
+        run = forecast_df.assign(Date=(dates - pd.Timedelta(days=i)).dt.strftime("%Y-%m-%d"))
+        archive_run(run, target_dt - pd.Timedelta(days=i), result_fingerprint(run), str(i),
+                    forecaster.model_config(), path=args.db)
+    elapsed = time.perf_counter() - t0
+    print(f"{'저장':<6}{elapsed:>8.3f}초  (실행당 {elapsed / args.runs * 1000:.1f}ms)")
+
+    probe = target_dt - pd.Timedelta(days=args.runs // 2)
+    t0 = time.perf_counter()
+    hits = forecasts_for(probe, path=args.db)
+    print(f"{'전체 조회':<6}{(time.perf_counter() - t0) * 1000:>8.1f}ms  {probe:%Y-%m-%d} → {len(hits)}행")
+    t0 = time.perf_counter()
+    hits = forecasts_for(probe, channel=forecaster.order[0], path=args.db)
+    print(f"{'채널 조회':<6}{(time.perf_counter() - t0) * 1000:>8.1f}ms  {forecaster.order[0]} → {len(hits)}행 "
+          f"(리드 {hits['lead'].min()}~{hits['lead'].max()}일)")
+    print(f"DB 크기 {os.path.getsize(args.db) / 1e6:.1f}MB")
+    print("=" * 78)
+
+
+def bench_models(args):
+    """채널 모델 보관 크기 (전체 Prophet vs SlimProphet) + 복원 모델 재예측 검증"""
+    forecaster = load_forecaster(args, uncertainty_mode=args.uncertainty)
+    forecaster.run_forecast(args.days)
+
+    print("=" * 78)
+    print(f"모델 보관 크기 (예측 {args.days}일, 신뢰구간 {args.uncertainty})")
+    print("=" * 78)
+    print(f"{'채널':<14}{'전체':>12}{'보관':>12}{'비율':>8}{'복원+예측':>12}{'최대 차이':>12}")
+    for en in forecaster.order:
+        sizes = forecaster.model_bytes[en]
+        fc = forecaster.forecasts[en]
+        t0 = time.perf_counter()
+        m = forecaster.models[en].rebuild()
+        m.uncertainty_samples = 0
+        again = m.predict(pd.DataFrame({"ds": fc["ds"], "sunset_time": forecaster.sunset_for(fc["ds"])}))
+        elapsed = time.perf_counter() - t0
+        diff = np.abs(again["yhat"].clip(lower=0).to_numpy() - fc["yhat"].to_numpy()).max()
+        print(f"{en:<14}{sizes['full'] / 1024:>10.1f}KB{sizes['slim'] / 1024:>10.1f}KB"
+              f"{sizes['slim'] / sizes['full']:>8.1%}{elapsed * 1000:>10.1f}ms{diff:>12.2e}")
+
+    full = sum(s["full"] for s in forecaster.model_bytes.values())
+    slim = sum(s["slim"] for s in forecaster.model_bytes.values())
+    print(f"{'합계':<14}{full / 1024:>10.1f}KB{slim / 1024:>10.1f}KB{slim / full:>8.1%}")
+    print("=" * 78)
+
+
+def _fit_seconds(source, df, policy, days, predict_days):
+    """학습 구간 정책 하나로 전체 채널 학습 + 예측 시간 (시트는 다시 받지 않음)"""
+    forecaster = NewsViewershipForecaster("", uncertainty_mode="analytic", training_policy=policy,
+                                          training_days=days, model_params=source.tuned_params)
+    forecaster.channels, forecaster.df, forecaster.holidays = dict(source.channels), df, source.holidays
+    t0 = time.perf_counter()
+    forecaster.run_forecast(predict_days)
+    return time.perf_counter() - t0
+
+
+def bench_window(args):
+    """학습 구간 정책별 학습 시간 · 백테스트 정확도 + 이력 길이별 학습 시간"""
+    from backtest import run_backtest, backtest_metrics
+
+    forecaster = load_forecaster(args)
+    df = forecaster.df
+    days = [int(d) for d in args.windows.split(",")]
+    policies = [("window", d) for d in days] + [("thin", args.thin_days), ("full", TRAINING_WINDOW_DAYS)]
+
+    print("=" * 78)
+    print(f"학습 구간 정책 (이력 {len(df)}일, 예측 {args.days}일 / 백테스트 초기 {args.initial}일, "
+          f"간격 {args.period}일, 예측 {args.horizon}일)")
+    print("=" * 78)
+    print(f"{'정책':<16}{'학습 행':>8}{'학습 시간':>10}{'MAE':>10}{'MAPE(%)':>10}{'95% 적중':>10}")
+    for policy, window in policies:
+        rows = int(training_rows(df["날짜"], policy, window).sum())
+        fit = _fit_seconds(forecaster, df, policy, window, args.days)
+        predictions = run_backtest(
+            df, forecaster.holidays, forecaster.channels, initial=args.initial, period=args.period,
+            horizon=args.horizon, uncertainty_mode="analytic", max_workers=args.workers,
+            training_policy=policy, training_days=window
+        )
+        _, summary = backtest_metrics(predictions, df, forecaster.channels)
+        label = policy if policy == "full" else f"{policy} {window}일"
+        print(f"{label:<16}{rows:>8}{fit:>9.2f}초{summary['mae'].mean():>10.4f}{summary['mape'].mean():>10.2f}"
+              f"{summary['coverage_95'].mean() * 100:>10.1f}")
+
+    # 이력이 해마다 늘어날 때 (앞에서부터 잘라 흉내) 전체 학습 vs 기본 정책
+    print()
+    print(f"{'이력':<10}{'full':>10}{f'{DEFAULT_TRAINING_POLICY} {TRAINING_WINDOW_DAYS}일':>20}")
+    for years in range(1, len(df) // 365 + 1):
+        part = df.iloc[:years * 365].reset_index(drop=True)
+        full = _fit_seconds(forecaster, part, "full", TRAINING_WINDOW_DAYS, args.days)
+        bounded = _fit_seconds(forecaster, part, DEFAULT_TRAINING_POLICY, TRAINING_WINDOW_DAYS, args.days)
+        print(f"{f'{years}년':<10}{full:>9.2f}초{bounded:>19.2f}초")
+    print("=" * 78)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="뉴스 시청률 예측 벤치마크")
+    parser.add_argument("--sheets-id", default=DEFAULT_SHEETS_ID, help="구글 시트 ID")
+    parser.add_argument("--gid", default="0", help="시트 GID")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("uncertainty", help="신뢰구간 계산 방식별 속도/정확도")
+    p.add_argument("--days", type=int, default=180, help="예측 기간 (일)")
+    p.add_argument("--reference-samples", type=int, default=5000, help="기준 신뢰구간 샘플 수")
+    p.set_defaults(func=bench_uncertainty)
+
+    p = sub.add_parser("engine", help="Prophet vs NumPy 릿지 엔진")
+    p.add_argument("--days", type=int, default=180, help="예측 기간 (일)")
+    p.set_defaults(func=bench_engine)
+
+    p = sub.add_parser("features", help="채널 간 특징 행렬 공유 on/off 시간 비교")
+    p.add_argument("--days", type=int, default=180, help="예측 기간 (일)")
+    p.add_argument("--seed", type=int, default=0, help="신뢰구간 샘플링 난수 시드")
+    p.add_argument("--synthetic", action="store_true", help="시트 대신 합성 데이터로 측정 (네트워크 불필요)")
+    p.set_defaults(func=bench_features)
+
+    p = sub.add_parser("backtest", help="롤링 원점 백테스트")
+    p.add_argument("--initial", type=int, default=365, help="초기 학습 기간 (일)")
+    p.add_argument("--period", type=int, default=7, help="기준일 간격 (일)")
+    p.add_argument("--horizon", type=int, default=30, help="예측 기간 (일)")
+    p.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    p.add_argument("--engine", choices=ENGINES, default="prophet", help="예측 엔진")
+    p.add_argument("--uncertainty", choices=UNCERTAINTY_MODES, default="full", help="신뢰구간 계산 방식")
+    p.set_defaults(func=bench_backtest)
+
+    p = sub.add_parser("fetch", help="여러 시트 순차 vs 동시 다운로드")
+    p.add_argument("--gids", default="0", help="쉼표로 구분한 gid 목록")
+    p.set_defaults(func=bench_fetch)
+
+    p = sub.add_parser("archive", help="실행 기록 저장/조회 속도")
+    p.add_argument("--runs", type=int, default=365, help="기록할 실행 수")
+    p.add_argument("--db", default="bench_archive.db", help="벤치마크용 DB 경로 (기존 파일은 삭제)")
+    p.set_defaults(func=bench_archive)
+
+    p = sub.add_parser("models", help="채널 모델 보관 크기 (전체 vs 최소 상태)")
+    p.add_argument("--days", type=int, default=180, help="예측 기간 (일)")
+    p.add_argument("--uncertainty", choices=UNCERTAINTY_MODES, default="reduced", help="신뢰구간 계산 방식")
+    p.set_defaults(func=bench_models)
+
+    p = sub.add_parser("window", help="학습 구간 정책별 학습 시간 / 백테스트 정확도")
+    p.add_argument("--windows", default="365,730,1095", help="비교할 최근 N일 목록 (쉼표 구분)")
+    p.add_argument("--thin-days", type=int, default=365, help="thin 정책에서 매일 학습할 최근 일수")
+    p.add_argument("--days", type=int, default=180, help="예측 기간 (일)")
+    p.add_argument("--initial", type=int, default=730, help="백테스트 초기 학습 기간 (일)")
+    p.add_argument("--period", type=int, default=30, help="백테스트 기준일 간격 (일)")
+    p.add_argument("--horizon", type=int, default=30, help="백테스트 예측 기간 (일)")
+    p.add_argument("--workers", type=int, default=None, help="백테스트 프로세스 수 (기본: CPU 수)")
+    p.set_defaults(func=bench_window)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
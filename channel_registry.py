@@ -0,0 +1,103 @@
+# ============================================================
+# 채널 레지스트리 (예측 대상 시계열 목록)
+# ============================================================
+#
+# channels.json이 있으면 그 설정을 따르고, 없으면 기본 4개 채널을 예측합니다.
+# "auto_detect": true로 켜면 설정된 채널에 시트의 나머지 숫자 컬럼을 자동으로 추가합니다
+# (시간대/지역별 컬럼 등 수십 개 시리즈).
+#
+# channels.json 예:
+# {
+#   "auto_detect": false,
+#   "channels": [
+#     {"column": "뉴스A", "name": "News_A", "color": "#0072BD", "group": "메인 뉴스"},
+#     {"column": "뉴스A_부산", "name": "News_A_Busan", "group": "지역"}
+#   ]
+# }
+#
+# name을 생략하면 컬럼명, color를 생략하면 팔레트 색상, group을 생략하면 "기타"를 씁니다.
+
+import json
+
+CHANNELS_CONFIG_PATH = "channels.json"
+
+DEFAULT_GROUP = "기타"
+
+DEFAULT_CHANNELS = [
+    {"column": "뉴스A", "name": "News_A", "color": "#0072BD", "group": "메인 뉴스"},
+    {"column": "JTBC뉴스룸", "name": "JTBC", "color": "#7E2F8E", "group": "메인 뉴스"},
+    {"column": "MBN뉴스7", "name": "MBN", "color": "#EDB120", "group": "메인 뉴스"},
+    {"column": "TV조선뉴스9", "name": "TVCHOSUN", "color": "#D95319", "group": "메인 뉴스"},
+]
+
+# 색상이 지정되지 않은 채널용 팔레트 (순서대로 반복)
+PALETTE = [
+    "#0072BD", "#7E2F8E", "#EDB120", "#D95319", "#77AC30", "#4DBEEE", "#A2142F",
+    "#FF6B6B", "#00D4FF", "#F107A3", "#7B2FF7", "#2CA02C", "#FF7F0E", "#17BECF",
+    "#BCBD22", "#E377C2", "#8C564B", "#9467BD",
+]
+
+
+def load_channel_config(path=CHANNELS_CONFIG_PATH):
+    """채널 설정 읽기 → {"auto_detect": bool, "channels": [...]} (파일이 없으면 기본 채널, 자동 감지 없음)"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return {"auto_detect": False, "channels": [dict(c) for c in DEFAULT_CHANNELS]}
+    return {
+        "auto_detect": bool(config.get("auto_detect", False)),
+        "channels": list(config.get("channels", [])),
+    }
+
+
+def normalize_channels(entries):
+    """채널 항목의 이름/색상/그룹 기본값 채우기 + 그룹별로 모아 정렬 (그룹은 처음 나온 순서)"""
+    resolved, names = [], set()
+    for i, entry in enumerate(entries):
+        name = entry.get("name") or entry["column"]
+        if name in names:
+            raise ValueError(f"채널 이름 중복: {name}")
+        names.add(name)
+        resolved.append({
+            "column": entry["column"],
+            "name": name,
+            "color": entry.get("color") or PALETTE[i % len(PALETTE)],
+            "group": entry.get("group") or DEFAULT_GROUP,
+        })
+
+    group_rank = {}
+    for entry in resolved:
+        group_rank.setdefault(entry["group"], len(group_rank))
+    return sorted(resolved, key=lambda e: group_rank[e["group"]])
+
+
+def resolve_channels(config, columns, numeric_columns):
+    """설정 + 시트 컬럼 → (채널 목록, 경고 메시지 목록)
+
+    auto_detect이면 설정에 없는 숫자 컬럼을 채널로 추가하고, 시트에 없는 설정 채널은
+    경고와 함께 건너뜁니다 (설정된 채널 이름과 같은 이름의 컬럼도 경고 후 제외).
+    auto_detect가 아니면 설정된 채널 컬럼이 모두 있어야 합니다.
+    """
+    listed = config["channels"]
+    notes = []
+    if config["auto_detect"]:
+        known = {entry["column"] for entry in listed}
+        names = {entry.get("name") or entry["column"] for entry in listed}
+        entries = [entry for entry in listed if entry["column"] in columns]
+        missing = [entry["column"] for entry in listed if entry["column"] not in columns]
+        if missing:
+            notes.append(f"시트에 없는 채널 컬럼을 건너뜀: {missing}")
+        clashes = [col for col in numeric_columns if col not in known and col in names]
+        if clashes:
+            notes.append(f"채널 이름과 겹치는 컬럼은 자동 감지에서 제외: {clashes}")
+        entries += [{"column": col} for col in numeric_columns if col not in known and col not in names]
+    else:
+        missing = [entry["column"] for entry in listed if entry["column"] not in columns]
+        if missing:
+            raise ValueError(f"채널 컬럼 누락: {missing}")
+        entries = listed
+
+    if not entries:
+        raise ValueError("예측할 채널 컬럼이 없습니다.")
+    return normalize_channels(entries), notes
@@ -1,5 +1,6 @@
 """버전 확인 스크립트"""
 import sys
+import subprocess
 
 print("=" * 60)
 print("환경 확인")
@@ -74,3 +75,22 @@ except Exception as e:
 
 print()
 print("=" * 60)
+print("시작 시간 측정 (새 프로세스에서 import)")
+print("=" * 60)
+
+# 앱 첫 화면에 필요한 모듈 vs 예측 시에만 필요한 모듈
+startup_imports = [
+    ("첫 화면 (streamlit, pandas, plotly)", "import streamlit, pandas, plotly.graph_objects"),
+    ("예측 엔진 (forecaster)", "import forecaster"),
+    ("Prophet 스택 (prophet, cmdstanpy)", "import forecaster; from prophet import Prophet"),
+]
+for label, stmt in startup_imports:
+    code = f"import time; t = time.perf_counter(); {stmt}; print(time.perf_counter() - t)"
+    try:
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        print(f"⏱️ {label}: {float(out.stdout.strip().splitlines()[-1]):.2f}초")
+    except Exception as e:
+        print(f"❌ {label}: {e}")
+
+print()
+print("=" * 60)
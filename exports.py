@@ -0,0 +1,48 @@
+# ============================================================
+# 예측 결과 내보내기 (다운로드 파일 생성)
+# ============================================================
+
+import io
+import gzip
+import hashlib
+
+import pandas as pd
+
+
+def result_fingerprint(forecast_df):
+    """예측 데이터프레임 내용 기반 지문 (다운로드 파일 캐시 키)"""
+    hashed = pd.util.hash_pandas_object(forecast_df, index=False).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()[:16]
+
+
+def to_wide(forecast_df, order=None):
+    """채널 × 날짜 형태의 예측값 표 (행: 채널, 열: 날짜)"""
+    wide = forecast_df.pivot(index="Channel", columns="Date", values="Forecast")
+    if order is not None:
+        wide = wide.reindex([ch for ch in order if ch in wide.index])
+    return wide
+
+
+def build_export_artifacts(forecast_df, target_dt, order=None):
+    """다운로드용 파일을 한 번에 생성 → {이름: bytes}
+
+    parquet은 pyarrow(또는 fastparquet)가 있을 때만 생성됩니다.
+    """
+    today = target_dt.strftime("%Y-%m-%d")
+    full_csv = forecast_df.to_csv(index=False).encode("utf-8")
+
+    artifacts = {
+        "today_csv": forecast_df[forecast_df["Date"] == today].to_csv(index=False).encode("utf-8"),
+        "full_csv": full_csv,
+        "full_csv_gz": gzip.compress(full_csv),
+        "wide_csv": to_wide(forecast_df, order).to_csv().encode("utf-8"),
+    }
+
+    try:
+        buf = io.BytesIO()
+        forecast_df.to_parquet(buf, index=False)
+        artifacts["parquet"] = buf.getvalue()
+    except ImportError:
+        pass
+
+    return artifacts
@@ -0,0 +1,223 @@
+# ============================================================
+# NumPy 릿지 회귀 예측 엔진 (Prophet 고속 대안)
+# ============================================================
+#
+# Prophet과 같은 설계 - 구간선형 추세 + 주간/연간 푸리에 계절성
+# + 공휴일 지시변수 + 일몰 시각 선형 회귀 - 를 Stan 대신 릿지 회귀
+# (가우시안 사전분포 MAP)로 풉니다. 모든 채널이 설계 행렬 하나를
+# 공유하므로 4개 채널 학습/예측이 수 밀리초 안에 끝납니다.
+
+import numpy as np
+import pandas as pd
+
+# 정규분포 분위수 (95%, 90% 양측)
+Z_SCORES = {95: 1.959963984540054, 90: 1.6448536269514722}
+
+
+def analytic_interval_sd(t, sigma_obs, deltas, n_changepoints, y_scale):
+    """시뮬레이션 없는 예측 표준편차
+
+    관측 잡음 sigma_obs와, 학습 기간 이후 변화점이 발생률 S(변화점 수)·크기 λ=mean|δ|의
+    라플라스 분포로 생긴다고 볼 때의 추세 분산 2Sλ²(t-1)³/3을 합칩니다 (t: 학습 기간 = [0, 1]).
+    """
+    lam = float(np.mean(np.abs(deltas))) + 1e-8 if np.size(deltas) else 0.0
+    horizon = np.clip(np.asarray(t, dtype=float) - 1.0, 0.0, None)
+    var = sigma_obs ** 2 + 2.0 * n_changepoints * lam ** 2 * horizon ** 3 / 3.0
+    return np.sqrt(var) * y_scale
+
+
+def fourier_features(ds, period, order):
+    """Prophet과 같은 순서의 푸리에 항 [sin1, cos1, sin2, cos2, ...]"""
+    days = ((pd.DatetimeIndex(ds) - pd.Timestamp("1970-01-01")) / pd.Timedelta(days=1)).to_numpy()
+    x = 2 * np.pi * days / period
+    out = np.empty((len(days), 2 * order))
+    for i in range(order):
+        out[:, 2 * i] = np.sin((i + 1) * x)
+        out[:, 2 * i + 1] = np.cos((i + 1) * x)
+    return out
+
+
+def holiday_keys(holidays):
+    """공휴일 표의 (이름, 오프셋) 목록과 각 키의 발생 날짜"""
+    occurrences = {}
+    if holidays is None or holidays.empty:
+        return [], occurrences
+    for name, date, lower, upper in zip(holidays["holiday"], pd.to_datetime(holidays["ds"]),
+                                        holidays["lower_window"], holidays["upper_window"]):
+        for offset in range(int(lower), int(upper) + 1):
+            occurrences.setdefault((name, offset), []).append(date + pd.Timedelta(days=offset))
+    return sorted(occurrences), occurrences
+
+
+def holiday_features(ds, keys, occurrences):
+    """(이름, 오프셋)별 공휴일 지시 행렬"""
+    index = pd.DatetimeIndex(ds).normalize()
+    out = np.zeros((len(index), len(keys)))
+    for j, key in enumerate(keys):
+        out[:, j] = index.isin(occurrences[key])
+    return out
+
+
+class RidgeForecastEngine:
+    """구간선형 추세 + 푸리에 계절성 + 공휴일 + 일몰 회귀를 릿지 회귀로 푸는 엔진
+
+    사전분포 척도는 Prophet 설정과 같은 의미입니다 (변화점 δ의 라플라스 척도는
+    같은 분산의 가우시안으로 근사).
+    """
+
+    def __init__(self, holidays=None, n_changepoints=25, changepoint_range=0.8,
+                 changepoint_prior_scale=0.2, seasonality_prior_scale=5.0,
+                 holidays_prior_scale=5.0, regressor_prior_scale=None,
+                 weekly_order=6, yearly_order=10):
+        self.holidays = holidays
+        self.n_changepoints = n_changepoints
+        self.changepoint_range = changepoint_range
+        self.changepoint_prior_scale = changepoint_prior_scale
+        self.seasonality_prior_scale = seasonality_prior_scale
+        self.holidays_prior_scale = holidays_prior_scale
+        self.regressor_prior_scale = regressor_prior_scale or holidays_prior_scale
+        self.weekly_order = weekly_order
+        self.yearly_order = yearly_order
+
+        self.channels = []
+        self.params = {}
+
+    # ---------------- 설계 행렬 ----------------
+
+    def _time(self, ds):
+        return ((pd.DatetimeIndex(ds) - self.start) / self.t_scale).to_numpy()
+
+    def design_matrix(self, ds, sunset):
+        """모든 채널이 공유하는 설계 행렬과 열 블록 위치"""
+        t = self._time(ds)
+        blocks = [
+            ("trend", np.column_stack([np.ones_like(t), t] +
+                                      [np.clip(t - s, 0, None) for s in self.changepoints_t])),
+            ("weekly", fourier_features(ds, 7, self.weekly_order)),
+            ("yearly", fourier_features(ds, 365.25, self.yearly_order)),
+            ("holidays", holiday_features(ds, self.holiday_keys, self.holiday_occurrences)),
+            ("sunset_time", self._sunset_feature(sunset)[:, None]),
+        ]
+        slices, start = {}, 0
+        for name, block in blocks:
+            slices[name] = slice(start, start + block.shape[1])
+            start += block.shape[1]
+        return np.hstack([b for _, b in blocks]), slices, t
+
+    def _sunset_feature(self, sunset):
+        """표준화된 일몰 시각 (Prophet add_regressor의 standardize="auto"와 같은 평균 · 표준편차)
+
+        일몰 시각은 연간 계절성과 거의 공선이지만, Prophet처럼 두 항의 배분은 사전분포
+        (regressor_prior_scale = holidays_prior_scale)에 맡기고 회귀변수의 의미는 바꾸지 않습니다.
+        """
+        return (np.asarray(sunset, dtype=float) - self.sunset_mu) / self.sunset_std
+
+    def _prior_scales(self, slices):
+        scales = np.empty(max(s.stop for s in slices.values()))
+        scales[slices["trend"]] = self.changepoint_prior_scale * np.sqrt(2)
+        scales[slices["trend"].start:slices["trend"].start + 2] = 5.0  # k, m
+        scales[slices["weekly"]] = self.seasonality_prior_scale
+        scales[slices["yearly"]] = self.seasonality_prior_scale
+        scales[slices["holidays"]] = self.holidays_prior_scale
+        scales[slices["sunset_time"]] = self.regressor_prior_scale
+        return scales
+
+    # ---------------- 학습 / 예측 ----------------
+
+    def fit(self, ds, Y, sunset, channels, n_iter=3):
+        """채널 여러 개를 한 번에 학습 (Y: 행=날짜, 열=채널, 결측은 NaN)"""
+        ds = pd.DatetimeIndex(ds)
+        Y = np.asarray(Y, dtype=float).reshape(len(ds), -1)
+        sunset = np.asarray(sunset, dtype=float)
+        self.channels = list(channels)
+
+        self.start = ds.min()
+        self.t_scale = ds.max() - ds.min()
+        t_hist = self._time(ds)
+
+        # Prophet과 같은 변화점 위치 (학습 기간 앞 80% 구간에 균등 배치)
+        hist_size = int(np.floor(len(ds) * self.changepoint_range))
+        n_cp = min(self.n_changepoints, hist_size - 1)
+        if n_cp > 0:
+            cp_index = np.linspace(0, hist_size - 1, n_cp + 1).round().astype(int)[1:]
+            self.changepoints_t = np.sort(t_hist)[cp_index]
+        else:
+            self.changepoints_t = np.array([])
+
+        self.holiday_keys, self.holiday_occurrences = holiday_keys(self.holidays)
+        self.sunset_mu = float(np.mean(sunset))
+        self.sunset_std = float(np.std(sunset, ddof=1)) or 1.0
+
+        X, slices, _ = self.design_matrix(ds, sunset)
+        self.slices = slices
+        inv_prior = 1.0 / self._prior_scales(slices) ** 2
+
+        # 결측 패턴이 같은 채널끼리 XᵀX 공유
+        gram = {}
+        for j, ch in enumerate(self.channels):
+            mask = ~np.isnan(Y[:, j])
+            key = mask.tobytes()
+            if key not in gram:
+                Xm = X[mask]
+                gram[key] = (Xm, Xm.T @ Xm)
+            Xm, XtX = gram[key]
+
+            y_scale = float(np.max(np.abs(Y[mask, j]))) or 1.0
+            y = Y[mask, j] / y_scale
+            Xty = Xm.T @ y
+
+            # 잡음 분산 추정과 릿지 해를 번갈아 갱신 (λ_j = σ² / τ_j²)
+            sigma2 = 0.01
+            for _ in range(n_iter):
+                beta = np.linalg.solve(XtX + np.diag(sigma2 * inv_prior), Xty)
+                resid = y - Xm @ beta
+                sigma2 = max(float(np.mean(resid ** 2)), 1e-10)
+
+            self.params[ch] = {
+                "beta": beta,
+                "y_scale": y_scale,
+                "sigma_obs": float(np.sqrt(sigma2)),
+            }
+        return self
+
+    def predict(self, ds, sunset):
+        """채널별 예측 DataFrame (Prophet predict와 같은 주요 컬럼)"""
+        ds = pd.DatetimeIndex(ds)
+        X, slices, t = self.design_matrix(ds, sunset)
+        trend_sl = slices["trend"]
+        hol_sl = slices["holidays"]
+        n_cp = len(self.changepoints_t)
+
+        out = {}
+        for ch in self.channels:
+            p = self.params[ch]
+            beta, y_scale = p["beta"], p["y_scale"]
+            part = lambda name: X[:, slices[name]] @ beta[slices[name]] * y_scale
+
+            fc = pd.DataFrame({"ds": ds})
+            fc["trend"] = part("trend")
+            fc["weekly"] = part("weekly")
+            fc["yearly"] = part("yearly")
+            fc["holidays"] = part("holidays")
+            fc["sunset_time"] = part("sunset_time")
+            fc["extra_regressors_additive"] = fc["sunset_time"]
+
+            # 공휴일 이름별 기여분
+            hol_contrib = X[:, hol_sl] * beta[hol_sl] * y_scale
+            for name in sorted({k[0] for k in self.holiday_keys}):
+                cols = [j for j, k in enumerate(self.holiday_keys) if k[0] == name]
+                fc[name] = hol_contrib[:, cols].sum(axis=1)
+
+            fc["additive_terms"] = fc["weekly"] + fc["yearly"] + fc["holidays"] + fc["sunset_time"]
+            fc["multiplicative_terms"] = 0.0
+            fc["yhat"] = fc["trend"] + fc["additive_terms"]
+
+            deltas = beta[trend_sl][2:]
+            sd = analytic_interval_sd(t, p["sigma_obs"], deltas, n_cp, y_scale)
+            yhat = fc["yhat"].to_numpy()
+            fc["yhat_lower"] = yhat - Z_SCORES[95] * sd
+            fc["yhat_upper"] = yhat + Z_SCORES[95] * sd
+            fc["yhat_lower_90"] = yhat - Z_SCORES[90] * sd
+            fc["yhat_upper_90"] = yhat + Z_SCORES[90] * sd
+            out[ch] = fc
+        return out
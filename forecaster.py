@@ -5,10 +5,17 @@
 import os
 import re
 import io
+import json
+import logging
 import warnings
 import shutil
 import site
 import pathlib
+import zlib
+import pickle
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 import numpy as np
 
@@ -21,53 +28,351 @@ if not hasattr(np, "bool_"):
     np.bool_ = np.bool_
 
 import pandas as pd
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-from prophet import Prophet
-from korean_lunar_calendar import KoreanLunarCalendar
-import requests
-import ephem
+
+from fast_engine import Z_SCORES, RidgeForecastEngine, analytic_interval_sd
+from channel_registry import load_channel_config, normalize_channels, resolve_channels
+from sheets_client import fetch_csv_shared, iter_sheet_frames, sheet_csv_url
+from shared_cache import CACHE_DIR, read_pickle, write_pickle
+
+logger = logging.getLogger(__name__)
+
+# Prophet(cmdstanpy, matplotlib 포함), ephem, korean_lunar_calendar는
+# 실제로 예측을 계산할 때 함수 안에서 import (앱 시작 시간 단축)
 
 warnings.filterwarnings("ignore")
-try:
-    plt.rcParams["font.family"] = "DejaVu Sans"
-except:
-    pass  # 폰트 설정 실패 시 무시
-plt.rcParams["axes.unicode_minus"] = False
-plt.rcParams["figure.max_open_warning"] = 0
+
+# 날짜별 서울 일몰 시각 (날짜가 같으면 값도 같으므로 프로세스 전체에서 공유)
+_SUNSET_CACHE = {}
+
+# Stan 백엔드 워밍업은 프로세스당 한 번만
+_backend_warm = threading.Event()
+_backend_lock = threading.Lock()
+
+
+def warm_up_backend():
+    """Stan 백엔드 초기화 (모델 로드 + 첫 CmdStan 실행 비용을 미리 지불)"""
+    with _backend_lock:
+        if _backend_warm.is_set():
+            return
+        from prophet import Prophet
+
+        m = Prophet(
+            weekly_seasonality=False,
+            yearly_seasonality=False,
+            daily_seasonality=False,
+            uncertainty_samples=0
+        )
+        m.fit(pd.DataFrame({"ds": pd.date_range("2024-01-01", periods=10), "y": np.arange(10.0)}))
+        _backend_warm.set()
+
+
+# 신뢰구간 계산 방식
+#   full     : Prophet 기본 1000회 시뮬레이션
+#   reduced  : 적은 시뮬레이션 + 몬테카를로 오차 추정
+#   analytic : 시뮬레이션 없이 sigma_obs와 변화점 발생률로 근사
+UNCERTAINTY_MODES = ("full", "reduced", "analytic")
+DEFAULT_UNCERTAINTY_SAMPLES = {"full": 1000, "reduced": 200, "analytic": 0}
+
+
+class SharedFeatureCache:
+    """예측 1회 동안 채널 간 공유되는 Prophet 특징 행렬 캐시
+
+    Prophet은 fit / predict / predictive_samples마다 같은 날짜에 대해 푸리에 항과
+    공휴일 지시 행렬을 다시 만듭니다. 날짜 · 회귀변수 값 · 계절성/공휴일 설정이 같으면
+    결과도 같으므로, 모델의 make_all_seasonality_features를 이 캐시로 감쌉니다.
+    """
+
+    def __init__(self):
+        self._store = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(m, df):
+        seasonalities = tuple(
+            (name, p["period"], p["fourier_order"], p["prior_scale"], p["mode"], p["condition_name"])
+            for name, p in m.seasonalities.items()
+        )
+        regressors = tuple(
+            (name, p["mu"], p["std"], p["prior_scale"], p["mode"], hash(df[name].to_numpy().tobytes()))
+            for name, p in m.extra_regressors.items()
+        )
+        holiday_names = None if m.train_holiday_names is None else tuple(m.train_holiday_names)
+        return (
+            hash(df["ds"].to_numpy().tobytes()), len(df), seasonalities, regressors,
+            id(m.holidays), m.holidays_prior_scale, m.holidays_mode, holiday_names
+        )
+
+    def attach(self, m):
+        """모델의 특징 행렬 생성을 캐시 경유로 교체"""
+        build = m.make_all_seasonality_features
+
+        def cached(df):
+            key = self._key(m, df)
+            # 채널을 병렬 학습할 때 같은 특징 행렬을 중복 생성하지 않도록 잠금
+            with self._lock:
+                entry = self._store.get(key)
+                if entry is None:
+                    self.misses += 1
+                    entry = self._store[key] = (build(df), m.train_holiday_names)
+                else:
+                    self.hits += 1
+                    # 학습 시 첫 호출에서 정해지는 공휴일 목록도 똑같이 설정
+                    if m.train_holiday_names is None:
+                        m.train_holiday_names = entry[1]
+            return entry[0]
+
+        m.make_all_seasonality_features = cached
+
+    @staticmethod
+    def detach(m):
+        """예측이 끝난 모델에서 캐시 연결 해제"""
+        m.__dict__.pop("make_all_seasonality_features", None)
+
+
+# 다시 예측하는 데 필요 없는 Prophet 상태 (학습 이력 사본, Stan 결과 · 백엔드, 학습 인자)
+_PROPHET_FIT_STATE = ("history", "history_dates", "stan_fit", "stan_backend", "fit_kwargs",
+                      "make_all_seasonality_features")
+
+
+class SlimProphet:
+    """학습된 Prophet의 예측용 최소 상태 - rebuild()로 predict 가능한 Prophet 객체 복원
+
+    학습된 파라미터 · 스케일 상수 · 변화점 · 계절성/공휴일/회귀변수 설정만 남기고 학습 이력 사본과
+    Stan 결과 · 백엔드는 버립니다. 이력 구간의 추세 값(params["trend"])도 예측에 쓰이지 않으므로 제외하고,
+    이력은 Prophet이 학습 여부 확인과 한 행 예측의 시간 간격에만 쓰므로 마지막 두 행만 보관합니다.
+    """
+
+    def __init__(self, m):
+        state = {k: v for k, v in m.__dict__.items() if k not in _PROPHET_FIT_STATE}
+        state["params"] = {k: v for k, v in m.params.items() if k != "trend"}
+        state["history"] = m.history.tail(2).reset_index(drop=True)
+        self.state = state
+
+    @property
+    def train_holiday_names(self):
+        return self.state["train_holiday_names"]
+
+    def rebuild(self):
+        """Prophet 객체 복원 (호출할 때마다 새 객체 - 복원한 객체를 바꿔도 원본은 그대로)"""
+        from prophet import Prophet
+
+        m = Prophet.__new__(Prophet)
+        m.__dict__.update(self.state)
+        m.params = dict(self.state["params"])
+        m.history_dates, m.stan_fit, m.stan_backend, m.fit_kwargs = None, None, None, {}
+        return m
+
+
+def model_bytes(obj):
+    """모델 보관 크기 (직렬화 바이트 수)"""
+    return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+# 채널별 학습 결과 캐시 (작업 프로세스 · 레플리카 간 공유, 오래된 항목부터 정리)
+CHANNEL_CACHE_DIR = os.path.join(CACHE_DIR, "channels")
+CHANNEL_CACHE_ENTRIES = 128
+
+# 캐시 항목 형식 (바뀌면 이전 항목은 지문이 달라져 쓰이지 않음)
+CHANNEL_CACHE_FORMAT = 2
+
+
+class ChannelCache:
+    """채널 지문 → 학습 결과(SlimProphet · 예측 · 구성요소 · 샘플) 디스크 캐시
+
+    지문은 채널의 정리된 시계열, 공유 회귀변수(일몰)와 공휴일 표, 모델 · 신뢰구간 설정,
+    예측 창을 모두 덮으므로, 시트에서 한 채널의 값만 고치면 그 채널만 다시 학습합니다.
+    """
+
+    def __init__(self, directory=CHANNEL_CACHE_DIR, max_entries=CHANNEL_CACHE_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, fingerprint):
+        return os.path.join(self.directory, f"{fingerprint}.pkl")
+
+    def get(self, fingerprint):
+        """캐시된 학습 결과 dict (없거나 읽을 수 없으면 None)"""
+        entry = read_pickle(self._path(fingerprint))
+        if entry is not None:
+            try:
+                os.utime(self._path(fingerprint))  # 최근 사용 시각 갱신 (정리 순서)
+            except OSError:
+                pass  # 다른 레플리카가 방금 정리한 항목
+        return entry
+
+    def put(self, fingerprint, entry):
+        """학습 결과 저장 (임시 파일에 쓴 뒤 교체) + 오래된 항목 정리"""
+        write_pickle(self._path(fingerprint), entry)
+
+        entries = [os.path.join(self.directory, n) for n in os.listdir(self.directory) if n.endswith(".pkl")]
+        if len(entries) > self.max_entries:
+            entries.sort(key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0)
+            for old in entries[:len(entries) - self.max_entries]:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+
+# 예측 엔진
+#   prophet : Stan 기반 Prophet (고정밀)
+#   numpy   : 같은 설계를 릿지 회귀로 푸는 고속 엔진 (fast_engine)
+ENGINES = ("prophet", "numpy")
+
+# 모델 설정 (두 엔진 공통)
+MODEL_PARAMS = {
+    "changepoint_prior_scale": 0.2,
+    "seasonality_prior_scale": 5.0,
+    "holidays_prior_scale": 5.0,
+    "weekly_order": 6,
+    "yearly_order": 10,
+}
+
+# 채널 학습 동시 실행 수 (Prophet 학습은 CmdStan 외부 프로세스라 스레드로 병렬화)
+FIT_WORKERS = min(8, os.cpu_count() or 1)
+
+# 자동 감지 시 숫자 컬럼으로 볼 최소 비율 (값이 있는 행 중 숫자로 읽히는 행)
+NUMERIC_COLUMN_RATIO = 0.5
+
+# 채널별 튜닝 결과 파일 (tuning.py가 저장, 있으면 Prophet 엔진이 자동으로 사용)
+TUNED_PARAMS_PATH = "tuned_params.json"
+
+# 예측 결과의 신뢰구간 컬럼 (95% 하한/상한, 90% 하한/상한)
+INTERVAL_COLUMNS = ("yhat_lower", "yhat_upper", "yhat_lower_90", "yhat_upper_90")
+
+# 최대 예측 기간 (항상 이 기간으로 계산하고 짧은 기간은 앞부분을 잘라 사용)
+MAX_PREDICT_DAYS = 180
+
+# 채널 × 샘플 × 날짜 예측 샘플 (확률 계산용) - 시뮬레이션이 없는 방식(해석적 근사, NumPy 엔진)은
+# 신뢰구간 폭에서 정규분포 샘플을 이만큼 추출
+ANALYTIC_SAMPLE_DRAWS = 500
+
+# 학습 구간 정책 (시트에 이력이 쌓여도 학습 시간 · 메모리가 계속 늘지 않도록)
+#   window : 최근 TRAINING_WINDOW_DAYS일만 학습
+#   thin   : 최근 TRAINING_WINDOW_DAYS일은 매일, 그 이전은 THIN_STEP_DAYS일 간격으로 솎아서 학습
+#   full   : 전체 이력 학습
+TRAINING_POLICIES = ("window", "thin", "full")
+DEFAULT_TRAINING_POLICY = "window"
+TRAINING_WINDOW_DAYS = 1095  # 3년 - 연간 계절성을 여러 번 보면서 학습 비용은 해마다 일정
+
+# 솎아낼 때 간격 (7과 서로소라 남는 날짜가 요일을 돌아가며 포함, 날짜 기준이라 매일 같은 날이 남음)
+THIN_STEP_DAYS = 3
+
+
+def training_rows(dates, policy=DEFAULT_TRAINING_POLICY, days=TRAINING_WINDOW_DAYS):
+    """학습에 쓸 행 (bool 배열) - 기준은 가장 최근 날짜"""
+    dates = pd.to_datetime(pd.Series(dates)).dt.normalize()
+    if policy == "full" or dates.isna().all():
+        return np.ones(len(dates), dtype=bool)
+    recent = (dates > dates.max() - pd.Timedelta(days=days)).to_numpy()
+    if policy == "window":
+        return recent
+    ordinal = (dates - pd.Timestamp(0)).dt.days.to_numpy()
+    return recent | (ordinal % THIN_STEP_DAYS == 0)
+
+
+# 신뢰구간을 계산할 과거 구간 (예측 시작일 이전 일수, 추세 차트 표시 범위와 동일)
+#   None이면 학습 기간 전체에 신뢰구간 계산, 그 밖의 과거 행은 점 예측만
+HISTORY_CONTEXT_DAYS = 30
+
+
+def load_tuned_params(path=TUNED_PARAMS_PATH):
+    """채널별 튜닝 파라미터 {채널명: 파라미터} (파일이 없거나 읽을 수 없으면 빈 dict)"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        return {
+            en: {k: v for k, v in entry["params"].items() if k in MODEL_PARAMS}
+            for en, entry in saved["channels"].items()
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}
+
+
+def summarize_components(comp):
+    """구성요소 테이블 요약 통계 (요일별 주간 효과, 추세 시작/끝, 일몰 효과 범위 등)"""
+    weekly_by_dow = comp.groupby("dayofweek")["weekly"].mean().reindex(range(7))
+    return {
+        "weekly_by_dow": weekly_by_dow.tolist(),
+        "weekly_max_dow": int(weekly_by_dow.idxmax()),
+        "weekly_min_dow": int(weekly_by_dow.idxmin()),
+        "weekly_range": float(comp["weekly"].max() - comp["weekly"].min()),
+        "trend_start": float(comp["trend"].iloc[0]),
+        "trend_end": float(comp["trend"].iloc[-1]),
+        "sunset_effect_min": float(comp["sunset_effect"].min()),
+        "sunset_effect_max": float(comp["sunset_effect"].max()),
+        "sunset_effect_range": float(comp["sunset_effect"].max() - comp["sunset_effect"].min()),
+        "sunset_hour_min": float(comp["sunset_hour"].min()),
+        "sunset_hour_max": float(comp["sunset_hour"].max()),
+    }
 
 
 class NewsViewershipForecaster:
     """뉴스 시청률 예측 클래스"""
 
-    def __init__(self, sheets_id, gid="0"):
+    def __init__(self, sheets_id, gid="0", uncertainty_mode="full", uncertainty_samples=None,
+                 engine="prophet", share_features=True, model_params=None, channel_config=None,
+                 max_workers=None, channel_cache=None, training_policy=DEFAULT_TRAINING_POLICY,
+                 training_days=TRAINING_WINDOW_DAYS):
+        if uncertainty_mode not in UNCERTAINTY_MODES:
+            raise ValueError(f"알 수 없는 신뢰구간 계산 방식: {uncertainty_mode}")
+        if engine not in ENGINES:
+            raise ValueError(f"알 수 없는 예측 엔진: {engine}")
+        if training_policy not in TRAINING_POLICIES:
+            raise ValueError(f"알 수 없는 학습 구간 정책: {training_policy}")
+
         self.sheets_id = sheets_id
         self.gid = gid
-        self.sheets_csv_url = f"https://docs.google.com/spreadsheets/d/{sheets_id}/export?format=csv&gid={gid}"
+        self.sheets_csv_url = sheet_csv_url(sheets_id, gid)
 
-        self.channels = {
-            "뉴스A": "News_A",
-            "JTBC뉴스룸": "JTBC",
-            "MBN뉴스7": "MBN",
-            "TV조선뉴스9": "TVCHOSUN"
-        }
-        self.colors = {
-            "News_A": "#0072BD",
-            "JTBC": "#7E2F8E",
-            "MBN": "#EDB120",
-            "TVCHOSUN": "#D95319"
-        }
-        self.order = ["News_A", "JTBC", "MBN", "TVCHOSUN"]
+        # 채널 레지스트리 (channels.json 또는 기본 채널 - 자동 감지면 load_data에서 확정)
+        self.channel_config = load_channel_config() if channel_config is None else channel_config
+        self.set_channels(normalize_channels(self.channel_config["channels"]))
 
+        self.channel_notes = []
         self.df = None
         self.holidays = None
         self.forecasts = {}
         self.models = {}
+        self.model_bytes = {}
+        self.components = {}
+        self.component_stats = {}
         self.predict_days = 180
+        self.target_dt = None
+
+        self.uncertainty_mode = uncertainty_mode
+        self.uncertainty_samples = uncertainty_samples or DEFAULT_UNCERTAINTY_SAMPLES[uncertainty_mode]
+        self.interval_mc_error = {}
+        self.horizon_samples = {}
+        self.engine = engine
+        self.share_features = share_features
+        self.max_workers = max_workers or FIT_WORKERS
+        self.training_policy = training_policy
+        self.training_days = training_days
+
+        # 채널별 모델 설정 {채널명: MODEL_PARAMS 일부} - 지정하지 않으면 튜닝 결과 파일 사용
+        self.tuned_params = load_tuned_params() if model_params is None else model_params
+        self.window_start = None
+        self.feature_cache_stats = None
+
+        # 채널별 학습 결과 캐시 (ChannelCache, None이면 항상 전체 학습) - 재사용한 채널 목록
+        self.channel_cache = channel_cache
+        self.reused_channels = []
+
+    def set_channels(self, entries):
+        """채널 목록 적용 → channels {시트 컬럼: 채널명}, colors, order, groups {채널명: 그룹}"""
+        self.channels = {e["column"]: e["name"] for e in entries}
+        self.colors = {e["name"]: e["color"] for e in entries}
+        self.order = [e["name"] for e in entries]
+        self.groups = {e["name"]: e["group"] for e in entries}
 
     def get_seoul_sunset_float(self, date_val):
         """서울 일몰 시각을 float로 반환 (예: 18.5)"""
+        import ephem
+
         obs = ephem.Observer()
         obs.lat = '37.5665'
         obs.lon = '126.9780'
@@ -84,11 +389,35 @@ class NewsViewershipForecaster:
         except:
             return 18.5
 
+    def sunset_for(self, dates):
+        """날짜 배열의 일몰 시각 (이미 계산한 날짜는 재사용)"""
+        dates = pd.Series(pd.DatetimeIndex(dates).normalize())
+        values = dates.map(_SUNSET_CACHE)
+        missing = values.isna()
+        if missing.any():
+            for d in dates[missing].unique():
+                _SUNSET_CACHE[d] = self.get_seoul_sunset_float(d)
+            values = dates.map(_SUNSET_CACHE)
+        return values.to_numpy(dtype=float)
+
     def load_data(self):
-        """Google Sheets에서 데이터 로드"""
-        resp = requests.get(self.sheets_csv_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=30)
-        resp.raise_for_status()
-        raw = resp.content.decode("utf-8-sig", errors="replace")
+        """Google Sheets에서 데이터 로드 (채널 설정 경고는 channel_notes에 남겨 화면에 표시)"""
+        df, entries, notes = self.parse_sheet(fetch_csv_shared(self.sheets_csv_url))
+        self.set_channels(entries)
+        self.channel_notes = notes
+        for note in notes:
+            logger.warning("채널 설정 경고: %s", note)
+        self.df = df
+        return df
+
+    def load_sheets(self, gids, return_exceptions=False):
+        """여러 시트(gid)를 동시에 받아 도착하는 대로 (gid, DataFrame) 반환 (self.df는 그대로)"""
+        parse = lambda content: self.parse_sheet(content)[0]
+        yield from iter_sheet_frames(self.sheets_id, gids, parse, return_exceptions=return_exceptions)
+
+    def parse_sheet(self, content):
+        """시트 CSV 내용 → (정리된 DataFrame, 채널 목록, 채널 경고 메시지) - 인스턴스 상태는 바꾸지 않음"""
+        raw = content.decode("utf-8-sig", errors="replace")
 
         df = pd.read_csv(io.StringIO(raw))
         clean = lambda s: str(s).replace("\ufeff", "").replace("\u200b", "").strip()
@@ -116,13 +445,20 @@ class NewsViewershipForecaster:
             if s in {"", "-", "—", "–"}: return np.nan
             return float(s) if _num.match(s) else np.nan
 
-        req = list(self.channels.keys())
-        miss = [c for c in req if c not in df.columns]
-        if miss:
-            raise ValueError(f"채널 컬럼 누락: {miss}")
-
-        for c in req:
-            df[c] = df[c].apply(to_float_safe)
+        # 채널 확정 (자동 감지면 값의 절반 이상이 숫자인 컬럼을 채널로 추가)
+        numeric, converted = [], {}
+        if self.channel_config["auto_detect"]:
+            for c in df.columns:
+                if c == "날짜" or c.startswith("Unnamed"):
+                    continue
+                converted[c] = df[c].apply(to_float_safe)
+                filled = df[c].notna().sum()
+                if filled and converted[c].notna().sum() >= NUMERIC_COLUMN_RATIO * filled:
+                    numeric.append(c)
+        entries, notes = resolve_channels(self.channel_config, list(df.columns), numeric)
+
+        for c in (e["column"] for e in entries):
+            df[c] = converted[c] if c in converted else df[c].apply(to_float_safe)
 
         df = (df.dropna(subset=["날짜"])
               .sort_values("날짜")
@@ -130,10 +466,9 @@ class NewsViewershipForecaster:
               .reset_index(drop=True))
 
         # 일몰 시각 추가
-        df["sunset_time"] = df["날짜"].apply(self.get_seoul_sunset_float)
+        df["sunset_time"] = self.sunset_for(df["날짜"])
 
-        self.df = df
-        return df
+        return df, entries, notes
 
     def setup_holidays(self):
         """공휴일 설정"""
@@ -151,6 +486,8 @@ class NewsViewershipForecaster:
 
         lunar = []
         try:
+            from korean_lunar_calendar import KoreanLunarCalendar
+
             cal = KoreanLunarCalendar()
             for y in range(2023, 2027):
                 cal.setLunarDate(y, 1, 1, False)
@@ -170,88 +507,383 @@ class NewsViewershipForecaster:
         self.holidays = pd.DataFrame(solar + lunar)
         return self.holidays
 
-    def run_forecast(self, predict_days=180):
+    def prepare(self):
+        """데이터 로드 · 공휴일 생성 · Stan 워밍업을 동시에 실행하고 모두 끝나면 반환
+
+        소요 시간이 (로드 + 공휴일 + 워밍업)의 합이 아니라 그중 가장 긴 작업 시간이 됩니다.
+        NumPy 엔진은 Stan을 쓰지 않으므로 워밍업(Prophet import 포함)을 건너뜁니다.
+        """
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            data_job = pool.submit(self.load_data)
+            holidays_job = pool.submit(self.setup_holidays)
+            warm_job = pool.submit(warm_up_backend) if self.engine == "prophet" else None
+
+            data_job.result()
+            holidays_job.result()
+            if warm_job is not None:
+                try:
+                    warm_job.result()
+                except Exception as e:
+                    # 워밍업 실패는 치명적이지 않음 (첫 학습에서 다시 초기화됨)
+                    print(f"Stan 워밍업 실패: {e}")
+
+        return self.df, self.holidays
+
+    def run_forecast(self, predict_days=MAX_PREDICT_DAYS, history_context=HISTORY_CONTEXT_DAYS):
         """Prophet 예측 실행"""
+        for _ in self.iter_forecast(predict_days, history_context):
+            pass
+        return self.forecasts, self.target_dt
+
+    def iter_forecast(self, predict_days=MAX_PREDICT_DAYS, history_context=HISTORY_CONTEXT_DAYS):
+        """채널별 Prophet 예측 실행 - 채널 하나가 끝날 때마다 (채널, 예측) 반환
+
+        신뢰구간은 예측 기간 + 직전 history_context일에만 계산합니다 (None이면 전체).
+        그 밖의 과거 행은 점 예측과 구성요소만 채우고 구간 컬럼은 NaN입니다.
+        """
         self.predict_days = predict_days
 
         latest_data_dt = pd.to_datetime(self.df["날짜"].max()).normalize()
-        target_dt = latest_data_dt + pd.Timedelta(days=1)
-
-        for kr, en in self.channels.items():
-            d = pd.DataFrame({
-                "ds": self.df["날짜"],
-                "y": self.df[kr],
-                "sunset_time": self.df["sunset_time"]
-            }).dropna(subset=["ds", "y", "sunset_time"])
-
-            m = Prophet(
-                weekly_seasonality=False,
-                yearly_seasonality=False,
-                holidays=self.holidays,
-                seasonality_mode="additive",
-                seasonality_prior_scale=5.0,
-                holidays_prior_scale=5.0,
-                changepoint_prior_scale=0.2,
-                interval_width=0.95
-            )
-            m.add_seasonality(name="weekly", period=7, fourier_order=6)
-            m.add_seasonality(name="yearly", period=365.25, fourier_order=10)
-            m.add_regressor("sunset_time")
-
-            m.fit(d)
+        self.target_dt = latest_data_dt + pd.Timedelta(days=1)
+        self.window_start = (None if history_context is None
+                             else self.target_dt - pd.Timedelta(days=history_context))
+
+        if self.engine == "numpy":
+            yield from self._iter_forecast_numpy(predict_days)
+            return
+
+        # 시트에서 바뀌지 않은 채널은 캐시된 학습 결과를 그대로 사용
+        self.reused_channels = []
+        pending, fingerprints = dict(self.channels), {}
+        if self.channel_cache is not None:
+            for kr, en in self.channels.items():
+                fingerprints[kr] = self.channel_fingerprint(kr, predict_days)
+                entry = self.channel_cache.get(fingerprints[kr])
+                if entry is not None:
+                    self._store_channel(en, entry)
+                    self.reused_channels.append(en)
+                    del pending[kr]
+                    yield en, entry["forecast"]
+
+        # 날짜 · 일몰 회귀변수 · 푸리에/공휴일 특징은 채널 간 공유
+        feature_cache = SharedFeatureCache() if self.share_features else None
+        futures = {}
+
+        def forecast_channel(kr, en):
+            m = self._fit_channel(kr, feature_cache)
+            fut = self._future_frame(m, predict_days, futures)
+            fc = self._predict_channel(en, m, fut)
+            if feature_cache is not None:
+                feature_cache.detach(m)
+            return m, fut, fc
+
+        # 채널 여러 개를 동시에 학습하고, 끝나는 순서대로 반환
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            jobs = {pool.submit(forecast_channel, kr, en): kr for kr, en in pending.items()}
+            for job in as_completed(jobs):
+                kr = jobs[job]
+                en = self.channels[kr]
+                m, fut, fc = job.result()
+
+                # 예측이 끝난 Prophet 객체는 예측용 최소 상태만 남기고 해제
+                slim = SlimProphet(m)
+                sizes = {"full": model_bytes(m), "slim": model_bytes(slim)}
+                del m
+
+                components, stats = self._build_components(fc, fut)
+                entry = {
+                    "model": slim, "model_bytes": sizes, "forecast": fc, "components": components,
+                    "component_stats": stats, "interval_mc_error": self.interval_mc_error[en],
+                    "horizon_samples": self.horizon_samples[en],
+                }
+                self._store_channel(en, entry)
+                if self.channel_cache is not None:
+                    self.channel_cache.put(fingerprints[kr], entry)
+
+                yield en, fc
+
+        if feature_cache is not None:
+            self.feature_cache_stats = {"hits": feature_cache.hits, "misses": feature_cache.misses}
+
+    def _store_channel(self, en, entry):
+        """채널 학습 결과 반영 (새로 학습했거나 캐시에서 가져온 결과)"""
+        self.forecasts[en] = entry["forecast"]
+        self.models[en] = entry["model"]
+        self.model_bytes[en] = entry["model_bytes"]
+        self.components[en] = entry["components"]
+        self.component_stats[en] = entry["component_stats"]
+        self.interval_mc_error[en] = entry["interval_mc_error"]
+        self.horizon_samples[en] = entry["horizon_samples"]
+
+    def channel_fingerprint(self, kr, predict_days):
+        """채널 학습 결과 지문 - 채널 시계열 · 일몰 회귀변수 · 공휴일 표 · 모델/신뢰구간 설정 · 예측 창"""
+        en = self.channels[kr]
+        h = hashlib.sha1()
+        h.update(pd.util.hash_pandas_object(self._training_frame(kr), index=False).to_numpy().tobytes())
+        h.update(pd.util.hash_pandas_object(self.holidays.astype(str), index=False).to_numpy().tobytes())
+        config = {
+            "channel": en,  # 해석적 근사 샘플의 시드
+            "params": self.channel_params(en),
+            "uncertainty_mode": self.uncertainty_mode,
+            "uncertainty_samples": self.uncertainty_samples,
+            "predict_days": predict_days,
+            "target_dt": self.target_dt,
+            "window_start": self.window_start,
+            "format": CHANNEL_CACHE_FORMAT,
+        }
+        h.update(json.dumps(config, sort_keys=True, default=str).encode("utf-8"))
+        return h.hexdigest()
 
+    def _future_frame(self, m, predict_days, futures):
+        """학습 날짜 + 예측 기간 프레임 (학습 날짜가 같은 채널끼리 같은 프레임 공유)"""
+        if not self.share_features:
             fut = m.make_future_dataframe(periods=predict_days)
-            fut["sunset_time"] = fut["ds"].apply(self.get_seoul_sunset_float)
-
-            # 95% CI
-            fc_95 = m.predict(fut)
-
-            # 90% CI
-            m.interval_width = 0.90
-            fc_90 = m.predict(fut)
-
-            fc = fc_95.copy()
-            fc['yhat_lower_90'] = fc_90['yhat_lower']
-            fc['yhat_upper_90'] = fc_90['yhat_upper']
-            fc["ds"] = pd.to_datetime(fc["ds"]).dt.normalize()
+            fut["sunset_time"] = self.sunset_for(fut["ds"])
+            return fut
 
-            # 시청률은 0 이상이어야 하므로 음수 제거
-            fc['yhat'] = fc['yhat'].clip(lower=0)
-            fc['yhat_lower'] = fc['yhat_lower'].clip(lower=0)
-            fc['yhat_upper'] = fc['yhat_upper'].clip(lower=0)
-            fc['yhat_lower_90'] = fc['yhat_lower_90'].clip(lower=0)
-            fc['yhat_upper_90'] = fc['yhat_upper_90'].clip(lower=0)
+        key = (hash(m.history_dates.to_numpy().tobytes()), len(m.history_dates), predict_days)
+        if key not in futures:
+            fut = m.make_future_dataframe(periods=predict_days)
+            fut["sunset_time"] = self.sunset_for(fut["ds"])
+            futures[key] = fut
+        return futures[key]
+
+    def _iter_forecast_numpy(self, predict_days):
+        """릿지 엔진으로 전체 채널을 한 번에 학습한 뒤 채널별로 반환"""
+        hist = self._training_data().dropna(subset=["날짜", "sunset_time"])
+        engine = RidgeForecastEngine(holidays=self.holidays, **MODEL_PARAMS)
+        engine.fit(hist["날짜"], hist[list(self.channels.keys())].to_numpy(),
+                   hist["sunset_time"], channels=list(self.channels.values()))
+
+        future_ds = pd.date_range(hist["날짜"].max() + pd.Timedelta(days=1), periods=predict_days)
+        fut = pd.DataFrame({"ds": pd.DatetimeIndex(hist["날짜"]).append(future_ds)})
+        fut["sunset_time"] = self.sunset_for(fut["ds"])
+        outputs = engine.predict(fut["ds"], fut["sunset_time"])
+
+        # 모든 채널이 릿지 모델 하나를 공유 (이미 계수만 보관) - 크기는 채널 수로 나눠 기록
+        share = model_bytes(engine) // len(self.channels)
+
+        window = self._window_rows(outputs[next(iter(outputs))]["ds"])
+        for en in self.channels.values():
+            fc = outputs[en]
+            for col in INTERVAL_COLUMNS:
+                fc.loc[~window, col] = np.nan
+            fc = self._finalize_forecast(fc)
+            self.interval_mc_error[en] = None
+            future = (fc["ds"] >= self.target_dt).to_numpy()
+            self.horizon_samples[en] = self._horizon_samples(en, fc["yhat"].to_numpy()[future], None, (
+                fc["yhat_lower"].to_numpy()[future], fc["yhat_upper"].to_numpy()[future]))
 
             self.forecasts[en] = fc
-            self.models[en] = m
+            self.models[en] = engine
+            self.model_bytes[en] = {"full": share, "slim": share}
+            self.components[en], self.component_stats[en] = self._build_components(fc, fut)
+
+            yield en, fc
+
+    def channel_params(self, en):
+        """채널의 모델 설정 (기본 MODEL_PARAMS + 튜닝 결과)"""
+        return {**MODEL_PARAMS, **self.tuned_params.get(en, {})}
+
+    def model_config(self):
+        """실행 설정 요약 (엔진, 신뢰구간 방식, 채널별 모델 파라미터) - 실행 기록용"""
+        config = {
+            "engine": self.engine,
+            "uncertainty_mode": self.uncertainty_mode,
+            "uncertainty_samples": self.uncertainty_samples,
+            "training_policy": self.training_policy,
+            "training_days": None if self.training_policy == "full" else self.training_days,
+        }
+        if self.engine == "prophet":
+            config["model_params"] = {en: self.channel_params(en) for en in self.order}
+        return config
+
+    def _training_data(self):
+        """학습 구간 정책을 적용한 데이터 행"""
+        return self.df[training_rows(self.df["날짜"], self.training_policy, self.training_days)]
+
+    def _training_frame(self, kr):
+        """채널 하나의 학습 데이터 (ds, y, sunset_time)"""
+        df = self._training_data()
+        return pd.DataFrame({
+            "ds": df["날짜"],
+            "y": df[kr],
+            "sunset_time": df["sunset_time"]
+        }).dropna(subset=["ds", "y", "sunset_time"])
+
+    def _fit_channel(self, kr, feature_cache=None):
+        """채널 하나의 Prophet 모델 학습"""
+        from prophet import Prophet
+
+        params = self.channel_params(self.channels[kr])
+        d = self._training_frame(kr)
+
+        m = Prophet(
+            weekly_seasonality=False,
+            yearly_seasonality=False,
+            holidays=self.holidays,
+            seasonality_mode="additive",
+            seasonality_prior_scale=params["seasonality_prior_scale"],
+            holidays_prior_scale=params["holidays_prior_scale"],
+            changepoint_prior_scale=params["changepoint_prior_scale"],
+            interval_width=0.95
+        )
+        m.add_seasonality(name="weekly", period=7, fourier_order=params["weekly_order"])
+        m.add_seasonality(name="yearly", period=365.25, fourier_order=params["yearly_order"])
+        m.add_regressor("sunset_time")
+        if feature_cache is not None:
+            feature_cache.attach(m)
+
+        m.fit(d)
+        return m
+
+    def _window_rows(self, ds):
+        """신뢰구간을 계산할 행 (예측 기간 + 과거 context 구간)"""
+        ds = pd.to_datetime(pd.Series(ds)).to_numpy()
+        if self.window_start is None:
+            return np.ones(len(ds), dtype=bool)
+        return ds >= self.window_start.to_datetime64()
+
+    def _predict_channel(self, en, m, fut):
+        """점 예측 + 90%/95% 신뢰구간 (self.uncertainty_mode 방식)"""
+        # 점 예측과 구성요소는 시뮬레이션 없이 전체 행 계산
+        m.uncertainty_samples = 0
+        fc = m.predict(fut)
+
+        # 신뢰구간은 창 안의 행만 (과거 길이와 무관하게 일정한 비용)
+        rows = self._window_rows(fc["ds"])
+        window_fut = fut[self._window_rows(fut["ds"])]
+        yhat = fc["yhat"].to_numpy()[rows]
+        bounds, mc_error, samples = self._interval_bounds(m, window_fut, yhat)
+        for col, values in zip(INTERVAL_COLUMNS, (*bounds[95], *bounds[90])):
+            fc[col] = np.nan
+            fc.loc[rows, col] = values
+        self.interval_mc_error[en] = mc_error
+
+        future = (pd.to_datetime(window_fut["ds"]) >= self.target_dt).to_numpy()
+        self.horizon_samples[en] = self._horizon_samples(
+            en, yhat[future], None if samples is None else samples[future],
+            (bounds[95][0][future], bounds[95][1][future])
+        )
+
+        return self._finalize_forecast(fc)
+
+    @staticmethod
+    def _finalize_forecast(fc):
+        """날짜 정규화 + 음수 제거"""
+        fc["ds"] = pd.to_datetime(fc["ds"]).dt.normalize()
+
+        # 시청률은 0 이상이어야 하므로 음수 제거
+        fc['yhat'] = fc['yhat'].clip(lower=0)
+        fc['yhat_lower'] = fc['yhat_lower'].clip(lower=0)
+        fc['yhat_upper'] = fc['yhat_upper'].clip(lower=0)
+        fc['yhat_lower_90'] = fc['yhat_lower_90'].clip(lower=0)
+        fc['yhat_upper_90'] = fc['yhat_upper_90'].clip(lower=0)
+        return fc
+
+    def _interval_bounds(self, m, fut, yhat):
+        """{95: (하한, 상한), 90: (하한, 상한)}, 몬테카를로 오차(%p), 샘플(행 × 샘플) 반환
+
+        샘플링 방식은 시뮬레이션을 한 번만 돌려 두 신뢰구간을 같은 샘플에서 계산합니다.
+        analytic이면 몬테카를로 오차와 샘플은 None입니다.
+        """
+        if self.uncertainty_mode == "analytic":
+            sd = self._analytic_sd(m, fut)
+            return {level: (yhat - z * sd, yhat + z * sd) for level, z in Z_SCORES.items()}, None, None
+
+        m.uncertainty_samples = self.uncertainty_samples
+        samples = m.predictive_samples(fut)["yhat"]
+        q = np.percentile(samples, [2.5, 97.5, 5.0, 95.0], axis=1)
+        bounds = {95: (q[0], q[1]), 90: (q[2], q[3])}
+        return bounds, self._quantile_mc_error(samples), samples
+
+    @staticmethod
+    def _horizon_samples(en, yhat, samples, bounds_95):
+        """예측 기간 샘플 (샘플 × 날짜, float32, 0 이상)
+
+        시뮬레이션 샘플이 없으면 95% 구간 폭에서 구한 표준편차로 정규분포 샘플을 추출합니다
+        (채널명으로 시드를 고정해 같은 결과면 같은 샘플).
+        """
+        if samples is None:
+            sd = (bounds_95[1] - bounds_95[0]) / (2 * Z_SCORES[95])
+            rng = np.random.default_rng(zlib.crc32(en.encode("utf-8")))
+            samples = (yhat + sd * rng.standard_normal((ANALYTIC_SAMPLE_DRAWS, len(yhat)))).T
+        return np.clip(samples.T, 0, None).astype(np.float32)
+
+    def joint_samples(self):
+        """채널 × 샘플 × 날짜 예측 샘플 → {"channels", "dates", "values"} (예측 기간, float32)"""
+        dates = self.forecasts[self.order[0]]["ds"]
+        return {
+            "channels": list(self.order),
+            "dates": pd.DatetimeIndex(dates[dates >= self.target_dt]),
+            "values": np.stack([self.horizon_samples[en] for en in self.order]),
+        }
 
-        return self.forecasts, target_dt
+    @staticmethod
+    def _quantile_mc_error(samples):
+        """신뢰구간 경계 분위수의 몬테카를로 표준오차 (정규 근사, 행별 중앙값 중 최댓값)
+
+        SE(q_p) ≈ sqrt(p(1-p)/n) / f(q_p),  f(q_p) = φ(z_p) / σ
+        """
+        n = samples.shape[1]
+        sd = samples.std(axis=1)
+        errors = []
+        for p, z in ((0.025, Z_SCORES[95]), (0.05, Z_SCORES[90])):
+            density = np.exp(-0.5 * z ** 2) / np.sqrt(2 * np.pi)
+            errors.append(np.median(np.sqrt(p * (1 - p) / n) * sd / density))
+        return float(max(errors))
+
+    @staticmethod
+    def _analytic_sd(m, fut):
+        """시뮬레이션 없는 예측 표준편차 (fast_engine.analytic_interval_sd)"""
+        t = ((pd.to_datetime(fut["ds"]) - m.start) / m.t_scale).to_numpy()
+        sigma_obs = float(np.mean(m.params["sigma_obs"]))
+        return analytic_interval_sd(t, sigma_obs, m.params["delta"], len(m.changepoints_t), m.y_scale)
+
+    def _holiday_names_by_date(self):
+        """날짜별 공휴일 이름 (lower/upper window 반영)"""
+        names = {}
+        if self.holidays is None or self.holidays.empty:
+            return names
+        for _, h in self.holidays.iterrows():
+            h_date = pd.to_datetime(h["ds"])
+            for offset in range(int(h["lower_window"]), int(h["upper_window"]) + 1):
+                names.setdefault(h_date + pd.Timedelta(days=offset), []).append(h["holiday"])
+        return {d: ", ".join(v) for d, v in names.items()}
+
+    def _build_components(self, fc, fut):
+        """구성요소 테이블 및 요약 통계 생성 (Prophet 기여분 컬럼 그대로 사용)"""
+        comp = pd.DataFrame({"ds": fc["ds"].to_numpy()})
+        for col in ("trend", "weekly", "yearly", "holidays"):
+            comp[col] = fc[col].to_numpy() if col in fc.columns else 0.0
+
+        # 일몰 효과 = sunset_time 회귀변수 기여분, 일몰 시각 = 원본 회귀변수 값
+        comp["sunset_effect"] = fc["sunset_time"].to_numpy()
+        comp["extra_regressors"] = fc["extra_regressors_additive"].to_numpy()
+        comp["sunset_hour"] = fut.sort_values("ds")["sunset_time"].to_numpy()
+        comp["dayofweek"] = comp["ds"].dt.dayofweek
+        comp["holiday_name"] = comp["ds"].map(self._holiday_names_by_date()).fillna("")
+
+        return comp, summarize_components(comp)
+
+    def get_channel_prediction(self, ch, target_dt):
+        """채널 하나의 오늘 예측값 반환"""
+        fc = self.forecasts[ch]
+        row = fc[fc["ds"] == target_dt]
+        if not len(row):
+            row = fc.iloc[[-1]]
+        return {
+            "forecast": float(row["yhat"].iloc[0]),
+            "lower_95": float(row["yhat_lower"].iloc[0]),
+            "upper_95": float(row["yhat_upper"].iloc[0]),
+            "lower_90": float(row["yhat_lower_90"].iloc[0]),
+            "upper_90": float(row["yhat_upper_90"].iloc[0]),
+            "sunset_time": float(row["sunset_time"].iloc[0])
+        }
 
     def get_today_predictions(self, target_dt):
         """오늘 예측값 반환"""
-        predictions = {}
-        for ch in self.order:
-            fc = self.forecasts[ch]
-            row = fc[fc["ds"] == target_dt]
-            if len(row):
-                predictions[ch] = {
-                    "forecast": float(row["yhat"].iloc[0]),
-                    "lower_95": float(row["yhat_lower"].iloc[0]),
-                    "upper_95": float(row["yhat_upper"].iloc[0]),
-                    "lower_90": float(row["yhat_lower_90"].iloc[0]),
-                    "upper_90": float(row["yhat_upper_90"].iloc[0]),
-                    "sunset_time": float(row["sunset_time"].iloc[0])
-                }
-            else:
-                predictions[ch] = {
-                    "forecast": float(fc["yhat"].iloc[-1]),
-                    "lower_95": float(fc["yhat_lower"].iloc[-1]),
-                    "upper_95": float(fc["yhat_upper"].iloc[-1]),
-                    "lower_90": float(fc["yhat_lower_90"].iloc[-1]),
-                    "upper_90": float(fc["yhat_upper_90"].iloc[-1]),
-                    "sunset_time": float(fc["sunset_time"].iloc[-1])
-                }
-        return predictions
+        return {ch: self.get_channel_prediction(ch, target_dt) for ch in self.order}
 
     def get_forecast_dataframe(self, target_dt):
         """전체 예측 데이터프레임 반환"""
@@ -0,0 +1,489 @@
+# ============================================================
+# 예측 작업 큐 (Streamlit 스크립트 스레드 밖에서 학습)
+# ============================================================
+#
+# '분석 실행'은 작업을 프로세스 풀에 넣고 바로 반환합니다. 작업 프로세스는 단계별 진행 상황을
+# 작업 디렉토리의 상태 파일(<job_id>.json)에 기록하고, 끝나면 설정별 결과 파일(results/<설정 키>.pkl)과
+# 학습된 모델(.models.pkl)을 저장합니다. 화면은 상태 파일을 주기적으로 읽어 진행률과
+# 먼저 끝난 채널의 예측을 보여주며, 작업 ID를 주소(?job=...)에 남겨 새로고침해도
+# 같은 작업을 이어서 표시합니다.
+#
+# 학습 동시 실행은 서버 프로세스 전체에서 CPU 코어 수만큼의 학습 슬롯으로 제한합니다.
+# Prophet 작업은 채널 동시 학습 수만큼, NumPy 엔진 작업은 한 칸을 차지하며, 슬롯이 모자라면
+# 들어온 순서(FIFO)대로 대기합니다 (대기 순번은 화면에 표시). 같은 설정의 작업이 대기/실행
+# 중이면 새로 넣지 않고 합류하며, 세션 하나가 동시에 걸어 둘 수 있는 작업 수에도 상한이 있습니다.
+#
+# 작업 · 결과 파일은 공유 캐시(shared_cache) 아래에 두어 여러 레플리카가 함께 씁니다. 같은 설정의
+# 작업은 설정별 잠금 파일을 잡은 한 레플리카만 계산합니다. 잠금을 못 잡은 작업은 학습 슬롯을 돌려주고
+# 큐에서 잠금이 풀리기를 기다렸다가 (그동안 다른 작업이 슬롯을 씀) 대기열 맨 앞으로 돌아가며,
+# 그 사이 계산된 결과가 있으면 그대로 받아 끝납니다. 다른 레플리카가 넣은 작업도 주소(?job=...)로
+# 진행 상황을 볼 수 있습니다.
+#
+# 백테스트도 같은 큐로 실행합니다. 기준일 동시 학습 수만큼 슬롯을 차지하되 (예측 작업이 계속 돌 수 있도록
+# 전체 슬롯의 절반까지) 같은 세션별 상한을 적용하고, 진행률은 같은 상태 파일로 보여 줍니다.
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from shared_cache import (CACHE_DIR, HOSTNAME, STATUS_STALE_SECONDS, FileLock, process_gone, read_pickle,
+                          write_atomic, write_pickle)
+
+JOBS_DIR = os.path.join(CACHE_DIR, "jobs")
+RESULTS_DIR = os.path.join(CACHE_DIR, "results")
+
+# 서버 전체 학습 슬롯 수 (동시에 실행되는 채널 학습 = CmdStan 프로세스 수 상한)
+FIT_SLOTS = os.cpu_count() or 1
+
+# 세션 하나가 동시에 걸어 둘 수 있는 작업 수 (대기 + 실행)
+MAX_JOBS_PER_SESSION = 2
+
+# 백테스트 작업 하나가 차지할 수 있는 학습 슬롯 비율 (나머지는 예측 작업용)
+BACKTEST_SLOT_SHARE = 0.5
+
+# 끝난 작업 파일 보관 기간 (초)
+JOB_RETENTION = 24 * 3600
+
+# 단계 → 화면 표시 이름
+STAGES = {
+    "queued": "대기 중",
+    "waiting": "다른 서버의 같은 예측 대기",
+    "loading": "데이터 로드",
+    "fitting": "모델 학습",
+    "backtesting": "백테스트",
+    "finishing": "결과 정리",
+    "done": "완료",
+    "failed": "실패",
+}
+
+# 단계별 진행률 구간 (학습 단계는 끝난 채널 수에 비례)
+_LOAD_PROGRESS = 0.1
+_FIT_PROGRESS = 0.9
+
+# 같은 설정을 다른 레플리카가 계산 중일 때 잠금을 다시 확인하는 간격 (초)
+_WAIT_POLL_SECONDS = 1
+
+# 작업 함수 반환값: 다른 레플리카가 같은 설정을 계산 중이라 학습하지 않고 돌아옴
+JOB_BUSY = "busy"
+
+
+class AdmissionError(RuntimeError):
+    """세션별 작업 수 상한 초과"""
+
+
+def job_slots(settings, fit_slots=FIT_SLOTS):
+    """작업 하나가 차지하는 학습 슬롯 수 (Prophet: 채널 동시 학습 수, NumPy 엔진: 1)"""
+    from forecaster import FIT_WORKERS
+
+    return 1 if settings[3] == "numpy" else max(1, min(FIT_WORKERS, fit_slots))
+
+
+def backtest_slots(n_cutoffs, fit_slots=FIT_SLOTS):
+    """백테스트 작업 하나가 차지하는 학습 슬롯 수 (기준일 동시 학습 수, 전체 슬롯의 BACKTEST_SLOT_SHARE까지)"""
+    return max(1, min(n_cutoffs, int(fit_slots * BACKTEST_SLOT_SHARE)))
+
+
+def _paths(job_id, jobs_dir):
+    """작업 파일 경로 (상태, 결과, 학습 모델)"""
+    base = os.path.join(jobs_dir, job_id)
+    return f"{base}.json", f"{base}.pkl", f"{base}.models.pkl"
+
+
+def result_paths(settings, results_dir=RESULTS_DIR):
+    """설정별 결과 파일 경로 (결과, 학습 모델, 계산 잠금) - 레플리카 간 공유"""
+    name = hashlib.sha1(repr(tuple(settings)).encode("utf-8")).hexdigest()[:16]
+    base = os.path.join(results_dir, name)
+    return f"{base}.pkl", f"{base}.models.pkl", f"{base}.lock"
+
+
+def _write_status(path, status):
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(status, f, ensure_ascii=False)
+    write_atomic(path, write)
+
+
+def read_status(job_id, jobs_dir=JOBS_DIR):
+    """작업 상태 dict (없으면 None)"""
+    try:
+        with open(_paths(job_id, jobs_dir)[0], encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_result(settings, results_dir=RESULTS_DIR):
+    """설정의 마지막 (결과, ScenarioEngine) - 어느 레플리카가 계산했든 (없거나 읽을 수 없으면 (None, None))"""
+    result_path, models_path, _ = result_paths(settings, results_dir)
+    result = read_pickle(result_path)
+    return result, (read_pickle(models_path) if result is not None else None)
+
+
+def result_mtime(settings, results_dir=RESULTS_DIR):
+    """설정의 결과 파일 수정 시각 (없으면 None) - 다른 레플리카가 새로 계산했는지 확인용"""
+    try:
+        return os.path.getmtime(result_paths(settings, results_dir)[0])
+    except OSError:
+        return None
+
+
+def load_job_result(job_id, jobs_dir=JOBS_DIR, results_dir=RESULTS_DIR):
+    """끝난 작업의 (결과, ScenarioEngine) - 결과 파일을 읽을 수 없으면 OSError"""
+    status = read_status(job_id, jobs_dir)
+    if status is None:
+        raise FileNotFoundError(f"작업 상태 파일 없음: {job_id}")
+    result, scenario_engine = load_result(status["settings"], results_dir)
+    if result is None or scenario_engine is None:
+        raise FileNotFoundError(f"작업 결과 파일 없음: {job_id}")
+    return result, scenario_engine
+
+
+def load_backtest_result(job_id, jobs_dir=JOBS_DIR):
+    """끝난 백테스트 작업의 기준일별 예측 DataFrame - 결과 파일을 읽을 수 없으면 OSError"""
+    predictions = read_pickle(_paths(job_id, jobs_dir)[1])
+    if predictions is None:
+        raise FileNotFoundError(f"백테스트 결과 파일 없음: {job_id}")
+    return predictions
+
+
+def tuned_stamp():
+    """튜닝 결과 파일 수정 시각 (파일이 갱신되면 새로 학습)"""
+    from forecaster import TUNED_PARAMS_PATH
+
+    return os.path.getmtime(TUNED_PARAMS_PATH) if os.path.exists(TUNED_PARAMS_PATH) else None
+
+
+def build_result(forecaster, stamp):
+    """예측이 끝난 forecaster → 앱 결과 dict (실행 기록 + 정확도 갱신 포함)
+
+    학습된 모델 객체는 넣지 않습니다 (ScenarioEngine으로 따로 보관).
+    """
+    import sqlite3
+    from archive import archive_run
+    from accuracy import update_accuracy
+    from exports import result_fingerprint
+
+    target_dt = forecaster.target_dt
+    forecast_df = forecaster.get_forecast_dataframe(target_dt)
+    result = {
+        "colors": forecaster.colors,
+        "order": forecaster.order,
+        "forecasts": forecaster.forecasts,
+        "target_dt": target_dt,
+        "predictions": forecaster.get_today_predictions(target_dt),
+        "forecast_df": forecast_df,
+        "fingerprint": result_fingerprint(forecast_df),
+        "uncertainty_mode": forecaster.uncertainty_mode,
+        "engine": forecaster.engine,
+        "interval_mc_error": forecaster.interval_mc_error,
+        "components": forecaster.components,
+        "component_stats": forecaster.component_stats,
+        "data": forecaster.df,
+        "data_fingerprint": result_fingerprint(forecaster.df),
+        "channels": forecaster.channels,
+        "groups": forecaster.groups,
+        "channel_notes": list(forecaster.channel_notes),
+        "tuned_channels": sorted(forecaster.tuned_params) if forecaster.engine == "prophet" else [],
+        "tuned_stamp": stamp,
+        "reused_channels": list(forecaster.reused_channels),
+        "model_bytes": dict(forecaster.model_bytes),
+        "training_policy": forecaster.training_policy,
+        "training_days": forecaster.training_days,
+        "holidays": forecaster.holidays,
+        "samples": forecaster.joint_samples(),
+        "computed_at": time.time()
+    }
+
+    # 실행 기록 + 새 실제값으로 정확도 갱신 (같은 기준일에 같은 결과면 건너뜀, 기록 실패는 예측 결과에 영향 없음)
+    try:
+        result["archive_run_id"] = archive_run(forecast_df, target_dt, result["fingerprint"],
+                                               result["data_fingerprint"], forecaster.model_config())
+        update_accuracy(forecaster.df, forecaster.channels)
+    except sqlite3.Error:
+        result["archive_run_id"] = None
+    return result
+
+
+def run_forecast_job(job_id, settings, jobs_dir=JOBS_DIR, max_workers=None, results_dir=RESULTS_DIR):
+    """작업 프로세스: 데이터 로드 → 채널별 학습 (진행률 기록) → 결과 / 학습 모델 저장
+
+    settings: (sheets_id, gid, uncertainty_mode, engine), max_workers: 채널 동시 학습 수 (받은 슬롯 수)
+    같은 설정을 다른 레플리카가 계산 중이면 기다리지 않고 JOB_BUSY를 반환합니다 (큐가 슬롯을 돌려받고
+    잠금이 풀리면 다시 실행). 잠금을 잡았을 때 이 작업 이후에 계산된 결과가 있으면 그 결과로 끝냅니다.
+    """
+    from forecaster import ChannelCache, NewsViewershipForecaster, MAX_PREDICT_DAYS
+    from scenario import ScenarioEngine
+
+    status_path = _paths(job_id, jobs_dir)[0]
+    result_path, models_path, lock_path = result_paths(settings, results_dir)
+    status = read_status(job_id, jobs_dir) or {"job_id": job_id, "settings": list(settings)}
+    lock = FileLock(lock_path)
+
+    def update(**fields):
+        status.update(fields, updated=time.time())
+        _write_status(status_path, status)
+        lock.refresh()
+
+    sheets_id, gid, uncertainty_mode, engine = settings
+    try:
+        if not lock.acquire(blocking=False):
+            update(state="running", stage="waiting", progress=0.0, pid=os.getpid())
+            return JOB_BUSY
+        update(state="running", stage="loading", progress=0.0, started=time.time(), pid=os.getpid())
+
+        # 기다리는 동안 다른 레플리카가 이 작업 이후에 계산을 마쳤으면 그 결과 사용
+        mtime = result_mtime(settings, results_dir)
+        if mtime is not None and mtime >= status.get("created", status["started"]) and os.path.exists(models_path):
+            update(state="done", stage="done", progress=1.0, finished=time.time(), shared=True)
+            return None
+
+        stamp = tuned_stamp()
+        forecaster = NewsViewershipForecaster(sheets_id, gid, uncertainty_mode=uncertainty_mode, engine=engine,
+                                              max_workers=max_workers, channel_cache=ChannelCache())
+        forecaster.prepare()
+
+        total = len(forecaster.channels)
+        update(stage="fitting", progress=_LOAD_PROGRESS, done=0, total=total, order=forecaster.order,
+               colors=forecaster.colors, groups=forecaster.groups, channel_notes=list(forecaster.channel_notes),
+               target_dt=forecaster.target_dt.isoformat() if forecaster.target_dt is not None else None,
+               predictions={})
+        predictions = {}
+        for done, (ch, _) in enumerate(forecaster.iter_forecast(MAX_PREDICT_DAYS), start=1):
+            # 먼저 끝난 채널의 오늘 예측은 화면에 바로 표시
+            predictions[ch] = forecaster.get_channel_prediction(ch, forecaster.target_dt)
+            update(done=done, reused=len(forecaster.reused_channels), target_dt=forecaster.target_dt.isoformat(),
+                   predictions=predictions, progress=_LOAD_PROGRESS + (_FIT_PROGRESS - _LOAD_PROGRESS) * done / total)
+
+        update(stage="finishing", progress=_FIT_PROGRESS)
+        result = build_result(forecaster, stamp)
+        # 학습 모델을 먼저 써서 결과 파일이 보이면 짝이 되는 모델도 있도록
+        write_pickle(models_path, ScenarioEngine.from_forecaster(forecaster))
+        write_pickle(result_path, result)
+        update(state="done", stage="done", progress=1.0, finished=time.time(), fingerprint=result["fingerprint"])
+    except Exception as e:
+        update(state="failed", stage="failed", error=str(e), finished=time.time())
+    finally:
+        lock.release()
+
+
+def run_backtest_job(job_id, settings, jobs_dir=JOBS_DIR, max_workers=None, request=None):
+    """작업 프로세스: 롤링 원점 백테스트 (기준일 진행률 기록) → 기준일별 예측 저장 (<job_id>.pkl)
+
+    request: run_backtest 인자 dict ("data", "holidays", "channels" + 키워드 인자),
+    max_workers: 기준일 동시 학습 수 (받은 슬롯 수)
+    """
+    from backtest import run_backtest
+
+    status_path, predictions_path, _ = _paths(job_id, jobs_dir)
+    status = read_status(job_id, jobs_dir) or {"job_id": job_id, "settings": list(settings)}
+
+    def update(**fields):
+        status.update(fields, updated=time.time())
+        _write_status(status_path, status)
+
+    def on_progress(done, total):
+        update(done=done, total=total, progress=done / max(total, 1))
+
+    try:
+        update(state="running", stage="backtesting", progress=0.0, started=time.time(), pid=os.getpid())
+        request = dict(request)
+        data, holidays, channels = request.pop("data"), request.pop("holidays"), request.pop("channels")
+        predictions = run_backtest(data, holidays, channels, max_workers=max_workers, on_progress=on_progress,
+                                   **request)
+        write_pickle(predictions_path, predictions)
+        update(state="done", stage="done", progress=1.0, finished=time.time())
+    except Exception as e:
+        update(state="failed", stage="failed", error=str(e), finished=time.time())
+
+
+class ForecastJobQueue:
+    """학습 슬롯 기반 예측 / 백테스트 작업 큐 (서버 프로세스에 하나, 세션 간 공유)
+
+    on_done(job_id, settings)은 예측 작업이 끝나면 (성공/실패 모두) 서버 프로세스에서 호출됩니다.
+    """
+
+    def __init__(self, jobs_dir=JOBS_DIR, fit_slots=FIT_SLOTS, max_per_session=MAX_JOBS_PER_SESSION,
+                 on_done=None):
+        self.jobs_dir = jobs_dir
+        self.fit_slots = fit_slots
+        self.max_per_session = max_per_session
+        self.on_done = on_done
+        os.makedirs(jobs_dir, exist_ok=True)
+        self._lock = threading.RLock()  # 완료 콜백이 submit 안에서 바로 호출될 수 있음
+        self._pool = None
+        self._waiting = deque()  # 슬롯을 기다리는 작업 (FIFO)
+        self._jobs = {}          # job_id → 대기/실행 중인 작업 {"settings", "slots", "owners", "task"}
+        self._known = set()      # 이 서버에서 넣은 job_id
+        self._active = {}        # 설정 → 대기/실행 중인 job_id
+        self._latest = {}        # 설정 → 마지막 job_id
+        self._used = 0           # 사용 중인 슬롯 수
+        self._parked = []        # 다른 레플리카의 계산이 끝나길 기다리는 작업 (슬롯 없음)
+        self._watcher = None     # 기다리는 작업의 잠금을 확인하는 스레드
+        self.cleanup()
+
+    def _executor(self):
+        # 서버의 스레드 상태를 복제하지 않도록 spawn으로 작업 프로세스 생성
+        # (동시 작업 수는 슬롯이 제한하므로 풀 크기는 슬롯 수 = NumPy 엔진 작업만 있을 때의 최대치)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.fit_slots,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def submit(self, settings, owner=None):
+        """작업 추가 → job_id
+
+        같은 설정의 작업이 대기/실행 중이면 그 작업에 합류 (상한 검사 없음).
+        owner(세션 ID)의 대기/실행 작업이 상한에 도달했으면 AdmissionError.
+        """
+        settings = tuple(settings)
+        return self._enqueue(settings, owner, job_slots(settings, self.fit_slots), (run_forecast_job,))
+
+    def submit_backtest(self, key, request, n_cutoffs, owner=None):
+        """백테스트 작업 추가 → job_id (합류 · 세션별 상한은 submit과 같음)
+
+        key: 같은 백테스트를 구분하는 값들 (JSON 직렬화 가능), request: run_backtest_job 참고
+        """
+        settings = ("backtest", *key)
+        return self._enqueue(settings, owner, backtest_slots(n_cutoffs, self.fit_slots),
+                             (run_backtest_job, request))
+
+    def _enqueue(self, settings, owner, slots, task):
+        """작업 등록 후 슬롯이 있으면 시작 → job_id (task: (작업 함수, 추가 인자...))"""
+        with self._lock:
+            job_id = self._active.get(settings)
+            if job_id is not None:
+                self._jobs[job_id]["owners"].add(owner)
+                return job_id
+            if owner is not None and self.session_jobs(owner) >= self.max_per_session:
+                raise AdmissionError(f"이미 진행 중인 작업이 {self.max_per_session}개 있습니다. "
+                                     "작업이 끝난 뒤 다시 실행하세요")
+
+            job_id = uuid.uuid4().hex[:12]
+            _write_status(_paths(job_id, self.jobs_dir)[0], {
+                "job_id": job_id, "settings": list(settings), "state": "queued", "stage": "queued",
+                "progress": 0.0, "created": time.time(), "updated": time.time(),
+                "host": HOSTNAME, "server_pid": os.getpid(),
+            })
+            self._jobs[job_id] = {"settings": settings, "slots": slots, "owners": {owner}, "task": task}
+            self._waiting.append(job_id)
+            self._known.add(job_id)
+            self._active[settings] = job_id
+            self._latest[settings] = job_id
+            self._dispatch()
+        return job_id
+
+    def _dispatch(self):
+        """대기열 앞에서부터 슬롯이 남는 만큼 작업 시작 (앞 작업을 건너뛰지 않음) - 잠금 안에서 호출"""
+        while self._waiting and self._jobs[self._waiting[0]]["slots"] <= self.fit_slots - self._used:
+            job_id = self._waiting.popleft()
+            entry = self._jobs[job_id]
+            self._used += entry["slots"]
+            func, *extra = entry["task"]
+            args = (func, job_id, entry["settings"], self.jobs_dir, entry["slots"], *extra)
+            try:
+                future = self._executor().submit(*args)
+            except BrokenProcessPool:
+                # 작업 프로세스가 비정상 종료되어 풀이 망가졌으면 새로 생성
+                self._pool = None
+                future = self._executor().submit(*args)
+            future.add_done_callback(lambda fut, job_id=job_id: self._finished(job_id, fut))
+
+    def _finished(self, job_id, future):
+        """작업 종료 - 슬롯 반납 후 다음 작업 시작 (다른 레플리카가 계산 중이라 돌아온 작업은 대기로)"""
+        with self._lock:
+            self._used -= self._jobs[job_id]["slots"]
+            if future.exception() is None and future.result() == JOB_BUSY:
+                self._parked.append(job_id)
+                if self._watcher is None:
+                    self._watcher = threading.Thread(target=self._watch_parked, daemon=True)
+                    self._watcher.start()
+                self._dispatch()
+                return
+            entry = self._jobs.pop(job_id)
+            if self._active.get(entry["settings"]) == job_id:
+                del self._active[entry["settings"]]
+            self._dispatch()
+
+        if future.exception() is not None:
+            # 작업 함수 밖의 실패 (프로세스 비정상 종료 등)
+            status = read_status(job_id, self.jobs_dir) or {"job_id": job_id, "settings": list(entry["settings"])}
+            status.update(state="failed", stage="failed", error=str(future.exception()), finished=time.time())
+            _write_status(_paths(job_id, self.jobs_dir)[0], status)
+        if self.on_done is not None and entry["task"][0] is run_forecast_job:
+            self.on_done(job_id, entry["settings"])
+
+    def _watch_parked(self):
+        """기다리는 작업의 설정별 잠금이 풀리면 대기열 맨 앞으로 되돌려 실행 (기다리는 작업이 없으면 종료)"""
+        while True:
+            time.sleep(_WAIT_POLL_SECONDS)
+            with self._lock:
+                ready = []
+                for job_id in self._parked:
+                    lock = FileLock(result_paths(self._jobs[job_id]["settings"])[2])
+                    if lock.acquire(blocking=False):
+                        lock.release()
+                        ready.append(job_id)
+                    else:
+                        # 다른 레플리카에게 잃어버린 작업으로 보이지 않도록 상태 갱신
+                        status = read_status(job_id, self.jobs_dir)
+                        if status is not None:
+                            status["updated"] = time.time()
+                            _write_status(_paths(job_id, self.jobs_dir)[0], status)
+                for job_id in reversed(ready):
+                    self._parked.remove(job_id)
+                    self._waiting.appendleft(job_id)
+                self._dispatch()
+                if not self._parked:
+                    self._watcher = None
+                    return
+
+    def session_jobs(self, owner):
+        """세션이 건 대기/실행 중인 작업 수 (합류한 작업 포함)"""
+        with self._lock:
+            return sum(owner in entry["owners"] for entry in self._jobs.values())
+
+    def status(self, job_id):
+        """작업 상태 + 대기 순번 / 슬롯 사용량 (잃어버린 작업은 failed로 표시, 없으면 None)
+
+        position: 대기 중이면 1부터 시작하는 순번 (슬롯을 받았으면 None)
+        """
+        status = read_status(job_id, self.jobs_dir)
+        if status is None:
+            return None
+        with self._lock:
+            if status["state"] in ("queued", "running") and job_id not in self._known and self._is_lost(status):
+                # 서버 재시작 등으로 아무도 진행하지 않는 작업 (다른 레플리카가 진행 중인 작업은 그대로 표시)
+                status.update(state="failed", stage="failed", error="서버가 다시 시작되어 작업이 중단되었습니다")
+            status["position"] = self._waiting.index(job_id) + 1 if job_id in self._waiting else None
+            status["slots_used"], status["fit_slots"] = self._used, self.fit_slots
+        return status
+
+    @staticmethod
+    def _is_lost(status):
+        """이 서버가 모르는 작업을 넣은 서버가 없어졌거나 (같은 호스트) 오래 갱신되지 않았는지"""
+        if status.get("server_pid") == os.getpid() and status.get("host") == HOSTNAME:
+            return True  # 이 서버가 넣었는데 기록에 없음
+        return (process_gone(status.get("host"), status.get("server_pid"))
+                or time.time() - status.get("updated", 0) >= STATUS_STALE_SECONDS)
+
+    def latest_job(self, settings):
+        """설정의 마지막 작업 ID (이 서버에서 넣은 작업 중, 없으면 None)"""
+        return self._latest.get(tuple(settings))
+
+    def cleanup(self):
+        """보관 기간이 지난 작업 파일 삭제"""
+        cutoff = time.time() - JOB_RETENTION
+        for name in os.listdir(self.jobs_dir):
+            path = os.path.join(self.jobs_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,52 @@
+# ============================================================
+# 채널 간 결합 예측 확률 (예측 샘플 배열의 벡터화 집계)
+# ============================================================
+#
+# values는 forecaster.joint_samples()의 채널 × 샘플 × 날짜 배열입니다. 채널 모델은
+# 따로 학습되므로 같은 샘플 번호끼리 묶어 채널 간 결합 분포로 사용하고, 모든 확률은
+# 샘플 축 평균 한 번으로 구합니다 (반복문 없음).
+
+import numpy as np
+import pandas as pd
+
+
+def exceedance_probability(values, threshold):
+    """P(시청률 > threshold) → 채널 × 날짜"""
+    return (values > threshold).mean(axis=1)
+
+
+def rank_probabilities(values):
+    """P(채널이 r위) → 채널 × 순위 × 날짜 (1위 = 시청률이 가장 높은 채널, 0번 인덱스)"""
+    n_channels = values.shape[0]
+    order = np.argsort(-values, axis=0, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(n_channels)[:, None, None], axis=0)
+    # (채널, 샘플, 날짜) == (순위) 비교를 한 번에: 채널 × 순위 × 샘플 × 날짜
+    onehot = ranks[:, None, :, :] == np.arange(n_channels)[None, :, None, None]
+    return onehot.mean(axis=2)
+
+
+def beat_probabilities(values):
+    """P(채널 i > 채널 j) → 채널 × 채널 × 날짜"""
+    return (values[:, None, :, :] > values[None, :, :, :]).mean(axis=2)
+
+
+def joint_probabilities(joint, threshold, start=None, days=8):
+    """예측 시작일부터 days일의 초과 확률 · 순위 확률 · 맞대결 확률 → dict
+
+    joint: forecaster.joint_samples() 결과, start: 시작일 (None이면 예측 기간 첫날)
+    """
+    dates = joint["dates"]
+    first = 0 if start is None else int(dates.searchsorted(pd.Timestamp(start)))
+    window = slice(first, first + days)
+    values = joint["values"][:, :, window]
+    dates, channels = dates[window], joint["channels"]
+
+    return {
+        "dates": dates,
+        "channels": channels,
+        "n_samples": values.shape[1],
+        "exceedance": pd.DataFrame(exceedance_probability(values, threshold), index=channels, columns=dates),
+        "ranks": rank_probabilities(values),
+        "beats": beat_probabilities(values),
+    }
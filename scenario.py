@@ -0,0 +1,163 @@
+# ============================================================
+# What-if 시나리오 (학습된 모델 재사용, 재학습 없음)
+# ============================================================
+#
+# 예측 기간의 공휴일 지정/제외, 일몰 시각 조정을 받아 학습된 모델로 다시 예측합니다.
+# 시나리오가 바꾸는 것은 공휴일 항과 일몰 회귀변수 항뿐이므로, 두 항만 새 프레임으로
+# 다시 계산해 (시나리오 - 기준) 차이를 기준 예측과 신뢰구간에 더합니다.
+#
+# - Prophet: 보관된 SlimProphet에서 복원한 모델에 수정한 공휴일 표를 넣고 predict_seasonal_components
+#   (벡터화된 특징 행렬 × 계수) 호출 - 추세 시뮬레이션 없음
+# - NumPy 엔진: 공휴일 발생 날짜만 바꾼 복사본으로 전체 채널을 한 번에 predict
+#   일몰 시나리오는 지원하지 않습니다 - 일몰 시각과 연간 계절성 사이 배분이 릿지 사전분포에 좌우되어
+#   일몰 계수가 Prophet과 부호까지 달라질 수 있으므로 (supports_sunset)
+#
+# 공휴일 효과는 학습에 쓰인 공휴일 이름만 가능합니다 (계수가 있는 항목).
+
+import copy
+import time
+
+import numpy as np
+import pandas as pd
+
+from fast_engine import RidgeForecastEngine, holiday_keys
+from forecaster import SharedFeatureCache
+
+# 시나리오가 바꾸는 구성요소 (기준 예측에 이미 있는 컬럼)
+EFFECT_COLUMNS = ["holidays", "extra_regressors_additive"]
+
+FORECAST_COLUMNS = ["yhat", "yhat_lower", "yhat_upper", "yhat_lower_90", "yhat_upper_90"]
+
+
+def scenario_holidays(holidays, add=None, remove=None):
+    """공휴일 표 수정
+
+    add: {날짜: 공휴일 이름} - 전후 창(window)은 같은 이름 공휴일의 설정을 따름
+    remove: 날짜 목록 - 그날로 지정된 공휴일 제거 (전후 창 효과 포함)
+    """
+    holidays = holidays.copy()
+    holidays["ds"] = pd.to_datetime(holidays["ds"])
+    dates = holidays["ds"].dt.normalize()
+    if remove:
+        keep = ~dates.isin(pd.to_datetime(list(remove)).normalize())
+        holidays, dates = holidays[keep], dates[keep]
+
+    rows = []
+    for date, name in (add or {}).items():
+        template = holidays[holidays["holiday"] == name]
+        lower, upper = ((int(template["lower_window"].iloc[0]), int(template["upper_window"].iloc[0]))
+                        if len(template) else (0, 0))
+        rows.append({"holiday": name, "ds": pd.Timestamp(date).normalize(),
+                     "lower_window": lower, "upper_window": upper})
+    if rows:
+        holidays = pd.concat([holidays, pd.DataFrame(rows)], ignore_index=True)
+    return holidays.reset_index(drop=True)
+
+
+class ScenarioEngine:
+    """학습된 채널 모델(SlimProphet / RidgeForecastEngine) + 기준 예측 → 공휴일/일몰 시나리오 재예측"""
+
+    def __init__(self, models, forecasts, holidays, sunset, target_dt):
+        """models/forecasts: {채널명: 모델/예측}, sunset: 예측 기간 날짜별 일몰 시각 Series"""
+        self.models = models
+        self.holidays = holidays
+        self.sunset = sunset
+        self.target_dt = target_dt
+        self.order = list(forecasts)
+
+        # 예측 기간 행만 보관 (기준값 + 시나리오가 바꾸는 구성요소)
+        self.baseline = {
+            en: fc.loc[fc["ds"] >= target_dt, ["ds", *FORECAST_COLUMNS, *EFFECT_COLUMNS]].reset_index(drop=True)
+            for en, fc in forecasts.items()
+        }
+
+    @classmethod
+    def from_forecaster(cls, forecaster):
+        """예측이 끝난 NewsViewershipForecaster에서 생성"""
+        target_dt = forecaster.target_dt
+        comp = forecaster.components[forecaster.order[0]]
+        horizon = comp[comp["ds"] >= target_dt]
+        sunset = pd.Series(horizon["sunset_hour"].to_numpy(), index=pd.DatetimeIndex(horizon["ds"]))
+        forecasts = {en: forecaster.forecasts[en] for en in forecaster.order}
+        return cls(dict(forecaster.models), forecasts, forecaster.holidays, sunset, target_dt)
+
+    @property
+    def supports_sunset(self):
+        """일몰 시각 시나리오 가능 여부 (Prophet 모델만)"""
+        return not any(isinstance(m, RidgeForecastEngine) for m in self.models.values())
+
+    def holiday_names(self):
+        """시나리오에 쓸 수 있는 공휴일 이름 (학습에 쓰인 이름)"""
+        names = set()
+        for m in self.models.values():
+            if isinstance(m, RidgeForecastEngine):
+                names.update(k[0] for k in m.holiday_keys)
+            elif m.train_holiday_names is not None:
+                names.update(m.train_holiday_names)
+        return sorted(names)
+
+    def holiday_dates(self):
+        """예측 기간 안에 지정된 공휴일 {날짜: 이름}"""
+        dates = pd.to_datetime(self.holidays["ds"]).dt.normalize()
+        inside = dates.isin(self.sunset.index)
+        return dict(zip(dates[inside], self.holidays.loc[inside, "holiday"]))
+
+    def run(self, add_holidays=None, remove_holidays=None, sunset_shift=0.0, sunset_overrides=None):
+        """시나리오 재예측 → ({채널명: 예측 기간 DataFrame}, 소요 시간(초))
+
+        반환 DataFrame 컬럼: ds, FORECAST_COLUMNS(시나리오), baseline(기준 yhat), delta
+        sunset_shift: 예측 기간 전체 일몰 시각 조정 (시간), sunset_overrides: {날짜: 일몰 시각}
+        일몰 조정은 supports_sunset일 때만 가능 (아니면 ValueError)
+        """
+        if (sunset_shift or sunset_overrides) and not self.supports_sunset:
+            raise ValueError("NumPy 엔진 결과는 일몰 시각 시나리오를 지원하지 않습니다")
+        t0 = time.perf_counter()
+        holidays = scenario_holidays(self.holidays, add_holidays, remove_holidays)
+        sunset = self.sunset + sunset_shift
+        for date, value in (sunset_overrides or {}).items():
+            date = pd.Timestamp(date).normalize()
+            if date in sunset.index:
+                sunset.loc[date] = value
+
+        effects = self._effects(holidays, sunset)
+        out = {}
+        for en in self.order:
+            base = self.baseline[en]
+            delta = effects[en] - base[EFFECT_COLUMNS].sum(axis=1).to_numpy()
+            fc = pd.DataFrame({"ds": base["ds"]})
+            for col in FORECAST_COLUMNS:
+                # 시나리오는 평균만 옮기고 불확실성(추세 변화 · 관측 잡음)은 그대로
+                fc[col] = (base[col].to_numpy() + delta).clip(min=0)
+            fc["baseline"] = base["yhat"].to_numpy()
+            fc["delta"] = fc["yhat"] - fc["baseline"]
+            out[en] = fc
+        return out, time.perf_counter() - t0
+
+    def _effects(self, holidays, sunset):
+        """채널별 (공휴일 + 일몰) 기여분 - 시나리오 프레임 기준"""
+        ds = pd.DatetimeIndex(sunset.index)
+        effects = {}
+
+        # NumPy 엔진은 모든 채널이 모델 하나를 공유 → 한 번에 계산
+        ridge = {id(m): m for m in self.models.values() if isinstance(m, RidgeForecastEngine)}
+        for engine in ridge.values():
+            scenario = copy.copy(engine)
+            _, occurrences = holiday_keys(holidays)
+            scenario.holiday_occurrences = {k: occurrences.get(k, []) for k in engine.holiday_keys}
+            for en, fc in scenario.predict(ds, sunset.to_numpy()).items():
+                effects[en] = (fc["holidays"] + fc["extra_regressors_additive"]).to_numpy()
+
+        # Prophet: 채널 간 같은 특징 행렬은 한 번만 생성
+        feature_cache = SharedFeatureCache()
+        for en, m in self.models.items():
+            if en in effects:
+                continue
+            scenario = m.rebuild()  # SlimProphet → 매번 새 Prophet 객체 (보관된 상태는 바뀌지 않음)
+            scenario.holidays = holidays
+            scenario.uncertainty_samples = 0
+            feature_cache.attach(scenario)
+            frame = scenario.setup_dataframe(pd.DataFrame({"ds": ds, "sunset_time": sunset.to_numpy()}))
+            comp = scenario.predict_seasonal_components(frame)
+            holiday_effect = comp["holidays"].to_numpy() if "holidays" in comp else np.zeros(len(ds))
+            effects[en] = holiday_effect + comp["extra_regressors_additive"].to_numpy()
+        return effects
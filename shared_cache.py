@@ -0,0 +1,222 @@
+# ============================================================
+# 레플리카 간 공유 캐시 (원본 CSV · 채널 학습 결과 · 예측 결과)
+# ============================================================
+#
+# 여러 Streamlit 레플리카가 같은 캐시 디렉토리(NEWS_FORECAST_CACHE_DIR, 기본 cache/)를
+# 보면 한 레플리카가 계산한 결과를 모두가 씁니다. 파일은 임시 파일에 쓴 뒤 교체해 읽는 쪽이
+# 반쯤 쓰인 파일을 보지 않게 하고, 같은 항목을 여러 프로세스가 동시에 계산하지 않도록
+# 잠금을 잡은 한 곳만 계산한 뒤 나머지는 기다렸다가 읽습니다.
+#
+# 잠금은 지우지 않고 계속 두는 잠금 파일에 거는 OS 잠금(fcntl.flock, Windows는 msvcrt.locking)입니다.
+# 잡은 프로세스가 죽으면 OS가 잠금을 풀어 주므로 버려진 잠금을 판단해 지우는 과정이 없고,
+# 따라서 두 프로세스가 동시에 잠금을 잡는 경쟁도 생기지 않습니다. 공유 디렉토리는 잠금을
+# 지원하는 파일 시스템(NFSv4 등)이어야 합니다.
+
+import os
+import json
+import time
+import pickle
+import socket
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+CACHE_DIR = os.environ.get("NEWS_FORECAST_CACHE_DIR", "cache")
+
+# 작업 상태 파일 등을 이 시간(초) 동안 갱신하지 않으면 진행하는 곳이 없는 것으로 간주
+STATUS_STALE_SECONDS = 600
+
+# 잠금 대기 중 다시 시도하는 간격 (초)
+LOCK_POLL_SECONDS = 0.2
+
+# 이 프로세스 식별자 (잠금 / 작업 상태 파일에 기록)
+HOSTNAME = socket.gethostname()
+
+
+def cache_path(*parts):
+    """공유 캐시 디렉토리 아래 경로 (상위 디렉토리는 만들어 둠)"""
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def write_atomic(path, write):
+    """임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)
+
+    임시 파일 이름에 호스트 · PID · 스레드를 넣어 공유 디렉토리에서도 서로 겹치지 않음
+    """
+    tmp = f"{path}.{HOSTNAME}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_bytes(path, data):
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            f.write(data)
+    write_atomic(path, write)
+
+
+def write_pickle(path, obj):
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    write_atomic(path, write)
+
+
+def read_bytes(path):
+    """파일 내용 (없으면 None)"""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def read_pickle(path):
+    """pickle 파일 내용 (없거나 읽을 수 없으면 None)"""
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def is_fresh(path, max_age):
+    """파일이 있고 max_age초 안에 쓰였는지 (max_age None이면 있기만 하면 됨)"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return False
+    return max_age is None or time.time() - mtime < max_age
+
+
+def process_gone(host, pid):
+    """기록된 프로세스가 없어졌는지 (다른 호스트이거나 확인할 수 없으면 False)"""
+    if host != HOSTNAME or not pid or os.name == "nt":
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+class LockTimeout(TimeoutError):
+    """잠금을 제한 시간 안에 얻지 못함"""
+
+
+class FileLock:
+    """잠금 파일 기반 프로세스 간 (레플리카 간) 잠금
+
+    with FileLock(path): ... 로 사용합니다. 잠금 파일은 지우지 않고 재사용하며 (지우면 다른 프로세스가
+    지워진 파일에 잠금을 걸 수 있음), 잡은 프로세스(호스트, PID)를 기록해 둡니다.
+    """
+
+    def __init__(self, path, timeout=None):
+        self.path = path
+        self.timeout = timeout
+        self._fd = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    @property
+    def held(self):
+        return self._fd is not None
+
+    def _try_lock(self, fd):
+        """OS 잠금 시도 → 성공 여부 (다른 곳이 잡고 있으면 False)"""
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def acquire(self, blocking=True):
+        """잠금 획득 → 성공 여부 (blocking이면 얻을 때까지 대기, 제한 시간 초과 시 LockTimeout)"""
+        deadline = None if self.timeout is None else time.time() + self.timeout
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+        try:
+            while not self._try_lock(fd):
+                if not blocking:
+                    os.close(fd)
+                    return False
+                if deadline is not None and time.time() >= deadline:
+                    raise LockTimeout(f"잠금 대기 시간 초과: {self.path}")
+                time.sleep(LOCK_POLL_SECONDS)
+        except BaseException:
+            os.close(fd)
+            raise
+
+        # 누가 잡고 있는지 기록 (확인용 - 잠금 판단에는 쓰지 않음, Windows 잠금 바이트 뒤에 씀)
+        owner = json.dumps({"host": HOSTNAME, "pid": os.getpid(), "acquired": time.time()}).encode("utf-8")
+        offset = 0 if fcntl is not None else 1
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, owner)
+        os.ftruncate(fd, offset + len(owner))
+        self._fd = fd
+        return True
+
+    def refresh(self):
+        """잡고 있는 잠금 파일의 수정 시각 갱신 (진행 중임을 보여 주는 용도)"""
+        if self.held:
+            try:
+                os.utime(self.path)
+            except OSError:
+                pass
+
+    def release(self):
+        if self.held:
+            fd, self._fd = self._fd, None
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            except OSError:
+                pass
+            os.close(fd)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def compute_once(path, compute, write, read, max_age=None):
+    """공유 캐시 항목 → 값 (없거나 오래됐으면 한 프로세스만 compute()로 계산해 저장, 나머지는 기다렸다 읽음)
+
+    write(path, 값) / read(path) → 값 (읽을 수 없으면 None)
+    """
+    if is_fresh(path, max_age):
+        value = read(path)
+        if value is not None:
+            return value
+
+    with FileLock(f"{path}.lock"):
+        # 기다리는 동안 다른 프로세스가 계산했으면 그 결과 사용
+        if is_fresh(path, max_age):
+            value = read(path)
+            if value is not None:
+                return value
+        value = compute()
+        write(path, value)
+        return value
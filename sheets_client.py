@@ -0,0 +1,124 @@
+# ============================================================
+# Google Sheets CSV 다운로드 클라이언트
+# ============================================================
+#
+# 프로세스 전체가 keep-alive 연결 풀을 가진 세션 하나를 공유하고, 일시적인 오류
+# (연결 실패, 시간 초과, 429/5xx)는 지터를 섞은 지수 백오프로 제한된 횟수만 재시도합니다.
+# 호스트별 동시 요청 수를 제한하며, 여러 시트(gid)를 동시에 받아 도착하는 대로 반환합니다.
+# 받은 원본 CSV는 공유 캐시(shared_cache)에 잠시 보관해 여러 레플리카가 한 번만 받습니다.
+
+import time
+import random
+import hashlib
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from shared_cache import cache_path, compute_once, read_bytes, write_bytes
+
+USER_AGENT = "Mozilla/5.0"
+
+# (연결, 읽기) 시간 제한 - 시도 1회 기준
+TIMEOUT = (5, 20)
+
+# 재시도: 최대 시도 횟수와 백오프 (base * 2^n, 상한 cap, 0~해당 값 사이 무작위)
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# 호스트별 동시 요청 수 / 연결 풀 크기
+MAX_PER_HOST = 4
+POOL_SIZE = 16
+
+# 공유 캐시의 원본 CSV를 다시 쓰는 시간 (초) - 레플리카들이 동시에 갱신해도 다운로드는 한 번
+CSV_CACHE_SECONDS = 300
+
+_session = None
+_session_lock = threading.Lock()
+_host_slots = {}
+_host_lock = threading.Lock()
+
+
+def sheet_csv_url(sheets_id, gid="0"):
+    """시트 탭의 CSV 내보내기 주소"""
+    return f"https://docs.google.com/spreadsheets/d/{sheets_id}/export?format=csv&gid={gid}"
+
+
+def get_session():
+    """프로세스 공용 세션 (keep-alive 연결 풀)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+        return _session
+
+
+def _host_slot(url):
+    """호스트별 동시 요청 제한 세마포어"""
+    host = urlsplit(url).netloc
+    with _host_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(MAX_PER_HOST)
+        return _host_slots[host]
+
+
+def _backoff(attempt):
+    """재시도 대기 시간 (full jitter)"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def fetch_csv(url, timeout=TIMEOUT, max_attempts=MAX_ATTEMPTS):
+    """CSV 내용(bytes) 다운로드 - 일시적 오류는 재시도, 그 밖의 오류는 바로 예외"""
+    session = get_session()
+    for attempt in range(max_attempts):
+        last = attempt == max_attempts - 1
+        try:
+            with _host_slot(url):
+                resp = session.get(url, timeout=timeout)
+            if resp.status_code in RETRY_STATUS and not last:
+                time.sleep(_backoff(attempt))
+                continue
+            resp.raise_for_status()
+            return resp.content
+        except (requests.ConnectionError, requests.Timeout):
+            if last:
+                raise
+            time.sleep(_backoff(attempt))
+
+
+def fetch_csv_shared(url, max_age=CSV_CACHE_SECONDS):
+    """CSV 내용(bytes) - 공유 캐시에 max_age초 안에 받은 것이 있으면 그대로, 없으면 한 프로세스만 다운로드"""
+    name = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    return compute_once(cache_path("csv", f"{name}.csv"), lambda: fetch_csv(url), write_bytes, read_bytes, max_age)
+
+
+def iter_sheet_frames(sheets_id, gids, parse, max_workers=None, return_exceptions=False):
+    """여러 시트(gid)를 동시에 받아 parse(bytes) 결과를 도착하는 대로 (gid, 결과)로 반환
+
+    return_exceptions이면 실패한 시트는 결과 자리에 예외 객체를 넣고 계속 진행합니다.
+    """
+    gids = list(gids)
+    if not gids:
+        return
+
+    def load(gid):
+        return parse(fetch_csv_shared(sheet_csv_url(sheets_id, gid)))
+
+    with ThreadPoolExecutor(max_workers=max_workers or min(len(gids), POOL_SIZE)) as pool:
+        jobs = {pool.submit(load, gid): gid for gid in gids}
+        for job in as_completed(jobs):
+            try:
+                yield jobs[job], job.result()
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                yield jobs[job], e
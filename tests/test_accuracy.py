@@ -0,0 +1,93 @@
+# 실제값 입력 · 수정 · 삭제를 차례로 반영한 누적 합계가 처음부터 다시 계산한 값과 같은지 확인
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from archive import archive_run
+from accuracy import SUM_COLUMNS, update_accuracy, accuracy_summary, connect
+
+CHANNELS = {"JTBC": "JTBC", "MBN": "MBN"}
+DATES = pd.date_range("2025-01-01", periods=10)
+
+
+def _forecast_df(run_date, seed):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for channel in CHANNELS.values():
+        dates = pd.date_range(pd.Timestamp(run_date) + pd.Timedelta(days=1), DATES[-1])
+        forecast = rng.uniform(1.0, 3.0, len(dates))
+        frames.append(pd.DataFrame({
+            "Date": dates.strftime("%Y-%m-%d"), "Channel": channel, "Forecast": forecast,
+            "Lower_95": forecast - 0.8, "Upper_95": forecast + 0.8,
+            "Lower_90": forecast - 0.5, "Upper_90": forecast + 0.5,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _archive(path, run_date, seed):
+    archive_run(_forecast_df(run_date, seed), run_date, f"fp{seed}", "data",
+                {"engine": "numpy", "uncertainty_mode": "analytic"}, path=path)
+
+
+def _sums(path):
+    with connect(path) as conn:
+        frame = pd.read_sql_query("SELECT * FROM accuracy WHERE n > 0", conn)
+    return frame.sort_values(["engine", "channel", "lead"]).reset_index(drop=True)
+
+
+@pytest.fixture
+def sheets():
+    rng = np.random.default_rng(1)
+    first = pd.DataFrame({"날짜": DATES[:6], "JTBC": rng.uniform(1, 3, 6), "MBN": rng.uniform(1, 3, 6)})
+    # 새 날짜 입력
+    inserted = pd.concat([first, pd.DataFrame({"날짜": DATES[6:8], "JTBC": [2.0, 2.5], "MBN": [1.5, 1.2]})],
+                         ignore_index=True)
+    # 기존 값 수정
+    edited = inserted.copy()
+    edited.loc[2, "JTBC"] = 9.0
+    edited.loc[6, "MBN"] = 0.0
+    # 빈칸으로 지우기 + 행 삭제
+    deleted = edited.copy()
+    deleted.loc[3, "MBN"] = np.nan
+    deleted = deleted.drop(index=4).reset_index(drop=True)
+    return [first, inserted, edited, deleted]
+
+
+def test_incremental_matches_full_recompute(tmp_path, sheets):
+    incremental = str(tmp_path / "incremental.db")
+    _archive(incremental, DATES[0], 0)
+    _archive(incremental, DATES[1], 1)
+    for step, df in enumerate(sheets):
+        if step == 2:
+            _archive(incremental, DATES[2], 2)
+        update_accuracy(df, CHANNELS, path=incremental)
+
+    full = str(tmp_path / "full.db")
+    for seed in range(3):
+        _archive(full, DATES[seed], seed)
+    update_accuracy(sheets[-1], CHANNELS, path=full)
+
+    expected = _sums(full)
+    actual = _sums(incremental)
+    pd.testing.assert_frame_equal(actual[["engine", "channel", "lead"]], expected[["engine", "channel", "lead"]])
+    np.testing.assert_allclose(actual[SUM_COLUMNS].to_numpy(float), expected[SUM_COLUMNS].to_numpy(float),
+                               atol=1e-9)
+
+    with connect(incremental) as conn:
+        stored = conn.execute("SELECT COUNT(*) FROM actuals").fetchone()[0]
+    assert stored == int(sheets[-1][list(CHANNELS)].notna().sum().sum())
+    by_lead, summary = accuracy_summary("numpy", path=incremental)
+    assert summary["n"].sum() == expected["n"].sum()
+
+
+def test_deleting_every_actual_clears_sums(tmp_path, sheets):
+    path = str(tmp_path / "archive.db")
+    _archive(path, DATES[0], 0)
+    update_accuracy(sheets[1], CHANNELS, path=path)
+    assert _sums(path)["n"].sum() > 0
+
+    update_accuracy(sheets[1].iloc[:0], CHANNELS, path=path)
+    assert _sums(path).empty
+    with connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM actuals").fetchone()[0] == 0
@@ -0,0 +1,29 @@
+# 채널 간 특징 행렬 공유 (SharedFeatureCache) on/off의 예측 · 구성요소가 같은지 확인 (합성 데이터, 네트워크 없음)
+
+import numpy as np
+import pandas as pd
+
+from benchmark import synthetic_forecaster
+
+
+def _run(forecaster, share, days=30, seed=0):
+    forecaster.share_features = share
+    forecaster.forecasts = {}
+    np.random.seed(seed)  # 신뢰구간 샘플링 난수 고정
+    forecaster.run_forecast(days)
+    return ({en: fc.copy() for en, fc in forecaster.forecasts.items()},
+            {en: c.copy() for en, c in forecaster.components.items()})
+
+
+def test_shared_features_match_unshared():
+    # 채널 병렬 학습은 신뢰구간 샘플링 난수 순서를 바꾸므로 순차 실행으로 비교
+    forecaster = synthetic_forecaster(n_days=500, max_workers=1, uncertainty_mode="reduced")
+
+    forecasts, components = _run(forecaster, share=False)
+    shared_forecasts, shared_components = _run(forecaster, share=True)
+
+    assert forecaster.feature_cache_stats["hits"] > 0
+    assert set(shared_forecasts) == set(forecasts) == set(forecaster.channels.values())
+    for en in forecasts:
+        pd.testing.assert_frame_equal(forecasts[en], shared_forecasts[en])
+        pd.testing.assert_frame_equal(components[en], shared_components[en])
@@ -0,0 +1,204 @@
+# ============================================================
+# 채널별 Prophet 하이퍼파라미터 튜닝 (연속 절반 제거)
+# ============================================================
+#
+# 사전분포 척도와 푸리에 차수 조합을 무작위로 뽑아, 최근 기준일 몇 개의 짧은 백테스트로
+# 먼저 평가하고 성적이 나쁜 조합을 1/eta만 남기고 버립니다. 살아남은 조합은 기준일을
+# eta배로 늘려 다시 평가하며, 마지막까지 남은 조합을 채널별로 tuned_params.json에
+# 저장합니다. run_forecast는 이 파일이 있으면 자동으로 사용합니다.
+#
+# 사용법:
+#     python tuning.py [--sheets-id ID] [--gid 0] [--configs 24] [--eta 3] [--workers N]
+
+import sys
+import json
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from backtest import cutoff_dates, forecast_cutoff
+
+# 탐색 공간 (기본 MODEL_PARAMS 조합은 항상 후보에 포함)
+SEARCH_SPACE = {
+    "changepoint_prior_scale": [0.01, 0.05, 0.1, 0.2, 0.5],
+    "seasonality_prior_scale": [0.1, 1.0, 5.0, 10.0],
+    "holidays_prior_scale": [0.1, 1.0, 5.0, 10.0],
+    "weekly_order": [3, 4, 6],
+    "yearly_order": [5, 10, 15],
+}
+
+DEFAULT_N_CONFIGS = 24
+DEFAULT_ETA = 3
+DEFAULT_MIN_CUTOFFS = 2
+DEFAULT_MAX_CUTOFFS = 18
+
+# 튜닝용 백테스트 설정 (최근 기준일부터 사용)
+TUNING_INITIAL_DAYS = 365
+TUNING_PERIOD_DAYS = 14
+TUNING_HORIZON_DAYS = 30
+
+
+def sample_configs(n_configs=DEFAULT_N_CONFIGS, seed=0):
+    """탐색 공간에서 중복 없이 무작위 조합 추출 (첫 번째는 기본 MODEL_PARAMS)"""
+    from forecaster import MODEL_PARAMS
+
+    rng = np.random.default_rng(seed)
+    configs, seen = [dict(MODEL_PARAMS)], {tuple(sorted(MODEL_PARAMS.items()))}
+    total = int(np.prod([len(v) for v in SEARCH_SPACE.values()]))
+    while len(configs) < min(n_configs, total + 1):
+        cfg = {k: values[rng.integers(len(values))] for k, values in SEARCH_SPACE.items()}
+        cfg = {k: v.item() if hasattr(v, "item") else v for k, v in cfg.items()}
+        key = tuple(sorted(cfg.items()))
+        if key not in seen:
+            seen.add(key)
+            configs.append(cfg)
+    return configs
+
+
+def _evaluate(train, actual, holidays, kr, en, params, cutoff, horizon):
+    """조합 하나 × 기준일 하나의 예측 MAE (프로세스 풀 작업 단위)"""
+    settings = {
+        "engine": "prophet",
+        "uncertainty_mode": "analytic",  # 점 예측만 평가하므로 시뮬레이션 불필요
+        "uncertainty_samples": 0,
+        "model_params": {en: params},
+    }
+    pred = forecast_cutoff(train, holidays, {kr: en}, cutoff, horizon, settings)
+    merged = pred.merge(actual, on="ds")
+    return float((merged["yhat"] - merged["y"]).abs().mean())
+
+
+def successive_halving(df, holidays, channels, configs, cutoffs, horizon=TUNING_HORIZON_DAYS,
+                       eta=DEFAULT_ETA, min_cutoffs=DEFAULT_MIN_CUTOFFS, max_workers=None,
+                       on_progress=None):
+    """채널별 연속 절반 제거 → {채널명: {"params", "mae", "default_mae", "n_cutoffs"}}
+
+    cutoffs는 최근 기준일부터 정렬된 목록이며, 단계마다 앞에서부터 더 많은 기준일을 씁니다.
+    이전 단계에서 평가한 (조합, 기준일)은 다시 계산하지 않습니다.
+    """
+    data = df[["날짜", *channels.keys(), "sunset_time"]].dropna(subset=["날짜"])
+    trains = {c: data[data["날짜"] <= c].reset_index(drop=True) for c in cutoffs}
+    actuals = {
+        kr: data[["날짜", kr]].rename(columns={"날짜": "ds", kr: "y"}).dropna()
+        for kr in channels
+    }
+
+    alive = {kr: list(range(len(configs))) for kr in channels}
+    scores = {}  # (kr, 조합 번호, 기준일) → MAE
+    n_cutoffs = min(min_cutoffs, len(cutoffs))
+    rung = 0
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            use = cutoffs[:n_cutoffs]
+            jobs = {
+                (kr, i, c): pool.submit(_evaluate, trains[c], actuals[kr], holidays, kr, en,
+                                        configs[i], c, horizon)
+                for kr, en in channels.items() for i in alive[kr] for c in use
+                if (kr, i, c) not in scores
+            }
+            for key, job in jobs.items():
+                scores[key] = job.result()
+
+            mean_mae = {
+                kr: {i: float(np.mean([scores[(kr, i, c)] for c in use])) for i in alive[kr]}
+                for kr in channels
+            }
+            if on_progress is not None:
+                on_progress(rung, n_cutoffs, {channels[kr]: len(alive[kr]) for kr in channels})
+
+            if n_cutoffs >= len(cutoffs) or all(len(v) == 1 for v in alive.values()):
+                break
+
+            # 성적 상위 1/eta만 다음 단계로
+            for kr in channels:
+                ranked = sorted(alive[kr], key=lambda i: mean_mae[kr][i])
+                alive[kr] = ranked[:max(1, len(ranked) // eta)]
+            n_cutoffs = min(n_cutoffs * eta, len(cutoffs))
+            rung += 1
+
+        results = {}
+        for kr, en in channels.items():
+            best = min(alive[kr], key=lambda i: mean_mae[kr][i])
+            use = cutoffs[:n_cutoffs]
+            # 기본 조합(0번)이 중간에 탈락했어도 같은 기준일로 비교할 수 있도록 평가
+            for c in use:
+                if (kr, 0, c) not in scores:
+                    scores[(kr, 0, c)] = pool.submit(
+                        _evaluate, trains[c], actuals[kr], holidays, kr, en, configs[0], c, horizon
+                    ).result()
+            results[en] = {
+                "params": configs[best],
+                "mae": mean_mae[kr][best],
+                "default_mae": float(np.mean([scores[(kr, 0, c)] for c in use])),
+                "n_cutoffs": n_cutoffs,
+            }
+    return results
+
+
+def tune(df, holidays, channels, n_configs=DEFAULT_N_CONFIGS, eta=DEFAULT_ETA,
+         min_cutoffs=DEFAULT_MIN_CUTOFFS, max_cutoffs=DEFAULT_MAX_CUTOFFS,
+         initial=TUNING_INITIAL_DAYS, period=TUNING_PERIOD_DAYS, horizon=TUNING_HORIZON_DAYS,
+         max_workers=None, seed=0, on_progress=None):
+    """채널별 하이퍼파라미터 탐색 → 튜닝 결과 dict (save_tuned_params로 저장)"""
+    cutoffs = cutoff_dates(df["날짜"], initial, period, horizon)[::-1][:max_cutoffs]
+    if not cutoffs:
+        raise ValueError("데이터가 초기 학습 기간 + 예측 기간보다 짧아 튜닝할 수 없습니다.")
+
+    configs = sample_configs(n_configs, seed)
+    results = successive_halving(df, holidays, channels, configs, cutoffs, horizon, eta,
+                                 min_cutoffs, max_workers, on_progress)
+    return {
+        "tuned_at": datetime.now().isoformat(timespec="seconds"),
+        "search": {
+            "n_configs": len(configs), "eta": eta, "initial": initial, "period": period,
+            "horizon": horizon, "cutoffs": len(cutoffs), "seed": seed,
+        },
+        "channels": results,
+    }
+
+
+def save_tuned_params(tuned, path=None):
+    """튜닝 결과를 run_forecast가 읽는 파일에 저장"""
+    from forecaster import TUNED_PARAMS_PATH
+
+    with open(path or TUNED_PARAMS_PATH, "w", encoding="utf-8") as f:
+        json.dump(tuned, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    from benchmark import DEFAULT_SHEETS_ID
+    from forecaster import NewsViewershipForecaster, TUNED_PARAMS_PATH
+
+    parser = argparse.ArgumentParser(description="채널별 Prophet 하이퍼파라미터 튜닝")
+    parser.add_argument("--sheets-id", default=DEFAULT_SHEETS_ID, help="구글 시트 ID")
+    parser.add_argument("--gid", default="0", help="시트 GID")
+    parser.add_argument("--configs", type=int, default=DEFAULT_N_CONFIGS, help="후보 조합 수")
+    parser.add_argument("--eta", type=int, default=DEFAULT_ETA, help="단계별 생존 비율의 역수")
+    parser.add_argument("--max-cutoffs", type=int, default=DEFAULT_MAX_CUTOFFS, help="마지막 단계 기준일 수")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--seed", type=int, default=0, help="무작위 탐색 시드")
+    parser.add_argument("--output", default=TUNED_PARAMS_PATH, help="저장 경로")
+    args = parser.parse_args(argv)
+
+    forecaster = NewsViewershipForecaster(args.sheets_id, args.gid)
+    forecaster.prepare()
+
+    def on_progress(rung, n_cutoffs, alive):
+        print(f"단계 {rung + 1}: 기준일 {n_cutoffs}개, 남은 조합 {alive}")
+
+    tuned = tune(forecaster.df, forecaster.holidays, forecaster.channels, n_configs=args.configs,
+                 eta=args.eta, max_cutoffs=args.max_cutoffs, max_workers=args.workers,
+                 seed=args.seed, on_progress=on_progress)
+    save_tuned_params(tuned, args.output)
+
+    print("=" * 78)
+    for en, r in tuned["channels"].items():
+        print(f"{en:<10} MAE {r['mae']:.4f} (기본 {r['default_mae']:.4f})  {r['params']}")
+    print(f"저장: {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())